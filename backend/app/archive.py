@@ -0,0 +1,222 @@
+import json
+import os
+import shutil
+import threading
+import uuid
+import pandas as pd
+from datetime import datetime
+from database import DB_PATH, SMTData
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:
+    # pyarrow 미설치 시 아카이브 비활성화 (smt_data만 사용)
+    pa = None
+    pc = None
+    ds = None
+
+# 오래된 원본 데이터를 보관하는 Parquet 디렉터리 (line_id=.../date=YYYY-MM-DD/*.parquet)
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(os.path.dirname(DB_PATH), 'archive'))
+ARCHIVE_RETENTION_DAYS = int(os.getenv("ARCHIVE_RETENTION_DAYS", "30"))
+
+ARCHIVE_COLUMNS = [column.name for column in SMTData.__table__.columns]
+
+# 이름이 '_'로 시작하는 디렉터리는 데이터셋 탐색에서 제외됨
+STAGING_DIR = '_staging'
+
+
+class ParquetArchive:
+    """콜드 티어 - 라인/일자별 파티션 Parquet (zstd)
+
+    조회는 pyarrow dataset 필터로 수행: line_id/date는 디렉터리 단위로 건너뛰고
+    timestamp 조건은 row group 통계로 걸러냄.
+    """
+
+    def __init__(self, root: str = ARCHIVE_DIR):
+        self.root = root
+        self._dataset = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return pa is not None
+
+    def _partitioning(self):
+        return ds.partitioning(
+            pa.schema([('line_id', pa.string()), ('date', pa.string())]),
+            flavor='hive'
+        )
+
+    def dataset(self):
+        """아카이브 데이터셋 (파일 목록은 아카이브 실행 시에만 다시 읽음)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._dataset is None:
+                if not os.path.isdir(self.root):
+                    return None
+                dataset = ds.dataset(self.root, format='parquet', partitioning=self._partitioning())
+                if not dataset.files:
+                    return None
+                self._dataset = dataset
+            return self._dataset
+
+    def invalidate(self):
+        with self._lock:
+            self._dataset = None
+
+    def _filter(self, line_id: str = None, since: datetime = None, until: datetime = None):
+        conditions = []
+        if line_id is not None:
+            conditions.append(ds.field('line_id') == line_id)
+        if since is not None:
+            conditions.append(ds.field('date') >= since.strftime('%Y-%m-%d'))
+            conditions.append(ds.field('timestamp') >= pa.scalar(since, type=pa.timestamp('us')))
+        if until is not None:
+            conditions.append(ds.field('date') <= until.strftime('%Y-%m-%d'))
+            conditions.append(ds.field('timestamp') < pa.scalar(until, type=pa.timestamp('us')))
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    # ---------- 읽기 ----------
+
+    def scan(self, columns: list, line_id: str = None, since: datetime = None,
+             until: datetime = None, chunk_size: int = 50000):
+        """지정 컬럼만 청크 단위로 읽어 tuple 리스트로 반환 (smt_data 조회와 같은 형태)"""
+        dataset = self.dataset()
+        if dataset is None:
+            return
+        batches = dataset.to_batches(
+            columns=columns, filter=self._filter(line_id, since, until), batch_size=chunk_size
+        )
+        for batch in batches:
+            if batch.num_rows == 0:
+                continue
+            values = [batch.column(i).to_pylist() for i in range(batch.num_columns)]
+            yield list(zip(*values))
+
+    def latest(self, line_id: str):
+        """라인의 가장 최근 아카이브 행 (컬럼 dict) - 가장 최근 date 파티션만 읽음"""
+        dataset = self.dataset()
+        if dataset is None:
+            return None
+        dates = [
+            ds.get_partition_keys(fragment.partition_expression).get('date')
+            for fragment in dataset.get_fragments(filter=ds.field('line_id') == line_id)
+        ]
+        dates = [date for date in dates if date is not None]
+        if not dates:
+            return None
+        table = dataset.to_table(
+            columns=ARCHIVE_COLUMNS,
+            filter=(ds.field('line_id') == line_id) & (ds.field('date') == max(dates))
+        )
+        if table.num_rows == 0:
+            return None
+        return table.sort_by([('timestamp', 'descending'), ('id', 'descending')]).slice(0, 1).to_pylist()[0]
+
+    def count(self, line_id: str = None, since: datetime = None, until: datetime = None) -> int:
+        dataset = self.dataset()
+        if dataset is None:
+            return 0
+        return dataset.count_rows(filter=self._filter(line_id, since, until))
+
+    def group_counts(self, keys: list, since: datetime = None) -> list:
+        """keys별 (전체 건수, 고장 건수)"""
+        dataset = self.dataset()
+        if dataset is None:
+            return []
+        table = dataset.to_table(columns=list(dict.fromkeys(keys + ['failure_occurred'])),
+                                 filter=self._filter(since=since))
+        if table.num_rows == 0:
+            return []
+        table = table.append_column('failure_int', pc.cast(table['failure_occurred'], pa.int64()))
+        grouped = table.group_by(keys).aggregate([('failure_int', 'count'), ('failure_int', 'sum')])
+        return [
+            tuple(row[key] for key in keys) + (row['failure_int_count'], row['failure_int_sum'] or 0)
+            for row in grouped.to_pylist()
+        ]
+
+    # ---------- 쓰기 ----------
+
+    def stage(self, run_id: str, cutoff: datetime, max_id: int) -> str:
+        """아카이브 실행용 임시 디렉터리 (commit 전까지 조회 대상 아님)"""
+        staging = os.path.join(self.root, STAGING_DIR, run_id)
+        os.makedirs(staging, exist_ok=True)
+        with open(os.path.join(staging, 'run.json'), 'w', encoding='utf-8') as f:
+            json.dump({'cutoff': cutoff.isoformat(), 'max_id': max_id}, f)
+        return staging
+
+    def write_chunk(self, staging: str, rows: list, chunk_index: int) -> int:
+        """청크를 line_id/date 파티션 Parquet 파일로 기록"""
+        frame = pd.DataFrame(rows, columns=ARCHIVE_COLUMNS)
+        frame['timestamp'] = pd.to_datetime(frame['timestamp']).astype('datetime64[us]')
+        frame['date'] = frame['timestamp'].dt.strftime('%Y-%m-%d')
+        ds.write_dataset(
+            pa.Table.from_pandas(frame, preserve_index=False),
+            staging,
+            format='parquet',
+            partitioning=self._partitioning(),
+            basename_template=f'part-{os.path.basename(staging)}-{chunk_index}-{{i}}.parquet',
+            file_options=ds.ParquetFileFormat().make_write_options(compression='zstd'),
+            existing_data_behavior='overwrite_or_ignore'
+        )
+        return len(frame)
+
+    def publish(self, staging: str) -> int:
+        """임시 디렉터리의 파일을 아카이브로 이동 (원본 삭제 commit 이후)"""
+        moved = 0
+        for dirpath, _, filenames in os.walk(staging):
+            for filename in filenames:
+                if not filename.endswith('.parquet'):
+                    continue
+                source = os.path.join(dirpath, filename)
+                target = os.path.join(self.root, os.path.relpath(source, staging))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(source, target)
+                moved += 1
+        shutil.rmtree(staging, ignore_errors=True)
+        self.invalidate()
+        return moved
+
+    def discard(self, staging: str):
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def pending_runs(self) -> list:
+        """중단된 아카이브 실행 (staging 디렉터리, 실행 정보)"""
+        base = os.path.join(self.root, STAGING_DIR)
+        if not os.path.isdir(base):
+            return []
+        runs = []
+        for run_id in sorted(os.listdir(base)):
+            staging = os.path.join(base, run_id)
+            try:
+                with open(os.path.join(staging, 'run.json'), encoding='utf-8') as f:
+                    info = json.load(f)
+            except (OSError, ValueError):
+                # 실행 정보 기록 전에 중단됨 - 파일도 없음
+                shutil.rmtree(staging, ignore_errors=True)
+                continue
+            info['cutoff'] = datetime.fromisoformat(info['cutoff'])
+            runs.append((staging, info))
+        return runs
+
+    @staticmethod
+    def new_run_id() -> str:
+        return datetime.now().strftime('%Y%m%d%H%M%S') + '-' + uuid.uuid4().hex[:8]
+
+    def get_stats(self) -> dict:
+        dataset = self.dataset()
+        if dataset is None:
+            return {'enabled': self.enabled, 'path': self.root, 'files': 0, 'rows': 0, 'bytes': 0}
+        return {
+            'enabled': True,
+            'path': self.root,
+            'files': len(dataset.files),
+            'rows': dataset.count_rows(),
+            'bytes': sum(os.path.getsize(path) for path in dataset.files)
+        }
@@ -0,0 +1,111 @@
+import hashlib
+import os
+import re
+
+# 청크 크기/겹침 (추정 토큰 기준)
+CHUNK_TOKENS = int(os.getenv("RAG_CHUNK_TOKENS", "300"))
+CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "40"))
+
+# 한글은 음절, 영문은 단어, 숫자, 기호를 각각 1토큰으로 추정 (임베딩 토크나이저보다 약간 크게 잡힘)
+_TOKEN_PATTERN = re.compile(r'[가-힣]|[A-Za-z]+|\d+(?:\.\d+)?|[^\sA-Za-z\d가-힣]')
+
+# 섹션 제목: "# 제목", "1. 장비 개요", "2.3 점검", "제3장 ..."
+_HEADING_PATTERN = re.compile(r'^(#{1,6}\s+\S.*|\d+(\.\d+)*\.?\s+\S.{0,40}|제\s*\d+\s*[장절조].*)$')
+_NUMBERED_ITEM = re.compile(r'^\d+(\.\d+)*\.?\s+\S')
+_SENTENCE_END = re.compile(r'(?<=[.!?。])\s+|(?<=다\.)|(?<=요\.)')
+
+
+def estimate_tokens(text: str) -> int:
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def chunk_id(filename: str, text: str) -> str:
+    """내용 해시 id - 내용이 같으면 재업로드해도 같은 id"""
+    return hashlib.sha256(f"{filename}\0{text}".encode('utf-8')).hexdigest()[:32]
+
+
+def _split_sections(text: str) -> list:
+    """빈 줄로 나눈 블록을 섹션 제목 기준으로 묶음 -> [(제목, [블록(줄 목록)...])]"""
+    sections = [(None, [])]
+    for block in re.split(r'\n\s*\n', text.replace('\r\n', '\n')):
+        lines = [line.rstrip() for line in block.strip().split('\n') if line.strip()]
+        if not lines:
+            continue
+        first = lines[0].strip()
+        # 블록 첫 줄이 제목이고, 다음 줄이 같은 번호 목록이 아니면 새 섹션 ("1. 즉시 장비 정지\n2. ..." 절차는 제외)
+        is_heading = _HEADING_PATTERN.match(first) and not (len(lines) > 1 and _NUMBERED_ITEM.match(lines[1].strip()))
+        if is_heading:
+            sections.append((first.lstrip('#').strip(), [lines[1:]] if len(lines) > 1 else []))
+        else:
+            sections[-1][1].append(lines)
+    return [(heading, blocks) for heading, blocks in sections if heading or blocks]
+
+
+def _units(blocks: list, budget: int) -> list:
+    """블록(절차/목록) 단위, 긴 블록은 줄, 긴 줄은 문장, 그래도 길면 글자 단위로 분할"""
+    units = []
+    for lines in blocks:
+        block = '\n'.join(lines)
+        if estimate_tokens(block) <= budget:
+            units.append(block)
+        else:
+            units.extend(_line_units(lines, budget))
+    return units
+
+
+def _line_units(lines: list, budget: int) -> list:
+    units = []
+    for line in lines:
+        if estimate_tokens(line) <= budget:
+            units.append(line)
+            continue
+        for sentence in _SENTENCE_END.split(line):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            while estimate_tokens(sentence) > budget:
+                # 토큰 추정치 기준으로 잘라낼 위치 탐색
+                cut = len(sentence)
+                while cut > 1 and estimate_tokens(sentence[:cut]) > budget:
+                    cut = cut * budget // max(estimate_tokens(sentence[:cut]), 1) or 1
+                units.append(sentence[:cut])
+                sentence = sentence[cut:].strip()
+            if sentence:
+                units.append(sentence)
+    return units
+
+
+def chunk_text(text: str, max_tokens: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP) -> list:
+    """제목/번호 섹션 -> 줄 -> 문장 순으로 나눠 max_tokens 이내로 묶음
+
+    청크는 섹션 경계를 넘지 않고, 각 청크 앞에 섹션 제목을 붙임.
+    같은 섹션의 다음 청크는 이전 청크 끝부분(overlap 토큰 이내)을 다시 포함.
+    반환: [{'text', 'section'}]
+    """
+    chunks = []
+    for heading, blocks in _split_sections(text):
+        header_tokens = estimate_tokens(heading) if heading else 0
+        budget = max(max_tokens - header_tokens, 1)
+        units = _units(blocks, budget)
+        if not units:
+            chunks.append({'text': heading, 'section': heading})
+            continue
+
+        current, current_tokens = [], 0
+        for unit in units:
+            tokens = estimate_tokens(unit)
+            if current and current_tokens + tokens > budget:
+                chunks.append({'text': '\n'.join(([heading] if heading else []) + current), 'section': heading})
+                # 겹침: 이전 청크 끝에서 overlap 토큰 이내의 단위를 이어받음
+                carried, carried_tokens = [], 0
+                for previous in reversed(current):
+                    previous_tokens = estimate_tokens(previous)
+                    if carried_tokens + previous_tokens > overlap or carried_tokens + previous_tokens + tokens > budget:
+                        break
+                    carried.insert(0, previous)
+                    carried_tokens += previous_tokens
+                current, current_tokens = carried, carried_tokens
+            current.append(unit)
+            current_tokens += tokens
+        chunks.append({'text': '\n'.join(([heading] if heading else []) + current), 'section': heading})
+    return chunks
@@ -0,0 +1,140 @@
+import os
+from chunker import estimate_tokens
+from lexical_index import tokenize
+
+# 프롬프트에 넣을 매뉴얼 내용 상한 (추정 토큰) - 3B 모델 prefill 시간이 RAG 지연의 대부분
+CONTEXT_TOKENS = int(os.getenv("RAG_CONTEXT_TOKENS", "1200"))
+# 요청의 top_k 상한
+MAX_TOP_K = int(os.getenv("RAG_MAX_TOP_K", "8"))
+# MMR - 1에 가까울수록 관련도 우선, 0에 가까울수록 다양성 우선
+MMR_LAMBDA = float(os.getenv("RAG_MMR_LAMBDA", "0.7"))
+# 이미 고른 청크와 토큰 겹침(Jaccard)이 이 이상이면 중복으로 보고 제외
+DUPLICATE_SIMILARITY = float(os.getenv("RAG_DUPLICATE_SIMILARITY", "0.8"))
+
+# 고정 지시문 - 질의마다 바뀌는 내용은 모두 이 뒤에 붙여 Ollama가 앞부분 KV 캐시를 재사용
+PROMPT_PREFIX = """당신은 SMT 생산 설비 매뉴얼 도우미입니다.
+아래 매뉴얼 내용만 근거로 질문에 답변하세요.
+- 매뉴얼에 없는 내용은 추측하지 말고 매뉴얼에서 찾을 수 없다고 답하세요.
+- 수치(온도, 압력, 주기 등)는 매뉴얼에 적힌 값을 그대로 사용하세요.
+- 간결하고 명확하게, 절차는 순서대로 답하세요.
+
+매뉴얼 내용:
+"""
+
+
+def clamp_top_k(top_k: int) -> int:
+    return max(1, min(int(top_k), MAX_TOP_K))
+
+
+def build_prompt(query: str, context: str) -> str:
+    return f"{PROMPT_PREFIX}{context}\n\n질문: {query}\n\n답변:"
+
+
+def _similarity(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _mmr_order(documents: list, terms: list, mmr_lambda: float) -> list:
+    """MMR 순서의 인덱스 (관련도는 검색 순위 기반, 중복 청크는 제외)"""
+    count = len(documents)
+    relevance = [1.0 - rank / count for rank in range(count)]
+    remaining = list(range(count))
+    selected = []
+    while remaining:
+        best, best_score = None, None
+        for index in list(remaining):
+            redundancy = max((_similarity(terms[index], terms[chosen]) for chosen in selected), default=0.0)
+            if redundancy >= DUPLICATE_SIMILARITY:
+                remaining.remove(index)
+                continue
+            score = mmr_lambda * relevance[index] - (1 - mmr_lambda) * redundancy
+            if best_score is None or score > best_score:
+                best, best_score = index, score
+        if best is None:
+            break
+        selected.append(best)
+        remaining.remove(best)
+    return selected
+
+
+def _overlap(lines: list, previous: list) -> int:
+    """lines 앞부분이 previous 끝부분과 겹치는 줄 수 (가장 긴 겹침)"""
+    for size in range(min(len(lines), len(previous)), 0, -1):
+        if lines[:size] == previous[-size:]:
+            return size
+    return 0
+
+
+def _section_lines(document: dict):
+    """(문서·섹션 키, 제목 줄 목록, 본문 줄 목록)"""
+    metadata = document.get('metadata', {})
+    heading = metadata.get('section')
+    lines = document['content'].split('\n')
+    if heading and lines and lines[0].lstrip('#').strip() == heading:
+        return (metadata.get('filename'), heading), lines[:1], lines[1:]
+    return (metadata.get('filename'), heading), [], lines
+
+
+def _trim(document: dict, used_sections: dict) -> str:
+    """같은 문서·섹션에서 이미 고른 청크와의 겹침만 제거 - 새 내용이 없으면 빈 문자열
+
+    청커의 겹침(이전 청크 끝 줄이 다음 청크 앞에 반복)과 반복되는 섹션 제목만 대상.
+    다른 섹션/문서에 우연히 같은 줄("1. 전원 차단" 등)이 있어도 지우지 않음.
+    """
+    key, header, lines = _section_lines(document)
+    body = [line.strip() for line in lines]
+    start, end = 0, len(body)
+    for previous in used_sections.get(key, []):
+        # 뒤 청크를 먼저 골랐으면 앞 청크의 끝부분이 겹침 (MMR 순서는 문서 순서와 다름)
+        start = max(start, _overlap(body, previous))
+        end = min(end, len(body) - _overlap(previous, body))
+    if start >= end:
+        return ''
+    if key in used_sections:
+        header = []
+    return '\n'.join(header + lines[start:end]).strip()
+
+
+def build_context(documents: list, budget: int = CONTEXT_TOKENS, mmr_lambda: float = MMR_LAMBDA):
+    """검색 결과(관련도 순) -> (사용한 문서, 컨텍스트 문자열, 통계)
+
+    MMR로 중복/겹치는 청크를 거르고, 토큰 예산 안에 들어가는 청크만 관련도 순으로 이어 붙임.
+    첫 청크가 예산보다 크면 예산만큼 잘라서라도 포함.
+    """
+    terms = [set(tokenize(document['content'])) for document in documents]
+    used_sections = {}
+    used = {}
+    remaining = budget
+    for index in _mmr_order(documents, terms, mmr_lambda):
+        text = _trim(documents[index], used_sections)
+        if not text:
+            continue
+        tokens = estimate_tokens(text)
+        if tokens > remaining:
+            if used:
+                continue
+            text, tokens = _truncate(text, remaining), remaining
+        used[index] = text
+        remaining -= tokens
+        key, _, lines = _section_lines(documents[index])
+        used_sections.setdefault(key, []).append([line.strip() for line in lines])
+        if remaining <= 0:
+            break
+
+    order = sorted(used)
+    stats = {
+        'retrieved': len(documents),
+        'used': len(order),
+        'tokens': budget - remaining,
+        'retrieved_tokens': sum(estimate_tokens(document['content']) for document in documents)
+    }
+    return [documents[index] for index in order], "\n\n".join(used[index] for index in order), stats
+
+
+def _truncate(text: str, budget: int) -> str:
+    cut = len(text)
+    while cut > 1 and estimate_tokens(text[:cut]) > budget:
+        cut = cut * budget // max(estimate_tokens(text[:cut]), 1) or 1
+    return text[:cut]
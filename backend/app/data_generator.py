@@ -2,11 +2,20 @@ import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from database import SMTData
+from data_ingest import bulk_insert_readings
 import os
 
+FEATURE_COLUMNS = [
+    'temperature', 'vibration', 'current',
+    'production_count', 'defect_count', 'cycle_time',
+    'pressure', 'humidity'
+]
+INT_FEATURES = ('production_count', 'defect_count')
+
 class SMTDataGenerator:
-    def __init__(self):
+    def __init__(self, seed: int = None):
+        self.rng = np.random.default_rng(seed)
+        
         # 정상 동작 범위 (더 넓게)
         self.normal_ranges = {
             'temperature': (180, 225),  # 220 → 225로 확대
@@ -30,112 +39,117 @@ class SMTDataGenerator:
             'pressure': (0.38, 0.45),    # 0.35-0.42 → 0.38-0.45로 조정
             'humidity': (58, 78)         # 65 → 58로 낮춤
         }
+        
+        # 경계선에 가까운 정상 데이터
+        self.boundary_ranges = {
+            'temperature': (210, 225),
+            'vibration': (0.45, 0.6),
+            'current': (23, 27),
+            'production_count': (75, 90),
+            'defect_count': (2, 4),
+            'cycle_time': (3.0, 3.3),
+            'pressure': (0.45, 0.50),
+            'humidity': (55, 62)
+        }
+        
+        # 정상과 매우 유사한 고장 데이터 (판별 어려움)
+        self.subtle_failure_ranges = {
+            'temperature': (218, 240),
+            'vibration': (0.50, 0.75),
+            'current': (24, 29),
+            'production_count': (65, 85),
+            'defect_count': (3, 7),
+            'cycle_time': (3.1, 3.7),
+            'pressure': (0.40, 0.48),
+            'humidity': (56, 68)
+        }
+        
+        # 중간 수준의 고장 징후
+        self.medium_failure_ranges = {
+            'temperature': (235, 255),
+            'vibration': (0.70, 1.0),
+            'current': (28, 32),
+            'production_count': (55, 70),
+            'defect_count': (6, 10),
+            'cycle_time': (3.5, 4.0),
+            'pressure': (0.38, 0.43),
+            'humidity': (65, 73)
+        }
+        
+        # (확률, 범위) - 정상: 30% 경계선 / 70% 일반
+        self.normal_regimes = [
+            (0.30, self.boundary_ranges),
+            (0.70, self.normal_ranges)
+        ]
+        # 고장: 40% 미묘 / 60% x 25% 중간 / 나머지 명확한 고장 패턴
+        self.failure_regimes = [
+            (0.40, self.subtle_failure_ranges),
+            (0.60 * 0.25, self.medium_failure_ranges),
+            (0.60 * 0.75, self.failure_patterns)
+        ]
+    
+    def _generate_regime(self, rng: np.random.Generator, ranges: dict, n: int) -> dict:
+        """한 패턴(regime)의 n개 샘플을 컬럼 단위로 한 번에 생성"""
+        # 샘플마다 하나의 노이즈 계수를 모든 센서에 공통 적용
+        noise_factor = rng.uniform(0.90, 1.10, n)
+        columns = {}
+        for feature in FEATURE_COLUMNS:
+            values = rng.uniform(*ranges[feature], n) * noise_factor
+            if feature in INT_FEATURES:
+                values = np.trunc(values).astype(np.int64)
+            columns[feature] = values
+        return columns
+    
+    def generate_batch(self, n: int, failure: bool, rng: np.random.Generator = None) -> dict:
+        """정상/고장 샘플 n개를 패턴 혼합 비율대로 생성 (컬럼 배열 dict)"""
+        rng = rng if rng is not None else self.rng
+        regimes = self.failure_regimes if failure else self.normal_regimes
+        counts = rng.multinomial(n, [p for p, _ in regimes])
+        
+        blocks = [self._generate_regime(rng, ranges, count)
+                  for count, (_, ranges) in zip(counts, regimes)]
+        columns = {
+            feature: np.concatenate([block[feature] for block in blocks])
+            for feature in FEATURE_COLUMNS
+        }
+        columns['failure_occurred'] = np.full(n, failure)
+        return columns
+    
+    def _single_sample(self, line_id: str, failure: bool) -> dict:
+        columns = self.generate_batch(1, failure)
+        sample = {'line_id': line_id}
+        sample.update({feature: columns[feature][0].item() for feature in FEATURE_COLUMNS})
+        sample['failure_occurred'] = failure
+        return sample
     
     def generate_normal_data(self, line_id: str = "LINE_01") -> dict:
         """정상 상태 데이터 생성 (더 큰 노이즈)"""
-        # 노이즈를 10%로 증가 (현실적인 변동성)
-        noise_factor = np.random.uniform(0.90, 1.10)
-        
-        # 30% 확률로 경계선에 가까운 데이터 생성
-        if np.random.random() < 0.30:
-            return {
-                'line_id': line_id,
-                'temperature': np.random.uniform(210, 225) * noise_factor,
-                'vibration': np.random.uniform(0.45, 0.6) * noise_factor,
-                'current': np.random.uniform(23, 27) * noise_factor,
-                'production_count': int(np.random.uniform(75, 90) * noise_factor),
-                'defect_count': int(np.random.uniform(2, 4) * noise_factor),
-                'cycle_time': np.random.uniform(3.0, 3.3) * noise_factor,
-                'pressure': np.random.uniform(0.45, 0.50) * noise_factor,
-                'humidity': np.random.uniform(55, 62) * noise_factor,
-                'failure_occurred': False
-            }
-        
-        return {
-            'line_id': line_id,
-            'temperature': np.random.uniform(*self.normal_ranges['temperature']) * noise_factor,
-            'vibration': np.random.uniform(*self.normal_ranges['vibration']) * noise_factor,
-            'current': np.random.uniform(*self.normal_ranges['current']) * noise_factor,
-            'production_count': int(np.random.uniform(*self.normal_ranges['production_count']) * noise_factor),
-            'defect_count': int(np.random.uniform(*self.normal_ranges['defect_count']) * noise_factor),
-            'cycle_time': np.random.uniform(*self.normal_ranges['cycle_time']) * noise_factor,
-            'pressure': np.random.uniform(*self.normal_ranges['pressure']) * noise_factor,
-            'humidity': np.random.uniform(*self.normal_ranges['humidity']) * noise_factor,
-            'failure_occurred': False
-        }
+        return self._single_sample(line_id, failure=False)
     
     def generate_failure_data(self, line_id: str = "LINE_01") -> dict:
         """고장 전조 데이터 생성 (정상 범위와 많이 겹치게)"""
-        # 노이즈 추가
-        noise_factor = np.random.uniform(0.90, 1.10)
-        
-        # 40% 확률로 정상과 매우 유사한 고장 데이터 (판별 어려움)
-        if np.random.random() < 0.40:
-            return {
-                'line_id': line_id,
-                'temperature': np.random.uniform(218, 240) * noise_factor,
-                'vibration': np.random.uniform(0.50, 0.75) * noise_factor,
-                'current': np.random.uniform(24, 29) * noise_factor,
-                'production_count': int(np.random.uniform(65, 85) * noise_factor),
-                'defect_count': int(np.random.uniform(3, 7) * noise_factor),
-                'cycle_time': np.random.uniform(3.1, 3.7) * noise_factor,
-                'pressure': np.random.uniform(0.40, 0.48) * noise_factor,
-                'humidity': np.random.uniform(56, 68) * noise_factor,
-                'failure_occurred': True
-            }
-        
-        # 20% 확률로 중간 수준의 고장 징후
-        if np.random.random() < 0.25:  # 남은 60% 중 20%
-            return {
-                'line_id': line_id,
-                'temperature': np.random.uniform(235, 255) * noise_factor,
-                'vibration': np.random.uniform(0.70, 1.0) * noise_factor,
-                'current': np.random.uniform(28, 32) * noise_factor,
-                'production_count': int(np.random.uniform(55, 70) * noise_factor),
-                'defect_count': int(np.random.uniform(6, 10) * noise_factor),
-                'cycle_time': np.random.uniform(3.5, 4.0) * noise_factor,
-                'pressure': np.random.uniform(0.38, 0.43) * noise_factor,
-                'humidity': np.random.uniform(65, 73) * noise_factor,
-                'failure_occurred': True
-            }
-        
-        # 나머지 40% - 명확한 고장 패턴
-        return {
-            'line_id': line_id,
-            'temperature': np.random.uniform(*self.failure_patterns['temperature']) * noise_factor,
-            'vibration': np.random.uniform(*self.failure_patterns['vibration']) * noise_factor,
-            'current': np.random.uniform(*self.failure_patterns['current']) * noise_factor,
-            'production_count': int(np.random.uniform(*self.failure_patterns['production_count']) * noise_factor),
-            'defect_count': int(np.random.uniform(*self.failure_patterns['defect_count']) * noise_factor),
-            'cycle_time': np.random.uniform(*self.failure_patterns['cycle_time']) * noise_factor,
-            'pressure': np.random.uniform(*self.failure_patterns['pressure']) * noise_factor,
-            'humidity': np.random.uniform(*self.failure_patterns['humidity']) * noise_factor,
-            'failure_occurred': True
-        }
+        return self._single_sample(line_id, failure=True)
     
     def generate_dataset(self, 
                         total_samples: int = 5000, 
                         failure_ratio: float = 0.15,
-                        lines: list = ["LINE_01", "LINE_02", "LINE_03"]) -> pd.DataFrame:
-        """학습용 데이터셋 생성"""
-        data_list = []
+                        lines: list = ["LINE_01", "LINE_02", "LINE_03"],
+                        seed: int = None) -> pd.DataFrame:
+        """학습용 데이터셋 생성 (seed 지정 시 재현 가능)"""
+        rng = np.random.default_rng(seed) if seed is not None else self.rng
         failure_count = int(total_samples * failure_ratio)
         normal_count = total_samples - failure_count
         
-        # 정상 데이터 생성
-        for _ in range(normal_count):
-            line_id = np.random.choice(lines)
-            data_list.append(self.generate_normal_data(line_id))
-        
-        # 고장 데이터 생성
-        for _ in range(failure_count):
-            line_id = np.random.choice(lines)
-            data_list.append(self.generate_failure_data(line_id))
+        normal = self.generate_batch(normal_count, failure=False, rng=rng)
+        failure = self.generate_batch(failure_count, failure=True, rng=rng)
         
-        df = pd.DataFrame(data_list)
-        df = df.sample(frac=1).reset_index(drop=True)  # 셔플
+        # 셔플
+        order = rng.permutation(total_samples)
+        data = {'line_id': np.asarray(lines, dtype=object)[rng.integers(0, len(lines), total_samples)]}
+        for column in FEATURE_COLUMNS + ['failure_occurred']:
+            data[column] = np.concatenate([normal[column], failure[column]])[order]
         
-        return df
+        return pd.DataFrame(data)
     
     def save_to_db(self, db: Session, samples: int = 5000):
         """DB에 샘플 데이터 저장 + CSV 자동 저장 (하루 전 데이터로 생성)"""
@@ -151,25 +165,10 @@ class SMTDataGenerator:
         # 시작 시간: 하루 전 - (전체 샘플 * 간격)
         start_time = one_day_ago - timedelta(minutes=total_minutes)
         
-        for idx, row in df.iterrows():
-            # 과거부터 하루 전까지 순차적으로 시간 할당
-            timestamp = start_time + timedelta(minutes=idx * minutes_interval)
-            
-            smt_data = SMTData(
-                timestamp=timestamp,
-                line_id=row['line_id'],
-                temperature=float(row['temperature']),
-                vibration=float(row['vibration']),
-                current=float(row['current']),
-                production_count=int(row['production_count']),
-                defect_count=int(row['defect_count']),
-                cycle_time=float(row['cycle_time']),
-                pressure=float(row['pressure']),
-                humidity=float(row['humidity']),
-                failure_occurred=bool(row['failure_occurred'])
-            )
-            db.add(smt_data)
+        # 과거부터 하루 전까지 순차적으로 시간 할당
+        df['timestamp'] = start_time + pd.to_timedelta(np.arange(len(df)) * minutes_interval, unit='m')
         
+        bulk_insert_readings(db, df)
         db.commit()
         
         # CSV 자동 저장
@@ -184,10 +183,8 @@ class SMTDataGenerator:
         csv_filename = f'smt_data_{timestamp_str}.csv'
         csv_path = os.path.join(csv_dir, csv_filename)
         
-        # 타임스탬프 추가하여 저장
-        df_with_time = df.copy()
-        df_with_time['timestamp'] = [start_time + timedelta(minutes=i*minutes_interval) for i in range(len(df))]
-        df_with_time.to_csv(csv_path, index=False, encoding='utf-8-sig')
+        # 타임스탬프 포함하여 저장
+        df.to_csv(csv_path, index=False, encoding='utf-8-sig')
         
         end_time = start_time + timedelta(minutes=(len(df)-1)*minutes_interval)
         
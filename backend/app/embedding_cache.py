@@ -0,0 +1,75 @@
+import hashlib
+import threading
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from database import SessionLocal, EmbeddingCacheEntry
+
+# 한 번에 조회하는 키 수 (SQLite 변수 개수 제한 고려)
+LOOKUP_BATCH_SIZE = 500
+
+
+def content_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode('utf-8')).hexdigest()
+
+
+def _insert_statement(dialect_name: str):
+    """이미 있는 키는 건너뜀 - 키가 (모델, 텍스트) 해시이므로 같은 키는 같은 벡터"""
+    stmt = pg_insert(EmbeddingCacheEntry) if dialect_name == 'postgresql' else sqlite_insert(EmbeddingCacheEntry)
+    return stmt.on_conflict_do_nothing(index_elements=['key'])
+
+
+class EmbeddingCache:
+    """내용 해시 -> 임베딩 영구 캐시 (DB 테이블)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, model: str, texts: list) -> dict:
+        """캐시에 있는 항목만 {인덱스: 벡터}로 반환"""
+        keys = [content_key(model, text) for text in texts]
+        found = {}
+        db = SessionLocal()
+        try:
+            for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+                batch = keys[start:start + LOOKUP_BATCH_SIZE]
+                rows = db.execute(
+                    select(EmbeddingCacheEntry.key, EmbeddingCacheEntry.vector)
+                    .where(EmbeddingCacheEntry.key.in_(batch))
+                ).all()
+                found.update({key: np.frombuffer(vector, dtype=np.float32).tolist() for key, vector in rows})
+        finally:
+            db.close()
+
+        result = {i: found[key] for i, key in enumerate(keys) if key in found}
+        with self._lock:
+            self.hits += len(result)
+            self.misses += len(keys) - len(result)
+        return result
+
+    def put_many(self, model: str, texts: list, vectors: list):
+        """일괄 insert 1회 (동시 업로드로 이미 저장된 키는 무시)"""
+        entries = {}
+        for text, vector in zip(texts, vectors):
+            array = np.asarray(vector, dtype=np.float32)
+            key = content_key(model, text)
+            entries[key] = {'key': key, 'model': model, 'dim': len(array), 'vector': array.tobytes()}
+        if not entries:
+            return
+        db = SessionLocal()
+        try:
+            db.execute(_insert_statement(db.get_bind().dialect.name), list(entries.values()))
+            db.commit()
+        finally:
+            db.close()
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
@@ -0,0 +1,137 @@
+import asyncio
+import importlib.util
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+# Ollama 임베딩 (기존 로컬 개발 환경)
+OLLAMA_EMBEDDING_MODEL = "nomic-embed-text"
+
+# 프로세스 내 임베딩 (sentence-transformers, CPU)
+LOCAL_EMBEDDING_MODEL = os.getenv("RAG_LOCAL_EMBED_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+LOCAL_EMBED_BATCH_SIZE = int(os.getenv("RAG_LOCAL_EMBED_BATCH_SIZE", "32"))
+# 인코딩 전용 스레드 수 (torch/onnxruntime가 내부적으로 코어를 모두 쓰므로 기본 1)
+LOCAL_EMBED_WORKERS = int(os.getenv("RAG_LOCAL_EMBED_WORKERS", "1"))
+# torch | onnx (onnx는 sentence-transformers 3.2+ 및 optimum[onnxruntime] 필요)
+LOCAL_EMBED_BACKEND = os.getenv("RAG_LOCAL_EMBED_BACKEND", "torch")
+# int8 양자화 - torch: Linear 동적 양자화, onnx: 양자화된 ONNX 파일 사용
+LOCAL_EMBED_QUANTIZE = os.getenv("RAG_LOCAL_EMBED_QUANTIZE", "0") == "1"
+LOCAL_EMBED_ONNX_FILE = os.getenv("RAG_LOCAL_EMBED_ONNX_FILE", "onnx/model_qint8_avx2.onnx")
+
+
+class EmbeddingProvider:
+    """텍스트 배치 -> 임베딩 (RAGEngine.get_embeddings가 캐시/배치 분할 후 호출)"""
+
+    name = 'base'
+    model = None
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+    async def warm(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+class OllamaEmbeddingProvider(EmbeddingProvider):
+    """Ollama 배치 임베딩 (/api/embed), 미지원 버전은 /api/embeddings 개별 호출"""
+
+    name = 'ollama'
+
+    def __init__(self, client, model: str = OLLAMA_EMBEDDING_MODEL):
+        # 공용 OllamaClient (동시 요청 수/타임아웃/서킷 브레이커 적용)
+        self.client = client
+        self.model = model
+        # None: 미확인, False: 구버전 Ollama (/api/embed 없음)
+        self._batch_embed = None
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if self._batch_embed is not False:
+            response = await self.client.post(
+                'embed', '/embed', {"model": self.model, "input": texts}, extra_timeout=len(texts)
+            )
+            if response.status_code != 404:
+                response.raise_for_status()
+                self._batch_embed = True
+                return response.json()["embeddings"]
+            self._batch_embed = False
+
+        async def embed_one(text: str) -> List[float]:
+            response = await self.client.post('embed', '/embeddings', {"model": self.model, "prompt": text})
+            response.raise_for_status()
+            return response.json()["embedding"]
+
+        return await asyncio.gather(*[embed_one(text) for text in texts])
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """sentence-transformers 모델을 프로세스 안에서 CPU로 실행
+
+    모델은 첫 사용 시 로드. 인코딩은 전용 스레드 풀에서 실행해 이벤트 루프를 막지 않음.
+    """
+
+    name = 'local'
+
+    def __init__(self, model: str = LOCAL_EMBEDDING_MODEL, batch_size: int = LOCAL_EMBED_BATCH_SIZE,
+                 backend: str = LOCAL_EMBED_BACKEND, quantize: bool = LOCAL_EMBED_QUANTIZE):
+        if not local_embedding_available():
+            raise RuntimeError("sentence-transformers가 설치되어 있지 않습니다.")
+        self.backend = backend
+        self.quantize = quantize
+        self.batch_size = batch_size
+        # 캐시 키/통계용 이름 (양자화 여부에 따라 벡터가 달라지므로 구분)
+        self.model_name = model
+        self.model = model + (f':{backend}' if backend != 'torch' else '') + (':int8' if quantize else '')
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=LOCAL_EMBED_WORKERS, thread_name_prefix='embed')
+
+    def _load(self):
+        with self._load_lock:
+            if self._model is not None:
+                return self._model
+            # torch import가 무거워 실제 사용 시점에 import
+            from sentence_transformers import SentenceTransformer
+            if self.backend == 'onnx':
+                model_kwargs = {'file_name': LOCAL_EMBED_ONNX_FILE} if self.quantize else None
+                model = SentenceTransformer(self.model_name, device='cpu', backend='onnx', model_kwargs=model_kwargs)
+            else:
+                model = SentenceTransformer(self.model_name, device='cpu')
+                if self.quantize:
+                    import torch
+                    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self._model = model
+            return model
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        model = self._load()
+        vectors = model.encode(texts, batch_size=self.batch_size, normalize_embeddings=True,
+                               convert_to_numpy=True, show_progress_bar=False)
+        return vectors.tolist()
+
+    async def warm(self):
+        """모델 미리 로드 (첫 질의 지연 방지)"""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._load)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._encode, texts)
+
+    async def close(self):
+        self._executor.shutdown(wait=False)
+
+
+def local_embedding_available() -> bool:
+    """sentence-transformers 설치 여부 (로컬 임베딩 미사용 시 설치 불필요)"""
+    return importlib.util.find_spec('sentence_transformers') is not None
+
+
+def create_embedding_provider(name: str, ollama_client=None) -> EmbeddingProvider:
+    """RAG_EMBEDDING_PROVIDER 설정에 맞는 임베딩 백엔드"""
+    if name == 'local':
+        return LocalEmbeddingProvider()
+    if name == 'ollama':
+        return OllamaEmbeddingProvider(ollama_client)
+    raise ValueError(f"지원하지 않는 임베딩 제공자: {name}")
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime
+from sqlalchemy.orm import Session
+from database import run_after_commit
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        # NumPy 스칼라
+        return value.item()
+    return str(value)
+
+
+def encode_sse(event_type: str, data) -> str:
+    """SSE 메시지 인코딩 (구독자 수와 무관하게 1회만 수행)"""
+    payload = json.dumps(data, default=_json_default, ensure_ascii=False)
+    return f"event: {event_type}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """구독자 1명 - 크기 제한 큐 (느린 소비자는 오래된 메시지부터 버림)"""
+
+    def __init__(self, line_id: str = None, max_queue: int = 100):
+        self.line_id = line_id
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.closed = False
+
+    def matches(self, line_id: str) -> bool:
+        return self.line_id is None or line_id is None or self.line_id == line_id
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class EventBroadcaster:
+    """프로세스 내 pub/sub - DB 쓰기 1회당 브로드캐스트 1회 (구독자별 팬아웃)"""
+
+    def __init__(self, max_queue: int = None, max_dropped: int = None):
+        self.max_queue = max_queue or int(os.getenv("STREAM_MAX_QUEUE", "100"))
+        # 누적 드롭이 이 값을 넘으면 구독 종료 (재연결 유도)
+        self.max_dropped = max_dropped or int(os.getenv("STREAM_MAX_DROPPED", "1000"))
+        self.subscribers = set()
+        self.loop = None
+        self._lock = threading.Lock()
+        self.published = 0
+        self.disconnected_slow = 0
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        """이벤트 루프 연결 (서버 시작 시)"""
+        self.loop = loop
+
+    def subscribe(self, line_id: str = None) -> Subscription:
+        subscription = Subscription(line_id, self.max_queue)
+        with self._lock:
+            self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self.subscribers.discard(subscription)
+
+    def publish(self, event_type: str, data, line_id: str = None):
+        """이벤트 발행 (스레드 안전 - 스레드풀의 sync 핸들러에서 호출 가능)"""
+        if self.loop is None or not self.subscribers:
+            return
+        message = encode_sse(event_type, data)
+        self.published += 1
+        try:
+            self.loop.call_soon_threadsafe(self._fan_out, line_id, message)
+        except RuntimeError:
+            # 루프 종료됨
+            pass
+
+    def _fan_out(self, line_id: str, message: str):
+        with self._lock:
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            if subscription.closed or not subscription.matches(line_id):
+                continue
+            if subscription.queue.full():
+                # 백프레셔: 가장 오래된 메시지를 버리고 최신 상태 유지
+                subscription.queue.get_nowait()
+                subscription.dropped += 1
+                if subscription.dropped > self.max_dropped:
+                    subscription.closed = True
+                    subscription.queue.put_nowait(None)
+                    self.disconnected_slow += 1
+                    continue
+            subscription.queue.put_nowait(message)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            subscribers = list(self.subscribers)
+        return {
+            'subscribers': len(subscribers),
+            'published': self.published,
+            'dropped': sum(s.dropped for s in subscribers),
+            'disconnected_slow': self.disconnected_slow
+        }
+
+
+event_bus = EventBroadcaster()
+
+
+def publish_after_commit(db: Session, event_type: str, data, line_id: str = None):
+    """트랜잭션 commit 이후에 발행 (rollback 시 폐기)"""
+    run_after_commit(db, lambda: event_bus.publish(event_type, data, line_id))
@@ -0,0 +1,164 @@
+import numpy as np
+
+TREE_LEAF = -1
+
+
+def _scaled_float32(x, mean: float, scale: float):
+    """sklearn 경로와 동일한 연산: StandardScaler(float64) 후 트리 입력 float32 변환"""
+    return np.float32((np.float64(x) - mean) / scale)
+
+
+def fold_threshold(threshold: float, mean: float, scale: float) -> float:
+    """스케일 공간 임계값을 원본 공간 임계값으로 변환
+
+    float32((x - mean) / scale) <= threshold 가 x <= 결과값 과 정확히 같아지는
+    가장 큰 float64 경계를 이분 탐색으로 찾는다 (연산이 단조 증가이므로 경계가 유일).
+    """
+    def below(x):
+        return _scaled_float32(x, mean, scale) <= threshold
+
+    guess = np.float64(threshold * scale + mean)
+    step = max(abs(guess), 1.0) * 1e-6
+
+    # 경계를 감싸는 구간 [lo, hi] 확보 (below(lo) 참, below(hi) 거짓)
+    lo, hi = guess, guess
+    while not below(lo):
+        lo = guess - step
+        step *= 2
+    while below(hi):
+        hi = guess + step
+        step *= 2
+
+    while True:
+        mid = lo + (hi - lo) / 2
+        if mid <= lo or mid >= hi:
+            return float(lo)
+        if below(mid):
+            lo = mid
+        else:
+            hi = mid
+
+
+class CompiledForest:
+    """RandomForest + StandardScaler를 평탄화한 NumPy 노드 배열 스코어러
+
+    모든 트리의 노드를 연속 배열(feature, threshold, left, right, value)로 저장하고
+    스케일러는 임계값에 미리 반영하므로 예측 시 sklearn을 거치지 않는다.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = max_depth
+        self.n_trees = len(roots)
+        # 단일 행 경로용 파이썬 리스트 (NumPy 호출 오버헤드 제거)
+        self._nodes = list(zip(feature.tolist(), threshold.tolist(), left.tolist(), right.tolist()))
+        self._values = value.tolist()
+        self._roots = roots.tolist()
+
+    @classmethod
+    def from_sklearn(cls, model, scaler) -> "CompiledForest":
+        """학습된 RandomForestClassifier / StandardScaler에서 변환"""
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(scaler.n_features_in_)
+        scale = scaler.scale_ if scaler.with_std else np.ones(scaler.n_features_in_)
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            is_leaf = tree.children_left == TREE_LEAF
+
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.intp)
+            threshold = np.array([
+                0.0 if is_leaf[i] else fold_threshold(tree.threshold[i], mean[feature[i]], scale[feature[i]])
+                for i in range(n_nodes)
+            ])
+            # 리프는 자기 자신을 가리키도록 하여 고정 깊이 순회 가능
+            node_ids = np.arange(n_nodes) + offset
+            left = np.where(is_leaf, node_ids, tree.children_left + offset)
+            right = np.where(is_leaf, node_ids, tree.children_right + offset)
+
+            # DecisionTreeClassifier.predict_proba와 동일한 리프 정규화
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(value)
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.intp),
+            classes=np.asarray(model.classes_),
+            max_depth=int(max_depth)
+        )
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """각 행/트리의 리프 노드 인덱스 (n, n_trees)"""
+        X = np.asarray(X, dtype=np.float64)
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        rows = np.arange(len(X))[:, np.newaxis]
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def _predict_proba_row(self, x: list) -> np.ndarray:
+        proba = [0.0] * len(self.classes_)
+        for node in self._roots:
+            for _ in range(self.max_depth):
+                feature, threshold, left, right = self._nodes[node]
+                node = left if x[feature] <= threshold else right
+            proba = [p + v for p, v in zip(proba, self._values[node])]
+        return np.array([[p / self.n_trees for p in proba]])
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """원본(스케일 전) 특성 행렬에 대한 클래스 확률"""
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) == 1:
+            return self._predict_proba_row(X[0].tolist())
+        leaves = self.apply(X)
+        # sklearn과 같은 순서로 트리별 누적 후 평균
+        proba = np.zeros((len(leaves), len(self.classes_)), dtype=np.float64)
+        for t in range(self.n_trees):
+            proba += self.value[leaves[:, t]]
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, path: str):
+        np.savez(
+            path,
+            feature=self.feature, threshold=self.threshold,
+            left=self.left, right=self.right, value=self.value,
+            roots=self.roots, classes=self.classes_, max_depth=self.max_depth
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledForest":
+        with np.load(path) as data:
+            return cls(
+                feature=data['feature'], threshold=data['threshold'],
+                left=data['left'], right=data['right'], value=data['value'],
+                roots=data['roots'], classes=data['classes'], max_depth=int(data['max_depth'])
+            )
@@ -0,0 +1,161 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+# 배치 크기 히스토그램 구간 (상한값)
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+
+class InferenceTimeout(Exception):
+    """대기 한도 안에 예측 결과를 받지 못함 (큐 적체/워커 정지)"""
+    pass
+
+
+class InferenceBatcher:
+    """동시 예측 요청을 모아 predict_batch 1회로 처리하는 마이크로 배치 큐"""
+
+    def __init__(self, model, max_batch_size: int = None, max_wait_ms: float = None, timeout: float = None):
+        self.model = model
+        self.max_batch_size = max_batch_size or int(os.getenv("INFERENCE_MAX_BATCH", "64"))
+        wait_ms = max_wait_ms if max_wait_ms is not None else float(os.getenv("INFERENCE_MAX_WAIT_MS", "2"))
+        self.max_wait = wait_ms / 1000.0
+        # predict() 결과 대기 한도 (초)
+        self.timeout = timeout if timeout is not None else float(os.getenv("INFERENCE_TIMEOUT", "5"))
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._running = False
+
+        # 통계
+        self.batch_histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.batch_histogram['+Inf'] = 0
+        self.total_requests = 0
+        self.total_batches = 0
+        self.max_queue_depth = 0
+        self.timeouts = 0
+        self.isolated_failures = 0
+
+    def start(self):
+        """워커 스레드 시작"""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._worker = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+            self._worker.start()
+
+    def is_running(self) -> bool:
+        return self._running and self._worker is not None and self._worker.is_alive()
+
+    def stop(self):
+        """워커 스레드 종료 (대기 중인 요청은 처리 후 종료)"""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+        self._queue.put(None)
+        self._worker.join(timeout=5)
+
+    def submit(self, data: dict) -> Future:
+        """예측 요청 등록 - 결과는 Future로 반환"""
+        if not self._running:
+            self.start()
+        future = Future()
+        self._queue.put((data, future))
+        depth = self._queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+        return future
+
+    def predict(self, data: dict) -> dict:
+        """요청 등록 후 결과 대기 (sync 핸들러용) - timeout 초과 시 InferenceTimeout"""
+        future = self.submit(data)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # 아직 배치에 들어가지 않았으면 취소해 워커가 건너뛰도록
+            future.cancel()
+            self.timeouts += 1
+            raise InferenceTimeout(f"예측 대기 시간 초과 ({self.timeout:g}초)")
+
+    def _collect(self, first) -> list:
+        """첫 요청 이후 max_wait 동안 또는 max_batch_size까지 요청 수집"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # 종료 신호 - 현재 배치는 마저 처리
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                if not self._running:
+                    break
+                continue
+
+            # 대기 한도를 넘겨 취소된 요청은 제외
+            batch = [(data, future) for data, future in self._collect(first)
+                     if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            self._record(len(batch))
+
+            try:
+                results = self.model.predict_batch([data for data, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                else:
+                    self._predict_each(batch)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _predict_each(self, batch: list):
+        """배치 실패 시 요청별로 다시 예측 - 잘못된 입력을 보낸 요청만 오류를 받음"""
+        for data, future in batch:
+            try:
+                future.set_result(self.model.predict_batch([data])[0])
+            except Exception as e:
+                self.isolated_failures += 1
+                future.set_exception(e)
+
+    def _record(self, size: int):
+        self.total_requests += size
+        self.total_batches += 1
+        for bucket in BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self.batch_histogram[bucket] += 1
+                return
+        self.batch_histogram['+Inf'] += 1
+
+    def get_stats(self) -> dict:
+        """큐 깊이 / 배치 크기 통계"""
+        return {
+            'queue_depth': self._queue.qsize(),
+            'max_queue_depth': self.max_queue_depth,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'total_requests': self.total_requests,
+            'total_batches': self.total_batches,
+            'timeouts': self.timeouts,
+            'isolated_failures': self.isolated_failures,
+            'avg_batch_size': round(self.total_requests / self.total_batches, 2) if self.total_batches else 0,
+            'batch_size_histogram': {str(k): v for k, v in self.batch_histogram.items()}
+        }
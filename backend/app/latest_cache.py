@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+import pandas as pd
+from sqlalchemy.orm import Session
+from database import SMTData, LineStats, run_after_commit
+from storage import reading_repository
+
+# 캐시 항목 유효 시간 (초) - 0이면 만료 없음 (단일 프로세스).
+# 워커가 여러 개면 다른 워커가 저장한 데이터는 이 캐시에 반영되지 않으므로 짧게 설정 (예: 2)
+LATEST_CACHE_TTL = float(os.getenv("LATEST_CACHE_TTL", "0"))
+
+READING_FIELDS = (
+    'id', 'timestamp', 'line_id', 'temperature', 'vibration', 'current',
+    'production_count', 'defect_count', 'cycle_time', 'pressure', 'humidity',
+    'failure_occurred', 'predicted_failure', 'failure_probability'
+)
+
+
+class LatestReading:
+    """SMTData와 같은 속성을 가진 경량 레코드 (세션/ORM 상태 없음)"""
+    __slots__ = READING_FIELDS
+
+    def __init__(self, **values):
+        for field in READING_FIELDS:
+            setattr(self, field, values.get(field))
+
+    @classmethod
+    def from_orm(cls, data: SMTData) -> "LatestReading":
+        return cls(**{field: getattr(data, field) for field in READING_FIELDS})
+
+
+def reading_dict(data) -> dict:
+    """실시간 응답/'reading' 이벤트 본문 (SMTData, LatestReading 공통)"""
+    return {
+        'line_id': data.line_id,
+        'timestamp': data.timestamp,
+        'temperature': data.temperature,
+        'vibration': data.vibration,
+        'current': data.current,
+        'production_count': data.production_count,
+        'defect_count': data.defect_count,
+        'cycle_time': data.cycle_time,
+        'pressure': data.pressure,
+        'humidity': data.humidity,
+        'predicted_failure': data.predicted_failure,
+        'failure_probability': data.failure_probability
+    }
+
+
+class LatestReadingCache:
+    """라인별 최신 데이터 캐시 - /api/monitor/realtime을 메모리에서 O(1)로 응답
+
+    프로세스별 캐시: 이 프로세스의 insert 경로만 갱신함. 미스(없는 라인, 만료된 항목)는
+    "데이터 없음"이 아니라 DB에서 다시 읽어야 한다는 뜻 (호출자가 read-through 후 update).
+    """
+
+    def __init__(self, ttl: float = None):
+        self._latest = {}
+        self._lock = threading.Lock()
+        self.ttl = ttl if ttl is not None else LATEST_CACHE_TTL
+        self.warmed = False
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, line_id: str):
+        """캐시된 최신 데이터 - 없거나 만료됐으면 None (DB 조회 필요)"""
+        entry = self._latest.get(line_id)
+        if entry is not None and self.ttl and time.monotonic() - entry[1] > self.ttl:
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def update(self, record: LatestReading):
+        """더 최신(timestamp 기준)이거나 같은 경우에만 교체 (같으면 유효 시간만 갱신)"""
+        with self._lock:
+            current = self._latest.get(record.line_id)
+            if current is None or record.timestamp >= current[0].timestamp:
+                self._latest[record.line_id] = (record, time.monotonic())
+
+    def update_after_commit(self, db: Session, records: list):
+        run_after_commit(db, lambda: [self.update(record) for record in records])
+
+    def warm(self, db: Session):
+        """DB에서 라인별 최신 1건 로드 (서버 시작 시)"""
+        line_ids = [line_id for (line_id,) in db.query(LineStats.line_id).all()]
+        latest = {}
+        now = time.monotonic()
+        for line_id in line_ids:
+            data = reading_repository.latest(db, line_id)
+            if data is not None:
+                latest[line_id] = (LatestReading.from_orm(data), now)
+        with self._lock:
+            self._latest = latest
+            self.warmed = True
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'lines': len(self._latest),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
+
+
+def latest_records_from_dataframe(df: pd.DataFrame, timestamps) -> list:
+    """일괄 적재 DataFrame에서 라인별 최신 행을 LatestReading으로 추출"""
+    if len(df) == 0:
+        return []
+    # 라인/시각만으로 최신 행 위치를 찾은 뒤 해당 행만 꺼냄 (전체 행 timestamp 변환 없음)
+    keys = pd.DataFrame({'line_id': df['line_id'].to_numpy(),
+                         'reading_ts': pd.DatetimeIndex(timestamps).to_numpy()})
+    # 같은 timestamp면 나중 행 우선
+    positions = keys.iloc[::-1].sort_values('reading_ts', kind='stable', ascending=False)\
+        .drop_duplicates('line_id').index
+    last_rows = df.iloc[positions].assign(reading_ts=keys['reading_ts'].to_numpy()[positions])
+    records = []
+    for row in last_rows.itertuples(index=False):
+        values = row._asdict()
+        records.append(LatestReading(
+            timestamp=pd.Timestamp(values['reading_ts']).to_pydatetime(),
+            line_id=values['line_id'],
+            temperature=float(values['temperature']),
+            vibration=float(values['vibration']),
+            current=float(values['current']),
+            production_count=int(values['production_count']),
+            defect_count=int(values['defect_count']),
+            cycle_time=float(values['cycle_time']),
+            pressure=float(values['pressure']),
+            humidity=float(values['humidity']),
+            failure_occurred=bool(values['failure_occurred']),
+            predicted_failure=bool(values.get('predicted_failure', False)),
+            failure_probability=float(values.get('failure_probability', 0.0))
+        ))
+    return records
+
+
+latest_readings = LatestReadingCache()
@@ -0,0 +1,154 @@
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+# BM25 파라미터
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# 수치+단위 ("230°c", "0.7mm/s", "15-25a"), 영문/숫자 단어, 한글 어절
+_TOKEN_PATTERN = re.compile(
+    r'\d+(?:\.\d+)?(?:-\d+(?:\.\d+)?)?(?:°c|mm/s|mpa|%|a|v|초|개월|년|개)?|[a-z][a-z0-9_\-]*|[가-힣]+'
+)
+# 자주 쓰이는 조사/어미 (어절 끝에서 한 번만 제거)
+_JOSA = sorted([
+    '으로', '에서', '에게', '까지', '부터', '이며', '이고', '하고', '하여', '이나',
+    '은', '는', '이', '가', '을', '를', '에', '의', '로', '와', '과', '도', '만', '시'
+], key=len, reverse=True)
+
+
+def _strip_josa(word: str) -> str:
+    for suffix in _JOSA:
+        if len(word) > len(suffix) + 1 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> list:
+    """검색용 토큰 - 수치/단위는 통째로(+숫자만), 한글은 조사 제거한 어절 + 음절 bigram"""
+    text = unicodedata.normalize('NFKC', text).lower()
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text):
+        if token[0].isdigit():
+            tokens.append(token)
+            number = re.match(r'\d+(?:\.\d+)?', token).group()
+            if number != token:
+                tokens.append(number)
+        elif '가' <= token[0] <= '힣':
+            stem = _strip_josa(token)
+            tokens.append(stem)
+            # 띄어쓰기/복합어 차이 대응 ("베어링교체" ~ "베어링 교체")
+            if len(stem) > 2:
+                tokens.extend(stem[i:i + 2] for i in range(len(stem) - 1))
+        else:
+            tokens.append(token)
+    return tokens
+
+
+class BM25Index:
+    """프로세스 내 역색인 (청크 id -> 토큰 빈도), JSON 파일로 저장"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.documents = {}      # id -> {'content', 'metadata', 'length'}
+        self.postings = {}       # 토큰 -> {id: 빈도}
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.documents)
+
+    def _add(self, doc_id: str, content: str, metadata: dict):
+        counts = Counter(tokenize(content))
+        length = sum(counts.values())
+        self.documents[doc_id] = {'content': content, 'metadata': metadata, 'length': length, 'terms': list(counts)}
+        self.total_length += length
+        for term, count in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = count
+
+    def _remove(self, doc_id: str):
+        document = self.documents.pop(doc_id, None)
+        if document is None:
+            return
+        self.total_length -= document['length']
+        for term in document['terms']:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+
+    def upsert(self, ids: list, contents: list, metadatas: list):
+        with self._lock:
+            for doc_id, content, metadata in zip(ids, contents, metadatas):
+                self._remove(doc_id)
+                self._add(doc_id, content, metadata)
+
+    def delete(self, ids: list):
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def clear(self):
+        with self._lock:
+            self.documents = {}
+            self.postings = {}
+            self.total_length = 0
+
+    def search(self, query: str, top_k: int = 3) -> list:
+        """[(id, 점수)] 점수 내림차순"""
+        with self._lock:
+            if not self.documents:
+                return []
+            n = len(self.documents)
+            average_length = self.total_length / n or 1
+            scores = {}
+            for term in set(tokenize(query)):
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, count in posting.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.documents[doc_id]['length'] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * count * (BM25_K1 + 1) / (count + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    def get(self, doc_id: str) -> dict:
+        document = self.documents.get(doc_id)
+        if document is None:
+            return None
+        return {'id': doc_id, 'content': document['content'], 'metadata': document['metadata']}
+
+    # ---------- 저장 ----------
+
+    def save(self):
+        with self._lock:
+            data = {doc_id: [doc['content'], doc['metadata']] for doc_id, doc in self.documents.items()}
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+    def load(self) -> bool:
+        """저장된 색인 로드 (토큰화는 로드 시 다시 수행 - 토크나이저 변경에도 안전)"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        self.clear()
+        self.upsert(list(data), [value[0] for value in data.values()], [value[1] for value in data.values()])
+        return True
+
+
+def reciprocal_rank_fusion(rankings: list, k: int = 60) -> list:
+    """여러 순위 목록(id 리스트)을 RRF 점수로 합침 -> [(id, 점수)]"""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
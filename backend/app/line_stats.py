@@ -0,0 +1,115 @@
+import os
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from database import LineStats
+from storage import reading_repository
+from event_bus import publish_after_commit
+
+# 시작 시 카운터를 smt_data(+아카이브)에서 강제로 다시 계산 (기본: 테이블이 비어 있을 때만)
+LINE_STATS_REBUILD = os.getenv("LINE_STATS_REBUILD", "0").lower() in ("1", "true", "yes")
+
+
+def count_dataframe_by_line(df) -> dict:
+    """DataFrame을 라인별 (total, failures)로 집계"""
+    if len(df) == 0:
+        return {}
+    failures = df['failure_occurred'].astype(bool)
+    grouped = failures.groupby(df['line_id']).agg(['size', 'sum'])
+    return {
+        str(line_id): (int(row['size']), int(row['sum']))
+        for line_id, row in grouped.iterrows()
+    }
+
+
+def _upsert_statement(dialect_name: str, increment: bool):
+    """라인 카운터 upsert - increment면 기존 값에 더하고, 아니면 덮어씀"""
+    stmt = pg_insert(LineStats) if dialect_name == 'postgresql' else sqlite_insert(LineStats)
+    table = LineStats.__table__
+    excluded = stmt.excluded
+    if increment:
+        updates = {'total': table.c.total + excluded.total, 'failures': table.c.failures + excluded.failures}
+    else:
+        updates = {'total': excluded.total, 'failures': excluded.failures}
+    return stmt.on_conflict_do_update(index_elements=['line_id'], set_=updates)
+
+
+def increment_line_stats(db: Session, counts: dict):
+    """라인별 카운터 증분 (commit은 호출자가 수행 - insert와 같은 트랜잭션)
+
+    INSERT ... ON CONFLICT DO UPDATE 한 번 - 새 라인의 첫 insert가 동시에 와도 충돌 없음.
+    """
+    if not counts:
+        return
+    db.execute(_upsert_statement(db.get_bind().dialect.name, increment=True), [
+        {'line_id': line_id, 'total': total, 'failures': failures}
+        for line_id, (total, failures) in counts.items()
+    ])
+    
+    # 구독자에게 증분만 전달
+    publish_after_commit(db, 'stats', {
+        line_id: {'total': total, 'failures': failures}
+        for line_id, (total, failures) in counts.items()
+    })
+
+
+def rebuild_line_stats(db: Session, force: bool = LINE_STATS_REBUILD) -> bool:
+    """smt_data 전체를 한 번의 GROUP BY 집계로 다시 계산 (서버 시작 시)
+
+    카운터는 insert와 같은 트랜잭션에서 증분되므로 평소에는 다시 계산하지 않음 -
+    테이블이 비어 있거나(기존 DB 최초 1회) force일 때만. 여러 워커가 동시에 시작해도
+    upsert로 같은 값을 쓰므로 충돌 없음.
+    """
+    if not force and db.query(LineStats.line_id).first() is not None:
+        return False
+    rows = [
+        {'line_id': line_id, 'total': total, 'failures': failures or 0}
+        for line_id, total, failures in reading_repository.line_counts(db)
+        if line_id is not None
+    ]
+
+    if force:
+        db.query(LineStats).delete(synchronize_session=False)
+    if rows:
+        db.execute(_upsert_statement(db.get_bind().dialect.name, increment=False), rows)
+    db.commit()
+    return True
+
+
+def _summary(lines: list, recent: int) -> dict:
+    line_stats = {
+        line.line_id: {'total': line.total, 'failures': line.failures}
+        for line in lines
+    }
+    total = sum(s['total'] for s in line_stats.values())
+    failures = sum(s['failures'] for s in line_stats.values())
+
+    return {
+        'total_records': total,
+        'total_failures': failures,
+        'failure_rate': round(failures / total * 100, 2) if total > 0 else 0,
+        'recent_24h': recent,
+        'lines': line_stats
+    }
+
+
+def get_stats_summary(db: Session) -> dict:
+    """통계 요약 - 라인 수에 비례 (smt_data 크기와 무관)"""
+    lines = db.execute(select(LineStats).order_by(LineStats.line_id)).scalars().all()
+
+    # 최근 24시간 데이터 (timestamp 범위 조건)
+    recent_time = datetime.now() - timedelta(hours=24)
+    recent = reading_repository.count_since(db, recent_time)
+    return _summary(lines, recent)
+
+
+async def get_stats_summary_async(db: AsyncSession) -> dict:
+    """get_stats_summary의 AsyncSession 버전"""
+    lines = (await db.execute(select(LineStats).order_by(LineStats.line_id))).scalars().all()
+
+    recent_time = datetime.now() - timedelta(hours=24)
+    recent = await reading_repository.count_since_async(db, recent_time)
+    return _summary(lines, recent)
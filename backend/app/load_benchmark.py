@@ -0,0 +1,109 @@
+"""대시보드 폴링 부하 벤치마크 - 동기(스레드풀) vs 비동기(AsyncSession) 조회 비교
+
+모드별로 서버를 띄우고(DB_ASYNC=0/1) 동시 폴러가 조회 엔드포인트를 반복 호출:
+
+    python load_benchmark.py --pollers 500 --duration 20
+
+이미 떠 있는 서버 하나만 측정하려면 --url 지정.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import httpx
+import numpy as np
+
+# 대시보드 1회 갱신에 해당하는 조회
+POLL_PATHS = [
+    "/api/monitor/realtime?line_id={line}",
+    "/api/data/stats",
+    "/api/monitor/chart?line_id={line}&hours=24",
+    "/api/data/list?limit=20&line_id={line}",
+]
+LINES = ["LINE_01", "LINE_02", "LINE_03"]
+
+
+async def _poller(client: httpx.AsyncClient, index: int, deadline: float, interval: float, results: dict):
+    line = LINES[index % len(LINES)]
+    while time.perf_counter() < deadline:
+        for path in POLL_PATHS:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path.format(line=line))
+                error = None if response.status_code == 200 else str(response.status_code)
+            except httpx.HTTPError as e:
+                error = type(e).__name__
+            results['latencies'].append(time.perf_counter() - start)
+            if error:
+                results['errors'][error] = results['errors'].get(error, 0) + 1
+        if interval:
+            await asyncio.sleep(interval)
+
+
+async def run_load(url: str, pollers: int, duration: float, interval: float) -> dict:
+    results = {'latencies': [], 'errors': {}}
+    limits = httpx.Limits(max_connections=pollers, max_keepalive_connections=pollers)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*[
+            _poller(client, i, deadline, interval, results) for i in range(pollers)
+        ])
+        elapsed = time.perf_counter() - started
+
+    latencies = np.array(results['latencies']) * 1000
+    return {
+        'requests': len(latencies),
+        'errors': results['errors'],
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 1) if len(latencies) else None,
+        'p95_ms': round(float(np.percentile(latencies, 95)), 1) if len(latencies) else None,
+        'p99_ms': round(float(np.percentile(latencies, 99)), 1) if len(latencies) else None,
+    }
+
+
+def _start_server(port: int, async_db: bool) -> subprocess.Popen:
+    env = dict(os.environ, DB_ASYNC="1" if async_db else "0")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(120):
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("서버가 시작되지 않았습니다.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pollers", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--interval", type=float, default=1.0, help="폴러별 갱신 간격 (초, 0이면 쉬지 않음)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", help="이미 실행 중인 서버 주소 (모드 비교 생략)")
+    args = parser.parse_args()
+
+    if args.url:
+        print(asyncio.run(run_load(args.url, args.pollers, args.duration, args.interval)))
+        return
+
+    for async_db in (False, True):
+        process = _start_server(args.port, async_db)
+        try:
+            result = asyncio.run(run_load(f"http://127.0.0.1:{args.port}", args.pollers, args.duration, args.interval))
+        finally:
+            process.terminate()
+            process.wait()
+        print(f"{'async' if async_db else 'sync '}: {result}")
+
+
+if __name__ == "__main__":
+    main()
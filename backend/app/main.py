@@ -1,22 +1,39 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from typing import List
-import pandas as pd
 from datetime import datetime, timedelta
-import io
 import os
+import time
+import asyncio
+import anyio
+import httpx
 
-from database import get_db, SMTData, TrainingHistory
+from database import get_db, engine, SessionLocal, SMTData, TrainingHistory, USE_ASYNC_DB, AsyncSessionLocal, async_engine
 from schemas import (
     SMTDataCreate, SMTDataResponse, PredictionRequest, PredictionResponse,
-    TrainingRequest, TrainingResponse, RAGQueryRequest, RAGQueryResponse,
+    BatchPredictionRequest, BatchPredictionResponse,
+    TrainingRequest, TrainingResponse, TrainingJobResponse, RAGQueryRequest, RAGQueryResponse,
     DocumentUploadResponse
 )
 from data_generator import SMTDataGenerator
 from ml_model import FailurePredictionModel
-from rag_engine import RAGEngine, create_initial_manual
+from rag_engine import RAGEngine, create_initial_manual, RAG_PREPARE_RETRY
+from ollama_client import OllamaUnavailable
+from line_stats import increment_line_stats, rebuild_line_stats, get_stats_summary, get_stats_summary_async
+from data_ingest import ingest_csv, DEFAULT_CHUNK_SIZE
+from inference_queue import InferenceBatcher, InferenceTimeout
+from training_jobs import TrainingJobManager
+from training_data import TRAINING_MODES
+from event_bus import event_bus, encode_sse, publish_after_commit
+from latest_cache import latest_readings, LatestReading, reading_dict
+from storage import reading_repository
+from archive import ARCHIVE_RETENTION_DAYS
+from rollup import update_rollups, rebuild_rollups, query_chart, query_chart_async, CHART_RESOLUTIONS, DEFAULT_MAX_POINTS
+from metrics import registry, MetricsMiddleware, cache_hit_ratio_samples, cache_request_samples
 
 app = FastAPI(title="NEXIO.HUB", version="2.0.0")
 
@@ -32,25 +49,130 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 라우트별 요청 지연 / DB 쿼리 엔드포인트 라벨 (/metrics)
+app.add_middleware(MetricsMiddleware)
+
 # 전역 객체
 ml_model = FailurePredictionModel()
+inference_batcher = InferenceBatcher(ml_model)
+training_jobs = TrainingJobManager(ml_model)
 rag_engine = RAGEngine()
 data_generator = SMTDataGenerator()
+started_at = time.time()
+rag_prepare_task = None
+
+# ========== 지표 (/metrics 요청 시 수집) ==========
+
+CIRCUIT_STATES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+def _threadpool_samples():
+    """sync 핸들러/run_in_threadpool이 쓰는 anyio 기본 스레드풀 포화도"""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    statistics = limiter.statistics()
+    samples = [
+        ({'pool': 'anyio', 'state': 'size'}, limiter.total_tokens),
+        ({'pool': 'anyio', 'state': 'busy'}, statistics.borrowed_tokens),
+        ({'pool': 'anyio', 'state': 'waiting'}, statistics.tasks_waiting),
+        ({'pool': 'inference_queue', 'state': 'waiting'}, inference_batcher.get_stats()['queue_depth']),
+    ]
+    if hasattr(engine.pool, 'checkedout'):
+        samples += [
+            ({'pool': 'db', 'state': 'size'}, engine.pool.size() + max(engine.pool.overflow(), 0)),
+            ({'pool': 'db', 'state': 'busy'}, engine.pool.checkedout()),
+        ]
+    return samples
+
+def _cache_stats() -> dict:
+    caches = {'latest_reading': latest_readings.get_stats()}
+    if rag_engine.enabled:
+        caches.update({f'rag_{name}': stats for name, stats in rag_engine.get_cache_stats().items()})
+    return caches
+
+def _ollama_samples(key: str):
+    if rag_engine.ollama is None:
+        return []
+    stats = rag_engine.ollama.get_stats()
+    if key == 'circuit':
+        return [({}, CIRCUIT_STATES[stats['circuit']['state']])]
+    if key == 'in_flight':
+        return [({'operation': operation}, count) for operation, count in stats['in_flight'].items()]
+    return [({'reason': 'queue_full'}, stats['queue_rejected']),
+            ({'reason': 'circuit_open'}, stats['circuit']['rejected'])]
+
+registry.collect('threadpool_workers', '스레드풀/커넥션 풀/추론 큐 사용량 (size/busy/waiting)', _threadpool_samples, ('pool', 'state'))
+registry.collect('cache_hit_ratio', '캐시 적중률', lambda: cache_hit_ratio_samples(_cache_stats()), ('cache',))
+registry.collect('cache_requests_total', '캐시 조회 수', lambda: cache_request_samples(_cache_stats()), ('cache', 'result'), type='counter')
+registry.collect('ollama_circuit_state', 'Ollama 서킷 상태 (0 closed, 1 half_open, 2 open)', lambda: _ollama_samples('circuit'))
+registry.collect('ollama_requests_in_flight', 'Ollama 진행 중 요청 수', lambda: _ollama_samples('in_flight'), ('operation',))
+registry.collect('ollama_rejected_total', 'Ollama 호출 없이 거절된 요청 수', lambda: _ollama_samples('rejected'), ('reason',), type='counter')
+registry.collect('rag_generation_fallbacks_total', '생성 대신 검색 결과로 응답한 수',
+                 lambda: [({}, rag_engine.generation_fallbacks)], type='counter')
+
+async def _prepare_rag(manual_path: str):
+    """임베딩 모델 로드 + 매뉴얼 동기화 - 서버 시작을 막지 않도록 백그라운드에서 실행
+    
+    모델 로드 실패(HF hub 접속 불가 등)나 Ollama 장애로 재임베딩/동기화가 안 되면
+    그동안은 키워드 검색만 사용하고 주기적으로 재시도.
+    """
+    with open(manual_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    metadata = {'filename': 'smt_manual.txt', 'type': 'manual'}
+    
+    keywords_indexed = False
+    while True:
+        try:
+            if await rag_engine.prepare():
+                # 매뉴얼 동기화 (바뀐 청크만 반영, 변경 없으면 임베딩 호출 없음)
+                await rag_engine.add_document(content, metadata)
+                return
+        except (OllamaUnavailable, httpx.HTTPError) as e:
+            print(f"⚠️  RAG sync postponed ({type(e).__name__}: {e}), retrying in {RAG_PREPARE_RETRY:.0f}s")
+        if not keywords_indexed:
+            # 준비 전에도 매뉴얼은 키워드 검색 가능하게
+            await rag_engine.add_document_keywords(content, metadata)
+            keywords_indexed = True
+        await asyncio.sleep(RAG_PREPARE_RETRY)
 
 @app.on_event("startup")
 async def startup_event():
     """서버 시작 시 초기화"""
+    # 추론 배치 큐 시작
+    inference_batcher.start()
+    
+    # 실시간 스트림 브로드캐스터를 이벤트 루프에 연결
+    event_bus.bind_loop(asyncio.get_running_loop())
+    
+    # 라인별 통계 카운터 재계산 (비어 있거나 LINE_STATS_REBUILD=1일 때만)
+    db = SessionLocal()
+    try:
+        # 중단된 아카이브 실행 정리 (통계 재계산 전에)
+        reading_repository.recover_archive(db)
+        rebuild_line_stats(db)
+        # 차트 롤업 테이블 (비어 있으면 원본에서 재구성)
+        rebuild_rollups(db)
+        # 라인별 최신 데이터 캐시 적재
+        latest_readings.warm(db)
+    finally:
+        db.close()
+    
     # 초기 매뉴얼 생성 및 RAG 등록
     manual_path = create_initial_manual()
     
-    # 기존 문서 수 확인
-    if rag_engine.get_document_count() == 0:
-        with open(manual_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        await rag_engine.add_document(
-            content, 
-            {'filename': 'smt_manual.txt', 'type': 'manual'}
-        )
+    # Ollama 연결 풀 생성, 임베딩 모델 로드/재임베딩/매뉴얼 동기화는 백그라운드
+    global rag_prepare_task
+    await rag_engine.start()
+    rag_prepare_task = asyncio.create_task(_prepare_rag(manual_path))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """서버 종료 시 정리"""
+    inference_batcher.stop()
+    training_jobs.shutdown()
+    if rag_prepare_task is not None:
+        rag_prepare_task.cancel()
+    await rag_engine.close()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 # ========== 헬스체크 (Keep-Alive용) ==========
 
@@ -67,52 +189,80 @@ def root():
 
 @app.get("/health", tags=["System"])
 def health_check():
-    """Health check endpoint for keep-alive monitoring"""
-    return {
-        "status": "healthy",
+    """Health check endpoint for keep-alive monitoring
+    
+    DB는 SELECT 1, 나머지는 메모리 상태만 확인 (Ollama 등 외부 호출 없음).
+    DB/추론 워커 장애 시 503, 모델 미학습/Ollama 서킷 열림은 degraded.
+    """
+    started = time.perf_counter()
+    try:
+        db = SessionLocal()
+        try:
+            db.execute(text("SELECT 1"))
+        finally:
+            db.close()
+        database = "connected"
+    except Exception as e:
+        database = f"error: {type(e).__name__}"
+    database_ms = round((time.perf_counter() - started) * 1000, 2)
+    
+    model = "loaded" if ml_model.model is not None else "not_trained"
+    inference = "running" if inference_batcher.is_running() else "stopped"
+    if not rag_engine.enabled:
+        rag = "disabled"
+    elif not rag_engine.embedder_ready:
+        rag = "keyword search only (embedding model not ready)"
+    elif rag_engine.ollama is not None and rag_engine.ollama.breaker.state != 'closed':
+        rag = f"ollama circuit {rag_engine.ollama.breaker.state}"
+    else:
+        rag = "ok"
+    
+    if database != "connected" or inference != "running":
+        status = "unhealthy"
+    elif model != "loaded" or rag not in ("ok", "disabled"):
+        status = "degraded"
+    else:
+        status = "healthy"
+    
+    result = {
+        "status": status,
         "service": "eva-nexio-hub-backend",
         "timestamp": datetime.now().isoformat(),
-        "uptime": "running",
-        "database": "connected",
-        "ml_model": "loaded",
-        "rag_engine": "initialized"
+        "uptime_seconds": round(time.time() - started_at, 1),
+        "database": database,
+        "database_latency_ms": database_ms,
+        "ml_model": model,
+        "inference_queue": inference,
+        "rag_engine": rag
     }
+    return JSONResponse(result, status_code=503 if status == "unhealthy" else 200)
+
+@app.get("/metrics", tags=["System"])
+async def get_metrics():
+    """Prometheus 지표 (요청/DB 쿼리/추론·RAG 단계 지연, 스레드풀 포화도, 캐시 적중률)"""
+    return Response(registry.render(), media_type=registry.CONTENT_TYPE)
 
 # ========== 데이터 관리 ==========
 
 @app.post("/api/data/upload-csv", tags=["Data"])
-async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    """CSV 파일 업로드"""
+def upload_csv(
+    file: UploadFile = File(...),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    db: Session = Depends(get_db)
+):
+    """CSV 파일 업로드 (청크 단위 스트리밍 적재, 오류 시 전체 취소)"""
     try:
-        contents = await file.read()
-        df = pd.read_csv(io.BytesIO(contents))
-        
-        required_columns = ['line_id', 'temperature', 'vibration', 'current', 
-                          'production_count', 'defect_count', 'cycle_time', 
-                          'pressure', 'humidity', 'failure_occurred']
-        
-        if not all(col in df.columns for col in required_columns):
-            raise HTTPException(status_code=400, detail="CSV 형식이 올바르지 않습니다.")
-        
-        count = 0
-        for _, row in df.iterrows():
-            smt_data = SMTData(
-                line_id=row['line_id'],
-                temperature=float(row['temperature']),
-                vibration=float(row['vibration']),
-                current=float(row['current']),
-                production_count=int(row['production_count']),
-                defect_count=int(row['defect_count']),
-                cycle_time=float(row['cycle_time']),
-                pressure=float(row['pressure']),
-                humidity=float(row['humidity']),
-                failure_occurred=bool(row['failure_occurred'])
-            )
-            db.add(smt_data)
-            count += 1
-        
-        db.commit()
-        return {"success": True, "count": count, "message": f"{count}개 데이터 업로드 완료"}
+        result = ingest_csv(db, file.file, chunk_size)
+        return {
+            "success": True,
+            "count": result['count'],
+            "rejected": result['rejected'],
+            "chunks": result['chunks'],
+            "rows_per_sec": result['rows_per_sec'],
+            "message": f"{result['count']}개 데이터 업로드 완료 (거부 {result['rejected']}개)"
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -136,7 +286,7 @@ def add_smt_data(data: SMTDataCreate, db: Session = Depends(get_db)):
     """수동 데이터 추가"""
     try:
         # 예측 실행
-        prediction = ml_model.predict(data.dict())
+        prediction = inference_batcher.predict(data.dict())
         
         # DB 저장
         smt_data = SMTData(
@@ -144,110 +294,188 @@ def add_smt_data(data: SMTDataCreate, db: Session = Depends(get_db)):
             predicted_failure=prediction['predicted_failure'],
             failure_probability=prediction['failure_probability']
         )
-        db.add(smt_data)
+        reading_repository.add(db, smt_data)
+        increment_line_stats(db, {data.line_id: (1, int(data.failure_occurred))})
+        record = LatestReading.from_orm(smt_data)
+        update_rollups(db, [record.line_id], [record.timestamp], {
+            'temperature': [record.temperature],
+            'vibration': [record.vibration],
+            'current': [record.current],
+            'failure_probability': [record.failure_probability]
+        })
+        latest_readings.update_after_commit(db, [record])
+        publish_after_commit(db, 'reading', reading_dict(record), data.line_id)
         db.commit()
         db.refresh(smt_data)
         
         return smt_data
+    except InferenceTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _run_query(sync_query, async_query, *args):
+    """조회 실행 - DB_ASYNC=1이면 AsyncSession(이벤트 루프), 아니면 동기 Session(스레드풀)"""
+    if USE_ASYNC_DB:
+        async with AsyncSessionLocal() as db:
+            return await async_query(db, *args)
+    
+    def run():
+        db = SessionLocal()
+        try:
+            return sync_query(db, *args)
+        finally:
+            db.close()
+    return await run_in_threadpool(run)
+
 @app.get("/api/data/list", response_model=List[SMTDataResponse], tags=["Data"])
-def get_data_list(
+async def get_data_list(
     skip: int = 0, 
     limit: int = 100, 
-    line_id: str = None,
-    db: Session = Depends(get_db)
+    line_id: str = None
 ):
     """데이터 조회"""
-    query = db.query(SMTData)
-    
-    if line_id:
-        query = query.filter(SMTData.line_id == line_id)
+    return await _run_query(
+        reading_repository.list_readings, reading_repository.list_readings_async,
+        skip, limit, line_id
+    )
+
+@app.post("/api/data/archive", tags=["Data"])
+def archive_old_data(
+    retention_days: int = ARCHIVE_RETENTION_DAYS,
+    compact: bool = False,
+    db: Session = Depends(get_db)
+):
+    """보존 기간이 지난 원본 데이터를 Parquet 아카이브로 이동 (학습/차트 조회에는 계속 포함)"""
+    if retention_days < 1:
+        raise HTTPException(status_code=400, detail="retention_days는 1 이상이어야 합니다.")
+    if reading_repository.archive is None:
+        raise HTTPException(status_code=400, detail="pyarrow가 설치되지 않아 아카이브를 사용할 수 없습니다.")
     
-    data = query.order_by(SMTData.timestamp.desc()).offset(skip).limit(limit).all()
-    return data
+    try:
+        cutoff = datetime.now() - timedelta(days=retention_days)
+        result = reading_repository.archive_before(db, cutoff)
+        if compact:
+            reading_repository.compact(db)
+        result['compacted'] = compact
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/data/archive/stats", tags=["Data"])
+def get_archive_stats():
+    """Parquet 아카이브 파일/행 수"""
+    if reading_repository.archive is None:
+        return {'enabled': False}
+    return reading_repository.archive.get_stats()
 
 @app.get("/api/data/stats", tags=["Data"])
-def get_stats(db: Session = Depends(get_db)):
+async def get_stats():
     """통계 정보"""
-    total = db.query(SMTData).count()
-    failures = db.query(SMTData).filter(SMTData.failure_occurred == True).count()
-    
-    # 최근 24시간 데이터
-    recent_time = datetime.now() - timedelta(hours=24)
-    recent = db.query(SMTData).filter(SMTData.timestamp >= recent_time).count()
+    return await _run_query(get_stats_summary, get_stats_summary_async)
+
+# ========== 실시간 모니터링 ==========
+
+def _realtime_response(data, line_id: str) -> dict:
+    if not data:
+        # 저장된 데이터가 없는 라인 - 임의 샘플 대신 값이 없음을 명시
+        response = {key: None for key in reading_dict(LatestReading())}
+        response.update(line_id=line_id, no_data=True)
+        return response
     
-    # 라인별 통계
-    lines = db.query(SMTData.line_id).distinct().all()
-    line_stats = {}
+    return reading_dict(data)
+
+def _cache_latest(data):
+    """DB에서 읽은 최신 데이터를 캐시에 반영 (다른 워커가 저장한 라인도 이후 적중)"""
+    if data is None:
+        return None
+    record = LatestReading.from_orm(data)
+    latest_readings.update(record)
+    return record
+
+def _realtime_reading(db: Session, line_id: str) -> dict:
+    data = latest_readings.get(line_id)
+    if data is None:
+        data = _cache_latest(reading_repository.latest(db, line_id))
+    return _realtime_response(data, line_id)
+
+@app.get("/api/monitor/realtime", tags=["Monitor"])
+async def get_realtime_data(line_id: str = "LINE_01"):
+    """실시간 데이터 (최근 1개) - 프로세스별 메모리 캐시에서 응답, 미스는 DB에서 읽어 캐시 (적중 시 DB/스레드풀 미사용)"""
+    data = latest_readings.get(line_id)
     
-    for (line_id,) in lines:
-        line_data = db.query(SMTData).filter(SMTData.line_id == line_id)
-        line_stats[line_id] = {
-            'total': line_data.count(),
-            'failures': line_data.filter(SMTData.failure_occurred == True).count()
-        }
+    if data is None:
+        data = _cache_latest(await _run_query(reading_repository.latest, reading_repository.latest_async, line_id))
     
-    return {
-        'total_records': total,
-        'total_failures': failures,
-        'failure_rate': round(failures / total * 100, 2) if total > 0 else 0,
-        'recent_24h': recent,
-        'lines': line_stats
-    }
+    return _realtime_response(data, line_id)
 
-# ========== 실시간 모니터링 ==========
+def _stream_snapshot(line_id: str = None) -> list:
+    """스트림 연결 직후 보낼 현재 상태 (통계 + 최신 데이터)"""
+    db = SessionLocal()
+    try:
+        messages = [encode_sse('stats_snapshot', get_stats_summary(db))]
+        if line_id:
+            messages.append(encode_sse('reading', _realtime_reading(db, line_id)))
+        return messages
+    finally:
+        db.close()
 
-@app.get("/api/monitor/realtime", tags=["Monitor"])
-def get_realtime_data(line_id: str = "LINE_01", db: Session = Depends(get_db)):
-    """실시간 데이터 (최근 1개)"""
-    data = db.query(SMTData)\
-        .filter(SMTData.line_id == line_id)\
-        .order_by(SMTData.timestamp.desc())\
-        .first()
+@app.get("/api/monitor/stream", tags=["Monitor"])
+async def monitor_stream(request: Request, line_id: str = None):
+    """실시간 스트림 (SSE) - 새 데이터/예측/통계 증분을 push"""
+    subscription = event_bus.subscribe(line_id)
     
-    if not data:
-        # 데이터 없으면 샘플 생성
-        sample = data_generator.generate_normal_data(line_id)
-        return sample
+    async def event_stream():
+        try:
+            for message in await run_in_threadpool(_stream_snapshot, line_id):
+                yield message
+            while not subscription.closed:
+                if await request.is_disconnected():
+                    break
+                try:
+                    message = await asyncio.wait_for(subscription.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # 연결 유지용 주석 라인
+                    yield ": keep-alive\n\n"
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            event_bus.unsubscribe(subscription)
     
-    return {
-        'timestamp': data.timestamp,
-        'temperature': data.temperature,
-        'vibration': data.vibration,
-        'current': data.current,
-        'production_count': data.production_count,
-        'defect_count': data.defect_count,
-        'cycle_time': data.cycle_time,
-        'pressure': data.pressure,
-        'humidity': data.humidity,
-        'predicted_failure': data.predicted_failure,
-        'failure_probability': data.failure_probability
-    }
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.get("/api/monitor/stream/stats", tags=["Monitor"])
+def get_stream_stats():
+    """스트림 구독자/드롭 통계"""
+    return event_bus.get_stats()
 
 @app.get("/api/monitor/chart", tags=["Monitor"])
-def get_chart_data(
+async def get_chart_data(
     line_id: str = "LINE_01",
     hours: int = 24,
-    db: Session = Depends(get_db)
+    resolution: str = "auto",
+    max_points: int = DEFAULT_MAX_POINTS
 ):
-    """차트용 시계열 데이터"""
-    start_time = datetime.now() - timedelta(hours=hours)
-    
-    data = db.query(SMTData)\
-        .filter(SMTData.line_id == line_id)\
-        .filter(SMTData.timestamp >= start_time)\
-        .order_by(SMTData.timestamp)\
-        .all()
+    """차트용 시계열 데이터
+
+    - resolution: auto(포인트 수에 맞춰 선택) / raw / 1m / 1h
+    - 집계 해상도에서는 버킷별 평균과 min/max, count를 함께 반환
+    """
+    if resolution not in CHART_RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"resolution은 {', '.join(CHART_RESOLUTIONS)} 중 하나여야 합니다.")
+    if max_points < 1:
+        raise HTTPException(status_code=400, detail="max_points는 1 이상이어야 합니다.")
     
-    return {
-        'timestamps': [d.timestamp.isoformat() for d in data],
-        'temperature': [d.temperature for d in data],
-        'vibration': [d.vibration for d in data],
-        'current': [d.current for d in data],
-        'failure_probability': [d.failure_probability for d in data]
-    }
+    start_time = datetime.now() - timedelta(hours=hours)
+    chart = await _run_query(query_chart, query_chart_async, line_id, start_time, resolution, max_points)
+    # 문자열/숫자 리스트만 포함 - jsonable_encoder 순회(수천 포인트) 생략
+    return JSONResponse(chart)
 
 # ========== AI 예측 ==========
 
@@ -255,20 +483,90 @@ def get_chart_data(
 def predict_failure(request: PredictionRequest):
     """고장 예측"""
     try:
-        result = ml_model.predict(request.dict())
+        result = inference_batcher.predict(request.dict())
         return result
+    except InferenceTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/model/train", response_model=TrainingResponse, tags=["AI"])
-def train_model(request: TrainingRequest, db: Session = Depends(get_db)):
-    """모델 학습"""
+@app.post("/api/predict/batch", response_model=BatchPredictionResponse, tags=["AI"])
+def predict_failure_batch(request: BatchPredictionRequest):
+    """일괄 고장 예측 (행 목록 또는 컬럼 형식)"""
+    if request.columns is not None:
+        missing = [col for col in ml_model.feature_columns if col not in request.columns]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"누락된 컬럼: {', '.join(missing)}")
+        lengths = {len(request.columns[col]) for col in ml_model.feature_columns}
+        if len(lengths) > 1:
+            raise HTTPException(status_code=400, detail="컬럼 길이가 서로 다릅니다.")
+        data = {}
+        for col in ml_model.feature_columns:
+            try:
+                data[col] = [float(value) for value in request.columns[col]]
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail=f"숫자가 아닌 값이 있는 컬럼: {col}")
+    elif request.readings is not None:
+        data = [reading.dict() for reading in request.readings]
+    else:
+        raise HTTPException(status_code=400, detail="readings 또는 columns가 필요합니다.")
+    
     try:
-        result = ml_model.train(db, request.min_samples)
-        return result
+        predictions = ml_model.predict_batch(data)
+        return {'count': len(predictions), 'predictions': predictions}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/predict/stats", tags=["AI"])
+def get_inference_stats():
+    """추론 큐 통계 (큐 깊이, 배치 크기 분포)"""
+    return inference_batcher.get_stats()
+
+def _validate_training_request(request: TrainingRequest):
+    if request.mode not in TRAINING_MODES:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 학습 모드: {request.mode}")
+    if request.days is not None and request.days <= 0:
+        raise HTTPException(status_code=400, detail="days는 1 이상이어야 합니다.")
+    if request.sample_size is not None and request.sample_size <= 0:
+        raise HTTPException(status_code=400, detail="sample_size는 1 이상이어야 합니다.")
+    if request.mode == 'window' and request.days is None:
+        raise HTTPException(status_code=400, detail="window 모드에는 days가 필요합니다.")
+    if request.mode == 'sample' and request.sample_size is None:
+        raise HTTPException(status_code=400, detail="sample 모드에는 sample_size가 필요합니다.")
+
+def _submit_training_job(request: TrainingRequest) -> dict:
+    _validate_training_request(request)
+    return training_jobs.submit(
+        request.min_samples, request.mode, request.days, request.sample_size
+    )
+
+@app.post("/api/model/train", response_model=TrainingResponse, tags=["AI"])
+def train_model(request: TrainingRequest):
+    """모델 학습 (백그라운드 작업 완료까지 대기)"""
+    job = _submit_training_job(request)
+    job = training_jobs.wait(job['job_id'])
+    if job['status'] == 'failed':
+        raise HTTPException(status_code=500, detail=job['error'])
+    return job['result']
+
+@app.post("/api/model/jobs", response_model=TrainingJobResponse, tags=["AI"])
+def create_training_job(request: TrainingRequest):
+    """모델 학습 작업 등록 (즉시 job_id 반환)"""
+    return _submit_training_job(request)
+
+@app.get("/api/model/jobs", response_model=List[TrainingJobResponse], tags=["AI"])
+def list_training_jobs():
+    """학습 작업 목록"""
+    return training_jobs.list_jobs()
+
+@app.get("/api/model/jobs/{job_id}", response_model=TrainingJobResponse, tags=["AI"])
+def get_training_job(job_id: str):
+    """학습 작업 상태/진행률 조회"""
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="학습 작업을 찾을 수 없습니다.")
+    return job
+
 @app.get("/api/model/info", tags=["AI"])
 def get_model_info(db: Session = Depends(get_db)):
     """모델 정보"""
@@ -308,6 +606,38 @@ async def query_rag(request: RAGQueryRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/rag/search", tags=["RAG"])
+async def search_rag(request: RAGQueryRequest):
+    """매뉴얼 검색만 수행 (LLM 미사용) - 임베딩 서버 장애 시 키워드 검색으로 응답"""
+    if not rag_engine.enabled:
+        return {'documents': [], 'retrieval': None}
+    try:
+        documents, _, mode = await rag_engine.retrieve(request.query, request.top_k)
+        return {'documents': documents, 'retrieval': mode}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/rag/query/stream", tags=["RAG"])
+async def query_rag_stream(request: Request, body: RAGQueryRequest):
+    """RAG 질의응답 (SSE) - sources 먼저, 이후 생성되는 토큰을 바로 전송"""
+    async def event_stream():
+        events = rag_engine.query_stream(body.query, body.top_k)
+        try:
+            async for event_type, data in events:
+                if event_type == 'token' and await request.is_disconnected():
+                    break
+                yield encode_sse(event_type, data)
+        except Exception as e:
+            yield encode_sse('error', {'detail': str(e)})
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.post("/api/rag/upload", response_model=DocumentUploadResponse, tags=["RAG"])
 async def upload_document(file: UploadFile = File(...)):
     """문서 업로드"""
@@ -315,16 +645,23 @@ async def upload_document(file: UploadFile = File(...)):
         content = await file.read()
         text = content.decode('utf-8')
         
-        await rag_engine.add_document(
+        result = await rag_engine.add_document(
             text,
             {'filename': file.filename, 'type': 'uploaded'}
         )
+        if not result.get('success', True):
+            raise HTTPException(status_code=503, detail=result['message'])
         
         return {
             'success': True,
             'message': '문서 업로드 완료',
-            'filename': file.filename
+            'filename': file.filename,
+            'chunks': result.get('chunks'),
+            'added': result.get('added'),
+            'removed': result.get('removed')
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -334,7 +671,10 @@ def get_rag_stats():
     return {
         'document_count': rag_engine.get_document_count(),
         'embedding_model': rag_engine.embedding_model,
-        'llm_model': rag_engine.llm_model
+        'llm_model': rag_engine.llm_model,
+        'cache': rag_engine.get_cache_stats(),
+        'retrieval': rag_engine.get_retrieval_stats(),
+        'stream': rag_engine.get_stream_stats()
     }
 
 @app.delete("/api/rag/clear", tags=["RAG"])
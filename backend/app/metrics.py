@@ -0,0 +1,264 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# 기본 지연 버킷 (초) - 메모리 캐시 응답(ms 미만)부터 LLM 생성(수십 초)까지
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 현재 요청의 라우트 템플릿 (DB 쿼리 시간을 엔드포인트별로 집계) - 요청 밖(백그라운드 스레드)은 기본값
+current_endpoint = contextvars.ContextVar('current_endpoint', default='background')
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+    def _header(self) -> list:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            values = dict(self._values)
+        return self._header() + [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in values.items()
+        ]
+
+
+class Gauge(Counter):
+    type = 'gauge'
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """with 블록 실행 시간 기록 (예외로 끝나도 기록)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list:
+        with self._lock:
+            values = {key: ([*state[0]], state[1], state[2]) for key, state in self._values.items()}
+        lines = self._header()
+        for key, (counts, total, count) in values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {count}')
+        return lines
+
+
+class _Collected(_Metric):
+    """수집 시점에 콜백으로 값을 읽는 지표 (큐 깊이, 캐시 통계 등 기존 get_stats 재사용)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple, type: str, callback):
+        super().__init__(name, documentation, labelnames)
+        self.type = type
+        self.callback = callback
+
+    def render(self) -> list:
+        lines = self._header()
+        for labels, value in self.callback():
+            if value is None:
+                continue
+            lines.append(f'{self.name}{_format_labels(self.labelnames, self._key(labels))} {_format_value(value)}')
+        return lines
+
+
+class MetricsRegistry:
+    """Prometheus 텍스트 형식(0.0.4)으로 노출할 지표 목록"""
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"이미 등록된 지표: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def collect(self, name: str, documentation: str, callback, labelnames: tuple = (), type: str = 'gauge'):
+        """callback() -> [(라벨 dict, 값)] - /metrics 요청 시마다 호출"""
+        return self._register(_Collected(name, documentation, labelnames, type, callback))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # 지표 하나의 수집 실패로 전체 응답이 깨지지 않도록
+                lines.append(f'# {metric.name} collection failed: {type(e).__name__}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    'http_request_duration_seconds', 'HTTP 요청 처리 시간 (SSE는 스트림 종료까지)', ('method', 'route', 'status'))
+HTTP_REQUESTS_IN_PROGRESS = registry.gauge(
+    'http_requests_in_progress', '처리 중인 HTTP 요청 수', ('route',))
+DB_QUERY_SECONDS = registry.histogram(
+    'db_query_duration_seconds', 'DB 쿼리 실행 시간 (엔드포인트별, 요청 밖은 background)', ('endpoint', 'operation'))
+INFERENCE_STAGE_SECONDS = registry.histogram(
+    'inference_stage_duration_seconds', '고장 예측 단계별 시간 (scale/forest/rules, 컴파일된 포레스트는 scale 포함)', ('stage',))
+RAG_STAGE_SECONDS = registry.histogram(
+    'rag_stage_duration_seconds', 'RAG 단계별 시간 (embed/retrieve/generate)', ('stage',))
+
+
+def _route_template(scope) -> str:
+    """요청 경로 대신 라우트 템플릿 (/api/model/jobs/{job_id}) - 라벨 수 제한"""
+    app = scope.get('app')
+    router = getattr(app, 'router', None)
+    if router is None:
+        return 'unmatched'
+    from starlette.routing import Match
+    for route in router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, 'path', 'unmatched')
+    return 'unmatched'
+
+
+class MetricsMiddleware:
+    """라우트별 요청 지연/처리 중 요청 수 기록 (순수 ASGI - 스트리밍 응답/연결 종료 감지에 영향 없음)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        route = _route_template(scope)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        token = current_endpoint.set(route)
+        HTTP_REQUESTS_IN_PROGRESS.inc(route=route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=scope['method'], route=route, status=status)
+            HTTP_REQUESTS_IN_PROGRESS.dec(route=route)
+            current_endpoint.reset(token)
+
+
+def instrument_engine(engine):
+    """SQLAlchemy 엔진의 모든 쿼리 실행 시간 기록 (AsyncEngine은 sync_engine 전달)"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['query_started'].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'OTHER'
+        DB_QUERY_SECONDS.observe(time.perf_counter() - started, endpoint=current_endpoint.get(), operation=operation)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        connection = context.connection
+        if connection is not None and connection.info.get('query_started'):
+            connection.info['query_started'].pop()
+
+
+def cache_hit_ratio_samples(caches: dict) -> list:
+    """{캐시 이름: get_stats() 결과} -> 적중률 샘플 (비활성 캐시는 제외)"""
+    return [({'cache': name}, stats['hit_rate']) for name, stats in caches.items() if stats]
+
+
+def cache_request_samples(caches: dict) -> list:
+    samples = []
+    for name, stats in caches.items():
+        if stats:
+            samples.append(({'cache': name, 'result': 'hit'}, stats['hits']))
+            samples.append(({'cache': name, 'result': 'miss'}, stats['misses']))
+    return samples
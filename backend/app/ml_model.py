@@ -1,19 +1,121 @@
 import numpy as np
-import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 from sklearn.preprocessing import StandardScaler
 import joblib
 import os
+import time
 from sqlalchemy.orm import Session
-from database import SMTData, TrainingHistory
+from database import TrainingHistory
+from training_data import load_training_data
+from fast_forest import CompiledForest
+from metrics import INFERENCE_STAGE_SECONDS
 from datetime import datetime
 
+# 위험도 구간 경계 (확률 < 0.3: LOW, < 0.6: MEDIUM, 이상: HIGH)
+RISK_THRESHOLDS = np.array([0.3, 0.6])
+RISK_LEVELS = [
+    ('LOW', ['정상 동작 중입니다.']),
+    ('MEDIUM', [
+        '주의: 일부 센서 값이 정상 범위를 벗어났습니다.',
+        '정기 점검을 권장합니다.'
+    ]),
+    ('HIGH', [
+        '경고: 고장 가능성이 높습니다.',
+        '즉시 설비 점검이 필요합니다.',
+        '예방 정비를 실시하세요.'
+    ])
+]
+
+# (센서, 임계값, 경고 메시지)
+SENSOR_ALERTS = [
+    ('temperature', 230, '⚠ 온도 과열 감지'),
+    ('vibration', 0.7, '⚠ 진동 이상 감지'),
+    ('current', 27, '⚠ 전류 과부하 감지'),
+    ('defect_count', 5, '⚠ 불량률 증가 감지')
+]
+
+class ModelState:
+    """학습된 모델 스냅샷 - 교체 시 참조를 통째로 바꿔 끼움 (부분 갱신 없음)"""
+    def __init__(self, model=None, scaler=None, compiled=None):
+        self.model = model
+        self.scaler = scaler if scaler is not None else StandardScaler()
+        self.compiled = compiled
+
+def fit_model(X: np.ndarray, y: np.ndarray):
+    """스케일링 + 학습 + 평가 (프로세스 풀에서도 실행 가능한 순수 함수)"""
+    # 스케일링
+    scaler = StandardScaler()
+    X = scaler.fit_transform(X)
+    
+    # 학습/테스트 분할 (테스트 30%로 증가)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.3, random_state=42, stratify=y
+    )
+    
+    # ===== 핵심 변경: 모델 제약 =====
+    # 과적합 방지를 위한 제한적 파라미터
+    model = RandomForestClassifier(
+        n_estimators=12,        # 100 → 20 (트리 수 대폭 감소)
+        max_depth=3,            # 10 → 3 (깊이 제한 - 복잡한 패턴 학습 제한)
+        min_samples_split=35,   # 새로 추가: 노드 분할 최소 샘플
+        min_samples_leaf=18,    # 새로 추가: 리프 노드 최소 샘플
+        max_features='sqrt',    # 새로 추가: 각 트리가 일부 특성만 사용
+        random_state=42,
+        n_jobs=-1
+    )
+    model.fit(X_train, y_train)
+    # 추론은 단일 스레드가 더 빠름 (joblib 디스패치 비용 제거)
+    model.set_params(n_jobs=None)
+    
+    # 예측 및 평가
+    y_pred = model.predict(X_test)
+    
+    metrics = {
+        'accuracy': accuracy_score(y_test, y_pred),
+        'precision': precision_score(y_test, y_pred, zero_division=0),
+        'recall': recall_score(y_test, y_pred, zero_division=0),
+        'f1_score': f1_score(y_test, y_pred, zero_division=0)
+    }
+    return model, scaler, metrics
+
+def record_training_history(db: Session, metrics: dict, training_samples: int):
+    """학습 이력 저장"""
+    history = TrainingHistory(
+        accuracy=metrics['accuracy'],
+        precision=metrics['precision'],
+        recall=metrics['recall'],
+        f1_score=metrics['f1_score'],
+        training_samples=training_samples
+    )
+    db.add(history)
+    db.commit()
+
+def training_result(metrics: dict) -> dict:
+    return {
+        'success': True,
+        'message': '모델 학습 완료',
+        'accuracy': round(metrics['accuracy'], 4),
+        'precision': round(metrics['precision'], 4),
+        'recall': round(metrics['recall'], 4),
+        'f1_score': round(metrics['f1_score'], 4)
+    }
+
+def insufficient_data_result(min_samples: int, count: int) -> dict:
+    return {
+        'success': False,
+        'message': f'학습 데이터 부족. 최소 {min_samples}개 필요, 현재 {count}개',
+        'accuracy': 0, 'precision': 0, 'recall': 0, 'f1_score': 0
+    }
+
 class FailurePredictionModel:
-    def __init__(self, model_path: str = None):
-        self.model = None
-        self.scaler = StandardScaler()
+    def __init__(self, model_path: str = None, use_compiled: bool = None):
+        # 현재 서비스 중인 모델 (예측은 항상 한 스냅샷만 참조)
+        self._state = ModelState()
+        # 평탄화된 NumPy 스코어러 사용 여부 (sklearn 없이 예측)
+        self.use_compiled = use_compiled if use_compiled is not None \
+            else os.getenv("USE_COMPILED_FOREST", "1") != "0"
         self.feature_columns = [
             'temperature', 'vibration', 'current', 
             'production_count', 'defect_count', 'cycle_time',
@@ -34,183 +136,171 @@ class FailurePredictionModel:
         else:
             self.model_path = model_path
             self.scaler_path = model_path.replace('.pkl', '_scaler.pkl')
+        self.compiled_path = self.model_path.replace('.pkl', '_compiled.npz')
         
         os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
         
         # 저장된 모델 로드
         self.load_model()
     
+    @property
+    def model(self):
+        return self._state.model
+    
+    @property
+    def scaler(self):
+        return self._state.scaler
+    
+    @property
+    def compiled(self):
+        return self._state.compiled
+    
+    def swap(self, model, scaler, compiled: CompiledForest = None) -> ModelState:
+        """새 모델/스케일러로 원자적 교체 (copy-on-write)"""
+        if not self.use_compiled:
+            compiled = None
+        elif compiled is None:
+            compiled = CompiledForest.from_sklearn(model, scaler)
+        state = ModelState(model, scaler, compiled)
+        self._state = state
+        return state
+    
     def load_model(self):
         """저장된 모델 로드"""
         if os.path.exists(self.model_path) and os.path.exists(self.scaler_path):
-            self.model = joblib.load(self.model_path)
-            self.scaler = joblib.load(self.scaler_path)
+            self.swap(joblib.load(self.model_path), joblib.load(self.scaler_path), self._load_compiled())
             return True
         return False
     
-    def save_model(self):
-        """모델 저장"""
-        if self.model is not None:
-            joblib.dump(self.model, self.model_path)
-            joblib.dump(self.scaler, self.scaler_path)
+    def _load_compiled(self):
+        """저장된 컴파일 포레스트 로드 (임계값 변환 생략) - 없거나 모델보다 오래됐으면 None(재컴파일)"""
+        if not self.use_compiled or not os.path.exists(self.compiled_path):
+            return None
+        if os.path.getmtime(self.compiled_path) < os.path.getmtime(self.model_path):
+            return None
+        try:
+            return CompiledForest.load(self.compiled_path)
+        except (OSError, KeyError, ValueError):
+            return None
     
-    def prepare_data(self, df: pd.DataFrame):
-        """데이터 전처리"""
-        X = df[self.feature_columns].values
-        y = df['failure_occurred'].values
+    def save_model(self, state: ModelState = None):
+        """모델 저장 (임시 파일에 쓴 뒤 교체 - 읽는 쪽이 반쯤 쓰인 파일을 보지 않음)"""
+        state = state or self._state
+        if state.model is None:
+            return
         
-        # 스케일링
-        X_scaled = self.scaler.fit_transform(X)
+        def dump(obj, path):
+            tmp_path = path + '.tmp'
+            joblib.dump(obj, tmp_path)
+            os.replace(tmp_path, path)
         
-        return X_scaled, y
+        dump(state.model, self.model_path)
+        dump(state.scaler, self.scaler_path)
+        if state.compiled is not None:
+            tmp_path = self.compiled_path + '.tmp.npz'
+            state.compiled.save(tmp_path)
+            os.replace(tmp_path, self.compiled_path)
     
-    def train(self, db: Session, min_samples: int = 100):
+    def train(self, db: Session, min_samples: int = 100, mode: str = 'all',
+              days: int = None, sample_size: int = None):
         """모델 학습 - 현실적인 성능을 위한 제약"""
-        # DB에서 데이터 로드
-        data = db.query(SMTData).all()
-        
-        if len(data) < min_samples:
-            return {
-                'success': False,
-                'message': f'학습 데이터 부족. 최소 {min_samples}개 필요, 현재 {len(data)}개',
-                'accuracy': 0, 'precision': 0, 'recall': 0, 'f1_score': 0
-            }
-        
-        # DataFrame 변환
-        df = pd.DataFrame([{
-            'temperature': d.temperature,
-            'vibration': d.vibration,
-            'current': d.current,
-            'production_count': d.production_count,
-            'defect_count': d.defect_count,
-            'cycle_time': d.cycle_time,
-            'pressure': d.pressure,
-            'humidity': d.humidity,
-            'failure_occurred': d.failure_occurred
-        } for d in data])
-        
-        # 데이터 준비
-        X, y = self.prepare_data(df)
-        
-        # 학습/테스트 분할 (테스트 30%로 증가)
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.3, random_state=42, stratify=y
-        )
-        
-        # ===== 핵심 변경: 모델 제약 =====
-        # 과적합 방지를 위한 제한적 파라미터
-        self.model = RandomForestClassifier(
-            n_estimators=12,        # 100 → 20 (트리 수 대폭 감소)
-            max_depth=3,            # 10 → 3 (깊이 제한 - 복잡한 패턴 학습 제한)
-            min_samples_split=35,   # 새로 추가: 노드 분할 최소 샘플
-            min_samples_leaf=18,    # 새로 추가: 리프 노드 최소 샘플
-            max_features='sqrt',    # 새로 추가: 각 트리가 일부 특성만 사용
-            random_state=42,
-            n_jobs=-1
-        )
-        self.model.fit(X_train, y_train)
-        
-        # 예측 및 평가
-        y_pred = self.model.predict(X_test)
-        
-        accuracy = accuracy_score(y_test, y_pred)
-        precision = precision_score(y_test, y_pred, zero_division=0)
-        recall = recall_score(y_test, y_pred, zero_division=0)
-        f1 = f1_score(y_test, y_pred, zero_division=0)
-        
-        # 모델 저장
-        self.save_model()
+        # DB에서 필요한 컬럼만 청크 단위로 로드 (all / window / sample)
+        X, y = load_training_data(db, mode, days, sample_size)
+        
+        if len(y) < min_samples:
+            return insufficient_data_result(min_samples, len(y))
+        
+        model, scaler, metrics = fit_model(X, y)
+        
+        # 교체 후 저장
+        state = self.swap(model, scaler)
+        self.save_model(state)
         
         # 학습 이력 저장
-        history = TrainingHistory(
-            accuracy=accuracy,
-            precision=precision,
-            recall=recall,
-            f1_score=f1,
-            training_samples=len(data)
-        )
-        db.add(history)
-        db.commit()
+        record_training_history(db, metrics, len(y))
         
-        return {
-            'success': True,
-            'message': '모델 학습 완료',
-            'accuracy': round(accuracy, 4),
-            'precision': round(precision, 4),
-            'recall': round(recall, 4),
-            'f1_score': round(f1, 4)
-        }
+        return training_result(metrics)
+    
+    def to_matrix(self, data) -> np.ndarray:
+        """입력(dict 목록 또는 컬럼 dict)을 (n, 8) 특성 행렬로 변환"""
+        if isinstance(data, dict):
+            return np.column_stack([
+                np.asarray(data[col], dtype=np.float64) for col in self.feature_columns
+            ])
+        return np.array(
+            [[row[col] for col in self.feature_columns] for row in data],
+            dtype=np.float64
+        ).reshape(-1, len(self.feature_columns))
     
     def predict(self, data: dict):
         """고장 예측"""
-        if self.model is None:
-            return {
+        return self.predict_batch([data])[0]
+    
+    def predict_batch(self, data) -> list:
+        """일괄 고장 예측 - predict_proba 1회로 전체 행 처리"""
+        X = self.to_matrix(data)
+        n = len(X)
+        # 예측 도중 모델이 교체되어도 같은 스냅샷 사용
+        state = self._state
+        
+        if state.model is None:
+            return [{
                 'predicted_failure': False,
                 'failure_probability': 0.0,
                 'risk_level': 'UNKNOWN',
                 'recommendations': ['모델이 학습되지 않았습니다. 먼저 학습을 진행하세요.']
-            }
-        
-        # 입력 데이터 준비
-        X = np.array([[
-            data['temperature'],
-            data['vibration'],
-            data['current'],
-            data['production_count'],
-            data['defect_count'],
-            data['cycle_time'],
-            data['pressure'],
-            data['humidity']
-        ]])
-        
-        # 스케일링
-        X_scaled = self.scaler.transform(X)
-        
-        # 예측
-        prediction = self.model.predict(X_scaled)[0]
-        probability = self.model.predict_proba(X_scaled)[0][1]
+            } for _ in range(n)]
         
-        # 위험도 판단
-        if probability < 0.3:
-            risk_level = 'LOW'
-            recommendations = ['정상 동작 중입니다.']
-        elif probability < 0.6:
-            risk_level = 'MEDIUM'
-            recommendations = [
-                '주의: 일부 센서 값이 정상 범위를 벗어났습니다.',
-                '정기 점검을 권장합니다.'
-            ]
+        if n == 0:
+            return []
+        
+        # 스케일링 + 예측 (확률에서 라벨 도출 - 포레스트 1회 실행)
+        if state.compiled is not None:
+            # 컴파일된 포레스트는 스케일링이 분기 임계값에 포함됨
+            with INFERENCE_STAGE_SECONDS.time(stage='forest'):
+                proba = state.compiled.predict_proba(X)
         else:
-            risk_level = 'HIGH'
-            recommendations = [
-                '경고: 고장 가능성이 높습니다.',
-                '즉시 설비 점검이 필요합니다.',
-                '예방 정비를 실시하세요.'
-            ]
+            with INFERENCE_STAGE_SECONDS.time(stage='scale'):
+                X_scaled = state.scaler.transform(X)
+            with INFERENCE_STAGE_SECONDS.time(stage='forest'):
+                proba = state.model.predict_proba(X_scaled)
+        rules_started = time.perf_counter()
+        classes = state.compiled.classes_ if state.compiled is not None else state.model.classes_
+        predictions = classes[np.argmax(proba, axis=1)]
+        probability = proba[:, 1]
+        
+        # 위험도 판단
+        risk_index = np.searchsorted(RISK_THRESHOLDS, probability, side='right')
         
         # 이상 센서 식별
-        if data['temperature'] > 230:
-            recommendations.append('⚠ 온도 과열 감지')
-        if data['vibration'] > 0.7:
-            recommendations.append('⚠ 진동 이상 감지')
-        if data['current'] > 27:
-            recommendations.append('⚠ 전류 과부하 감지')
-        if data['defect_count'] > 5:
-            recommendations.append('⚠ 불량률 증가 감지')
+        features = {col: X[:, i] for i, col in enumerate(self.feature_columns)}
+        alerts = np.column_stack([
+            features[col] > limit for col, limit, _ in SENSOR_ALERTS
+        ])
         
-        return {
-            'predicted_failure': bool(prediction),
-            'failure_probability': round(float(probability), 4),
-            'risk_level': risk_level,
-            'recommendations': recommendations
-        }
+        results = []
+        for i in range(n):
+            level, base = RISK_LEVELS[risk_index[i]]
+            recommendations = list(base)
+            recommendations.extend(
+                message for (_, _, message), hit in zip(SENSOR_ALERTS, alerts[i]) if hit
+            )
+            results.append({
+                'predicted_failure': bool(predictions[i]),
+                'failure_probability': round(float(probability[i]), 4),
+                'risk_level': level,
+                'recommendations': recommendations
+            })
+        INFERENCE_STAGE_SECONDS.observe(time.perf_counter() - rules_started, stage='rules')
+        return results
     
     def get_feature_importance(self):
         """특성 중요도"""
-        if self.model is None:
+        model = self.model
+        if model is None:
             return {}
         
-        importance = self.model.feature_importances_
+        importance = model.feature_importances_
         return {
             feature: round(float(imp), 4) 
             for feature, imp in zip(self.feature_columns, importance)
@@ -0,0 +1,194 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+import httpx
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api")
+
+# 연결 풀
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "8"))
+OLLAMA_MAX_KEEPALIVE = int(os.getenv("OLLAMA_MAX_KEEPALIVE", "4"))
+
+# 작업별 동시 요청 수 (모델 서버 하나가 처리 가능한 양 이상은 대기) / 대기 한도 (초)
+OLLAMA_EMBED_CONCURRENCY = int(os.getenv("RAG_EMBED_CONCURRENCY", "4"))
+OLLAMA_GENERATE_CONCURRENCY = int(os.getenv("OLLAMA_GENERATE_CONCURRENCY", "2"))
+OLLAMA_QUEUE_TIMEOUT = float(os.getenv("OLLAMA_QUEUE_TIMEOUT", "5"))
+
+# 작업별 타임아웃 (초) - stream의 read는 토큰 사이 최대 대기
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "2"))
+OLLAMA_TIMEOUTS = {
+    'embed': float(os.getenv("OLLAMA_EMBED_TIMEOUT", "15")),
+    'generate': float(os.getenv("OLLAMA_GENERATE_TIMEOUT", "60")),
+    'stream': float(os.getenv("RAG_STREAM_READ_TIMEOUT", "60")),
+}
+
+# 서킷 브레이커 - 연속 실패 N회면 열림, 일정 시간 뒤 1건만 시험 호출
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("OLLAMA_BREAKER_FAILURES", "3"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("OLLAMA_BREAKER_RESET", "30"))
+
+
+class OllamaUnavailable(Exception):
+    """Ollama 호출 불가 (서킷 열림, 대기열 초과, 연결/타임아웃/5xx) - 호출자는 대체 응답 사용"""
+
+
+class CircuitBreaker:
+    """closed -> (연속 실패) -> open -> (reset_timeout 경과) -> half_open -> 성공 시 closed / 실패 시 open"""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self.rejected = 0
+        self.opened_count = 0
+
+    def allow(self) -> bool:
+        if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = 'half_open'
+        if self.state == 'closed':
+            return True
+        if self.state == 'half_open' and not self._trial_running:
+            self._trial_running = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.state = 'closed'
+        self.failures = 0
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_running = False
+        if self.state == 'half_open' or self.failures >= self.failure_threshold:
+            if self.state != 'open':
+                self.opened_count += 1
+            self.state = 'open'
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """성공/실패 판정 없이 끝난 호출 (클라이언트 취소 등)"""
+        self._trial_running = False
+
+    def get_stats(self) -> dict:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'opened': self.opened_count,
+            'rejected': self.rejected
+        }
+
+
+class OllamaClient:
+    """Ollama 호출 공용 클라이언트 - 연결 재사용, 작업별 타임아웃/동시성 제한, 서킷 브레이커
+
+    서버 시작 시 start(), 종료 시 close() (시작 전 호출되면 자동 생성).
+    """
+
+    def __init__(self, base_url: str = OLLAMA_URL):
+        self.base_url = base_url
+        self.breaker = CircuitBreaker()
+        self._client = None
+        self._limits = {
+            'embed': asyncio.Semaphore(OLLAMA_EMBED_CONCURRENCY),
+            'generate': asyncio.Semaphore(OLLAMA_GENERATE_CONCURRENCY),
+        }
+        self._in_flight = {'embed': 0, 'generate': 0}
+        self.queue_rejected = 0
+
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(max_connections=OLLAMA_MAX_CONNECTIONS,
+                                    max_keepalive_connections=OLLAMA_MAX_KEEPALIVE),
+                timeout=httpx.Timeout(OLLAMA_TIMEOUTS['generate'], connect=OLLAMA_CONNECT_TIMEOUT)
+            )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def _timeout(operation: str, extra: float = 0.0) -> httpx.Timeout:
+        return httpx.Timeout(OLLAMA_TIMEOUTS[operation] + extra, connect=OLLAMA_CONNECT_TIMEOUT)
+
+    @asynccontextmanager
+    async def _slot(self, operation: str):
+        """서킷 확인 + 동시 요청 슬롯 확보 (대기가 길면 바로 실패)"""
+        if not self.breaker.allow():
+            raise OllamaUnavailable("circuit open")
+        trial = self.breaker.state == 'half_open'
+        kind = 'generate' if operation == 'stream' else operation
+        semaphore = self._limits[kind]
+        try:
+            try:
+                await asyncio.wait_for(semaphore.acquire(), OLLAMA_QUEUE_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.queue_rejected += 1
+                # 대기열 초과는 서버 장애가 아니므로 실패로 세지 않음
+                raise OllamaUnavailable("too many pending requests")
+            self._in_flight[kind] += 1
+            try:
+                await self.start()
+                yield
+            finally:
+                self._in_flight[kind] -= 1
+                semaphore.release()
+        finally:
+            if trial:
+                # 성공/실패 판정 없이 끝난 시험 호출 (대기열 초과, 취소, 4xx 등) - 다음 요청이 다시 시험
+                self.breaker.release()
+
+    def _check(self, response: httpx.Response):
+        if response.status_code >= 500:
+            raise httpx.HTTPStatusError(f"Ollama {response.status_code}", request=response.request, response=response)
+
+    async def post(self, operation: str, path: str, payload: dict, extra_timeout: float = 0.0) -> httpx.Response:
+        """요청 1건 (4xx는 그대로 반환 - 호출자가 처리)"""
+        async with self._slot(operation):
+            try:
+                response = await self._client.post(path, json=payload, timeout=self._timeout(operation, extra_timeout))
+                self._check(response)
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                self.breaker.record_failure()
+                raise OllamaUnavailable(f"{type(e).__name__}: {e}") from e
+            self.breaker.record_success()
+            return response
+
+    @asynccontextmanager
+    async def stream(self, path: str, payload: dict):
+        """스트리밍 요청 - 응답 헤더 수신까지 실패는 OllamaUnavailable, 이후 끊김은 httpx 예외"""
+        async with self._slot('stream'):
+            response = None
+            try:
+                request = self._client.build_request("POST", path, json=payload, timeout=self._timeout('stream'))
+                response = await self._client.send(request, stream=True)
+                self._check(response)
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                self.breaker.record_failure()
+                if response is not None:
+                    await response.aclose()
+                raise OllamaUnavailable(f"{type(e).__name__}: {e}") from e
+            try:
+                yield response
+            except httpx.TransportError:
+                self.breaker.record_failure()
+                raise
+            else:
+                self.breaker.record_success()
+            finally:
+                await response.aclose()
+
+    def get_stats(self) -> dict:
+        return {
+            'url': self.base_url,
+            'circuit': self.breaker.get_stats(),
+            'queue_rejected': self.queue_rejected,
+            'in_flight': dict(self._in_flight)
+        }
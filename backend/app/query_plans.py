@@ -0,0 +1,139 @@
+"""엔드포인트 조회 경로의 EXPLAIN QUERY PLAN 점검
+
+쿼리를 따로 적지 않고 실제 조회 함수(storage 저장소, rollup 차트, 학습 데이터 로더)를 실행하면서
+DB로 나가는 SELECT를 그대로 가로채 실행 계획을 확인 - 조회 코드가 바뀌면 점검 대상도 함께 바뀜.
+smt_data/smt_rollup을 인덱스 없이 전체 스캔하거나 ORDER BY용 임시 B-tree를 만들면 실패로 표시
+(클래스별 건수의 GROUP BY 임시 B-tree는 그룹 수(2)만큼만 쓰므로 허용).
+
+    cd backend && python -m pytest tests/test_query_plans.py   (CI)
+    python query_plans.py                                      (현재 DB 점검, 실패 시 종료 코드 1)
+"""
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database import SMTData, SMTRollup, SessionLocal
+from storage import reading_repository
+from rollup import query_chart, CHART_RESOLUTIONS
+from training_data import load_training_data
+
+CHECKED_TABLES = (SMTData.__tablename__, SMTRollup.__tablename__)
+LINE_TIMESTAMP = 'ix_smt_data_line_timestamp'
+TIMESTAMP = 'ix_smt_data_timestamp'
+ROLLUP_PRIMARY_KEY = f'sqlite_autoindex_{SMTRollup.__tablename__}_1'
+
+
+def endpoint_calls(line_id: str = 'LINE_01') -> dict:
+    """점검 대상: 이름 -> (조회 함수(db), 각 SELECT가 사용해야 하는 인덱스 후보, 전체 스캔 허용 여부)
+
+    학습 all 모드/전체 이력 sample 모드처럼 전체 이력을 읽는 경로만 전체 스캔을 허용.
+    """
+    now = datetime.now()
+    day_ago = now - timedelta(hours=24)
+    calls = {
+        # /api/monitor/realtime 캐시 적재 (라인별 최신 1건)
+        'monitor_realtime_latest': (
+            lambda db: reading_repository.latest(db, line_id), (LINE_TIMESTAMP,), False),
+        # /api/data/list?line_id=
+        'data_list_by_line': (
+            lambda db: reading_repository.list_readings(db, 0, 100, line_id), (LINE_TIMESTAMP,), False),
+        # /api/data/list
+        'data_list': (
+            lambda db: reading_repository.list_readings(db, 0, 100), (TIMESTAMP,), False),
+        # /api/data/stats 최근 24시간
+        'stats_recent_24h': (
+            lambda db: reading_repository.count_since(db, day_ago), (TIMESTAMP,), False),
+        # 학습 window 모드 / sample 모드(최근 N일)
+        'training_window': (
+            lambda db: load_training_data(db, 'window', days=7), (TIMESTAMP,), False),
+        'training_sample_window': (
+            lambda db: load_training_data(db, 'sample', days=7, sample_size=100), (TIMESTAMP,), False),
+        # 학습 all / sample 모드(전체 이력) - 전체 이력을 한 번 읽는 것이 의도된 동작
+        'training_all': (
+            lambda db: load_training_data(db, 'all'), (), True),
+        'training_sample_all': (
+            lambda db: load_training_data(db, 'sample', sample_size=100), (), True),
+    }
+    # /api/monitor/chart - auto(해상도 선택)/raw(원본)/1m·1h(롤업 버킷)
+    for resolution in CHART_RESOLUTIONS:
+        # auto는 롤업으로 행 수를 센 뒤 데이터 양에 따라 원본 또는 롤업 조회
+        indexes = {'raw': (LINE_TIMESTAMP,), 'auto': (ROLLUP_PRIMARY_KEY, LINE_TIMESTAMP)}\
+            .get(resolution, (ROLLUP_PRIMARY_KEY,))
+        calls[f'monitor_chart_{resolution}'] = (
+            lambda db, resolution=resolution: query_chart(db, line_id, day_ago, resolution), indexes, False)
+    # auto가 롤업 버킷으로 내려가는 경로 (데이터가 max_points보다 많을 때)
+    calls['monitor_chart_auto_rollup'] = (
+        lambda db: query_chart(db, line_id, day_ago, 'auto', max_points=1), (ROLLUP_PRIMARY_KEY,), False)
+    return calls
+
+
+@contextmanager
+def capture_selects(db: Session):
+    """블록 안에서 실행된 smt_data/smt_rollup SELECT의 (SQL, 파라미터) 목록"""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith('SELECT') \
+                and any(table in statement for table in CHECKED_TABLES):
+            statements.append((statement, parameters))
+
+    bind = db.get_bind()
+    event.listen(bind, 'before_cursor_execute', _record)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, 'before_cursor_execute', _record)
+
+
+def explain(db: Session, statement: str, parameters) -> list:
+    """EXPLAIN QUERY PLAN 결과의 detail 목록 (실행된 SQL/파라미터 그대로)"""
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)).all()
+    return [row[-1] for row in rows]
+
+
+def _full_scan(detail: str) -> bool:
+    return any(detail.strip() in (f'SCAN {table}', f'SCAN TABLE {table}') for table in CHECKED_TABLES)
+
+
+def check_query_plans(db: Session) -> list:
+    """조회 경로별 실행 계획과 인덱스 사용 여부 (SQLite 전용)
+
+    조회가 SELECT를 하나도 실행하지 않으면(빈 DB의 sample 모드 등) 확인할 수 없으므로 실패로 표시.
+    """
+    if db.get_bind().dialect.name != 'sqlite':
+        return []
+
+    results = []
+    for name, (call, expected_indexes, allow_scan) in endpoint_calls().items():
+        with capture_selects(db) as statements:
+            call(db)
+        db.rollback()
+
+        plans = [explain(db, statement, parameters) for statement, parameters in statements]
+        details = [detail for plan in plans for detail in plan]
+        full_scan = any(_full_scan(detail) for detail in details)
+        temp_sort = any('USE TEMP B-TREE FOR ORDER BY' in detail for detail in details)
+        uses_index = not expected_indexes or all(
+            any(index in detail for index in expected_indexes for detail in plan) for plan in plans)
+        results.append({
+            'query': name,
+            'expected_indexes': list(expected_indexes),
+            'statements': len(statements),
+            'plan': details,
+            'ok': bool(statements) and uses_index and (allow_scan or not full_scan) and not temp_sort
+        })
+    return results
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        results = check_query_plans(db)
+    finally:
+        db.close()
+
+    for result in results:
+        status = 'OK  ' if result['ok'] else 'FAIL'
+        print(f"[{status}] {result['query']} ({result['statements']}개 SELECT): {' / '.join(result['plan'])}")
+    sys.exit(0 if all(result['ok'] for result in results) else 1)
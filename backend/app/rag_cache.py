@@ -0,0 +1,148 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+import numpy as np
+from collections import OrderedDict
+
+# 질의 임베딩 캐시 (정규화된 질의 -> 임베딩)
+QUERY_CACHE_SIZE = int(os.getenv("RAG_QUERY_CACHE_SIZE", "512"))
+QUERY_CACHE_TTL = float(os.getenv("RAG_QUERY_CACHE_TTL", "3600"))
+
+# 답변 캐시 - 같은 청크가 검색되고 질의 임베딩이 충분히 가까우면 같은 질문으로 간주
+ANSWER_CACHE_SIZE = int(os.getenv("RAG_ANSWER_CACHE_SIZE", "256"))
+ANSWER_CACHE_TTL = float(os.getenv("RAG_ANSWER_CACHE_TTL", "86400"))
+ANSWER_CACHE_THRESHOLD = float(os.getenv("RAG_ANSWER_CACHE_THRESHOLD", "0.95"))
+
+_TRAILING_PUNCTUATION = re.compile(r'[\s?!.。？！]+$')
+
+
+def normalize_query(text: str) -> str:
+    """공백/대소문자/끝 문장부호 차이를 무시 ("진동 이상 시 조치?" == "진동 이상 시  조치")"""
+    text = unicodedata.normalize('NFKC', text).lower()
+    text = ' '.join(text.split())
+    return _TRAILING_PUNCTUATION.sub('', text)
+
+
+class _HitCounter:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def get_stats(self, size: int) -> dict:
+        total = self.hits + self.misses
+        return {
+            'size': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
+
+
+class QueryEmbeddingCache:
+    """LRU + TTL 캐시"""
+
+    def __init__(self, max_size: int = QUERY_CACHE_SIZE, ttl: float = QUERY_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counter = _HitCounter()
+
+    def get(self, model: str, query: str):
+        key = (model, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+            self._counter.record(entry is not None)
+            return entry[1] if entry is not None else None
+
+    def put(self, model: str, query: str, embedding: list):
+        key = (model, normalize_query(query))
+        with self._lock:
+            self._entries[key] = (time.monotonic(), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> dict:
+        return self._counter.get_stats(len(self._entries))
+
+
+class AnswerCache:
+    """시맨틱 답변 캐시 - (검색된 청크 id, 모델)이 같고 질의 임베딩 코사인 유사도가 임계값 이상이면 재사용
+
+    문서가 바뀌면(add_document/clear_documents) 전체 무효화. generation으로
+    무효화 전에 시작된 생성 결과가 나중에 저장되는 것을 막음.
+    """
+
+    def __init__(self, max_size: int = ANSWER_CACHE_SIZE, ttl: float = ANSWER_CACHE_TTL,
+                 threshold: float = ANSWER_CACHE_THRESHOLD):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+        # (모델, 청크 id들) -> [(저장 시각, 정규화 임베딩, 결과)]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counter = _HitCounter()
+        self._size = 0
+        self.generation = 0
+
+    @staticmethod
+    def _unit(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, embedding, chunk_ids: list, model: str):
+        key = (model, tuple(chunk_ids))
+        vector = self._unit(embedding)
+        now = time.monotonic()
+        with self._lock:
+            candidates = self._entries.get(key, [])
+            alive = [entry for entry in candidates if now - entry[0] <= self.ttl]
+            self._size -= len(candidates) - len(alive)
+            result = None
+            for _, cached_vector, cached_result in alive:
+                if float(np.dot(vector, cached_vector)) >= self.threshold:
+                    result = cached_result
+                    break
+            if alive:
+                self._entries[key] = alive
+                self._entries.move_to_end(key)
+            else:
+                self._entries.pop(key, None)
+            self._counter.record(result is not None)
+            return result
+
+    def put(self, embedding, chunk_ids: list, model: str, result: dict, generation: int):
+        key = (model, tuple(chunk_ids))
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries.setdefault(key, []).append((time.monotonic(), self._unit(embedding), result))
+            self._entries.move_to_end(key)
+            self._size += 1
+            while self._size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.generation += 1
+
+    def get_stats(self) -> dict:
+        return self._counter.get_stats(self._size)
@@ -1,129 +1,443 @@
+import asyncio
+import json
 import os
+import time
+from collections import deque
 import httpx
-import chromadb
-from chromadb.config import Settings
+import numpy as np
 from typing import List
+from embedding_cache import EmbeddingCache
+from chunker import chunk_text, chunk_id
+from rag_cache import QueryEmbeddingCache, AnswerCache
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from vector_store import create_vector_store
+from embedding_provider import create_embedding_provider, local_embedding_available, OLLAMA_EMBEDDING_MODEL
+from ollama_client import OllamaClient, OllamaUnavailable
+from context_builder import build_context, build_prompt, clamp_top_k
+from metrics import RAG_STAGE_SECONDS
+
+# 임베딩 요청 배치 크기 (캐시에 없는 텍스트를 이 단위로 나눠 동시에 요청)
+EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "32"))
+
+# 하이브리드 검색 - 각 검색기에서 top_k * 배수만큼 후보를 뽑아 RRF로 합침
+RETRIEVAL_CANDIDATES = int(os.getenv("RAG_RETRIEVAL_CANDIDATES", "4"))
+# 질의 임베딩이 이 시간을 넘기면 키워드 검색 결과만 사용
+QUERY_EMBED_TIMEOUT = float(os.getenv("RAG_QUERY_EMBED_TIMEOUT", "3"))
+
+# 벡터 저장소 백엔드 (numpy: 메모리 매핑 행렬, chroma: ChromaDB)
+VECTOR_STORE_BACKEND = os.getenv("RAG_VECTOR_STORE", "numpy")
+
+# 임베딩 모델 로드 실패 시 재시도 간격 (초)
+RAG_PREPARE_RETRY = float(os.getenv("RAG_PREPARE_RETRY", "60"))
+
+# 생성 모델을 메모리에 유지하는 시간 (언로드되면 고정 지시문의 KV 캐시도 사라짐)
+LLM_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+# 생성 모델 없이 검색 결과로 응답할 때 앞에 붙이는 안내
+RETRIEVAL_ONLY_NOTICE = "답변 생성 모델을 사용할 수 없어 관련 매뉴얼 내용을 안내합니다.\n\n"
+
+async def _replay(text: str):
+    """캐시된 답변을 스트림 형태로 반환"""
+    yield text
 
 class RAGEngine:
     def __init__(self):
         # Render 환경 감지
         self.is_render = os.getenv("RENDER") is not None
+        self.ollama = None
+        self.embedding_cache = None
+        self.query_cache = QueryEmbeddingCache()
+        self.answer_cache = AnswerCache()
+        # 최근 스트리밍 응답의 (첫 토큰 ms, 전체 ms)
+        self.stream_latencies = deque(maxlen=200)
+        self.stream_cancelled = 0
+        self.lexical_index = None
+        self.lexical_fallbacks = 0
+        # 최근 질의의 컨텍스트 구성 결과 (검색 청크 수/사용 청크 수/토큰)
+        self.context_stats = deque(maxlen=200)
+        self.llm_enabled = False
+        # 임베딩 모델 로드/재임베딩 완료 여부 (완료 전에는 키워드 검색만 사용)
+        self.embedder_ready = False
+        self.embedder_error = None
+        # Ollama 장애/과부하로 검색 결과만 응답한 횟수
+        self.generation_fallbacks = 0
         
-        if self.is_render:
+        # 임베딩 제공자 - Render(Ollama 없음)는 프로세스 내 모델, 로컬은 Ollama
+        provider = os.getenv("RAG_EMBEDDING_PROVIDER", "local" if self.is_render else "ollama")
+        if (self.is_render and provider != 'local') or (provider == 'local' and not local_embedding_available()):
             # 배포 환경 - RAG 비활성화
-            print("⚠️  RAG disabled in production environment (Ollama not available)")
+            if provider == 'local':
+                print("⚠️  RAG disabled (sentence-transformers not installed)")
+            else:
+                print(f"⚠️  RAG disabled in production environment ({provider} embeddings not available)")
             self.enabled = False
-            self.client = None
-            self.collection = None
+            self.store = None
+            self.embedder = None
             self.ollama_url = None
             self.embedding_model = None
             self.llm_model = None
             return
         
-        # 로컬 환경 - RAG 활성화
-        print("✅ RAG enabled in local environment")
+        print(f"✅ RAG enabled ({provider} embeddings)")
         self.enabled = True
-        self.ollama_url = "http://localhost:11434/api"
-        self.embedding_model = "nomic-embed-text"
-        self.llm_model = "bllossom"  # Bllossom/llama-3.2-Korean-Bllossom-3B
+        self.ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434/api")
+        # Render에서는 OLLAMA_URL을 지정한 경우에만 답변 생성 (없으면 검색 결과로 응답)
+        self.llm_enabled = not self.is_render or os.getenv("OLLAMA_URL") is not None
+        self.ollama = OllamaClient(self.ollama_url)
+        self.embedder = create_embedding_provider(provider, self.ollama)
+        self.embedding_model = self.embedder.model
+        self.llm_model = "bllossom" if self.llm_enabled else None  # Bllossom/llama-3.2-Korean-Bllossom-3B
+        self.embedding_cache = EmbeddingCache()
         
-        # ChromaDB 초기화
-        db_path = os.path.join(
+        # 벡터 저장소 초기화
+        data_dir = os.getenv("RAG_DATA_DIR") or os.path.join(
             os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
-            'data', 
-            'chromadb'
+            'data'
         )
-        os.makedirs(db_path, exist_ok=True)
+        os.makedirs(data_dir, exist_ok=True)
         
-        self.client = chromadb.PersistentClient(path=db_path)
+        self.store = create_vector_store(VECTOR_STORE_BACKEND, data_dir)
         
-        # 컬렉션 생성/로드
+        # 키워드(BM25) 색인 - data/chromadb 옆에 저장, 벡터 저장소와 다르면 재구성
+        self.lexical_index = BM25Index(os.path.join(data_dir, 'bm25_index.json'))
+        self._sync_lexical_index()
+    
+    def _sync_lexical_index(self):
+        loaded = self.lexical_index.load()
+        ids, documents, metadatas = self.store.get_all()
+        if loaded and set(ids) == set(self.lexical_index.documents):
+            return
+        self.lexical_index.clear()
+        self.lexical_index.upsert(ids, documents, metadatas)
+        self.lexical_index.save()
+    
+    async def start(self):
+        """서버 시작 시 Ollama 연결 풀 생성"""
+        if self.ollama is not None:
+            await self.ollama.start()
+    
+    async def close(self):
+        if self.embedder is not None:
+            await self.embedder.close()
+        if self.ollama is not None:
+            await self.ollama.close()
+    
+    async def prepare(self) -> bool:
+        """임베딩 모델 로드, 모델이 바뀌었으면 저장된 청크 재임베딩 (서버 시작 후 백그라운드에서 호출)
+        
+        모델 로드 실패(다운로드 불가 등) 시 False - 그동안 질의는 키워드 검색만 사용.
+        """
+        if not self.enabled or self.embedder_ready:
+            return True
         try:
-            self.collection = self.client.get_collection("smt_manuals")
-        except:
-            self.collection = self.client.create_collection("smt_manuals")
+            await self.embedder.warm()
+        except Exception as e:
+            self.embedder_error = f"{type(e).__name__}: {e}"
+            print(f"⚠️  Embedding model load failed ({self.embedder_error}), using keyword search only")
+            return False
+        
+        # 모델 기록 이전 데이터는 기존 기본 모델(nomic-embed-text)로 만든 것
+        stored = self.store.embedding_model or (OLLAMA_EMBEDDING_MODEL if self.store.count() else None)
+        if stored != self.embedding_model:
+            ids, documents, metadatas = self.store.get_all()
+            if ids:
+                print(f"🔄 Re-embedding {len(ids)} chunks ({stored} -> {self.embedding_model})")
+            embeddings = await self.get_embeddings(documents) if ids else []
+            await asyncio.to_thread(self.store.replace_all, ids, embeddings, documents, metadatas, self.embedding_model)
+            self.answer_cache.invalidate()
+        self.embedder_ready = True
+        self.embedder_error = None
+        return True
+    
+    async def get_embeddings(self, texts: List[str], cache: bool = True) -> List[List[float]]:
+        """여러 텍스트 임베딩 - 캐시에 없는 것만 배치로 요청"""
+        if not self.enabled or not texts:
+            return []
+        
+        cached = await asyncio.to_thread(self.embedding_cache.get_many, self.embedding_model, texts) if cache else {}
+        missing = [i for i in range(len(texts)) if i not in cached]
+        
+        batches = [missing[start:start + EMBED_BATCH_SIZE] for start in range(0, len(missing), EMBED_BATCH_SIZE)]
+        results = await asyncio.gather(*[
+            self.embedder.embed([texts[i] for i in batch]) for batch in batches
+        ])
+        
+        embedded = {}
+        for batch, vectors in zip(batches, results):
+            for i, vector in zip(batch, vectors):
+                # /api/embed와 /api/embeddings 정규화 여부가 달라 코사인 기준으로 통일
+                array = np.asarray(vector, dtype=np.float32)
+                norm = np.linalg.norm(array)
+                embedded[i] = (array / norm if norm else array).tolist()
+        
+        if cache and embedded:
+            await asyncio.to_thread(
+                self.embedding_cache.put_many, self.embedding_model,
+                [texts[i] for i in embedded], list(embedded.values())
+            )
+        
+        cached.update(embedded)
+        return [cached[i] for i in range(len(texts))]
     
-    async def get_embedding(self, text: str) -> List[float]:
+    async def get_embedding(self, text: str, cache: bool = True) -> List[float]:
         """Ollama로 임베딩 생성"""
         if not self.enabled:
             return []
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{self.ollama_url}/embeddings",
-                json={
-                    "model": self.embedding_model,
-                    "prompt": text
-                }
-            )
-            return response.json()["embedding"]
+        embeddings = await self.get_embeddings([text], cache=cache)
+        return embeddings[0]
+    
+    @staticmethod
+    def _chunk_document(text: str, metadata: dict):
+        """제목/번호 섹션/문장 경계 기준 청크 -> (메타데이터, {내용 해시 id: 청크}) - 문서 내 중복 청크는 1개만"""
+        metadata = dict(metadata or {})
+        filename = metadata.setdefault('filename', 'doc')
+        chunks = {}
+        for chunk in chunk_text(text):
+            chunks.setdefault(chunk_id(filename, chunk['text']), chunk)
+        return metadata, chunks
+    
+    async def add_document_keywords(self, text: str, metadata: dict = None):
+        """임베딩 모델 준비 전 - 키워드(BM25) 색인에만 등록 (준비 후 add_document가 벡터 저장소에 반영)"""
+        if not self.enabled:
+            return
+        metadata, chunks = self._chunk_document(text, metadata)
+        self.lexical_index.upsert(
+            list(chunks),
+            [chunk['text'] for chunk in chunks.values()],
+            [dict(metadata, section=chunk['section'] or '') for chunk in chunks.values()]
+        )
     
     async def add_document(self, text: str, metadata: dict = None):
-        """문서 추가"""
+        """문서 추가 - 같은 파일을 다시 올리면 바뀐 청크만 임베딩/저장하고 사라진 청크는 삭제"""
         if not self.enabled:
             return {"success": False, "message": "RAG not available in production"}
+        if not self.embedder_ready:
+            # 모델 로드/재임베딩 전에는 저장된 벡터와 섞이지 않도록 거부
+            return {"success": False, "message": "임베딩 모델을 준비 중입니다. 잠시 후 다시 시도하세요."}
+        
+        started = time.perf_counter()
+        metadata, chunks = self._chunk_document(text, metadata)
+        filename = metadata['filename']
+        
+        existing_ids = set(await asyncio.to_thread(self.store.get_ids, filename))
+        added_ids = [doc_id for doc_id in chunks if doc_id not in existing_ids]
+        removed_ids = [doc_id for doc_id in existing_ids if doc_id not in chunks]
         
-        # 텍스트를 청크로 분할 (500자 단위)
-        chunks = [text[i:i+500] for i in range(0, len(text), 500)]
-        
-        for idx, chunk in enumerate(chunks):
-            embedding = await self.get_embedding(chunk)
-            
-            doc_id = f"{metadata.get('filename', 'doc')}_{idx}" if metadata else f"doc_{idx}"
-            
-            self.collection.add(
-                embeddings=[embedding],
-                documents=[chunk],
-                metadatas=[metadata or {}],
-                ids=[doc_id]
+        if added_ids:
+            documents = [chunks[doc_id]['text'] for doc_id in added_ids]
+            metadatas = [dict(metadata, section=chunks[doc_id]['section'] or '') for doc_id in added_ids]
+            embeddings = await self.get_embeddings(documents)
+            await asyncio.to_thread(
+                self.store.upsert,
+                ids=added_ids,
+                embeddings=embeddings,
+                documents=documents,
+                metadatas=metadatas
             )
+            self.lexical_index.upsert(added_ids, documents, metadatas)
+        if removed_ids:
+            await asyncio.to_thread(self.store.delete, removed_ids)
+            self.lexical_index.delete(removed_ids)
+        if added_ids or removed_ids:
+            await asyncio.to_thread(self.lexical_index.save)
+            # 저장 완료 후 무효화 (저장 중 시작된 질의의 답변도 버려짐)
+            self.answer_cache.invalidate()
+        
+        return {
+            "success": True,
+            "chunks": len(chunks),
+            "added": len(added_ids),
+            "removed": len(removed_ids),
+            "unchanged": len(chunks) - len(added_ids),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
     
     async def search(self, query: str, top_k: int = 3) -> List[dict]:
         """유사 문서 검색"""
         if not self.enabled:
             return []
         
-        query_embedding = await self.get_embedding(query)
+        documents, _, _ = await self.retrieve(query, top_k)
+        return documents
+    
+    async def retrieve(self, query: str, top_k: int = 3):
+        """하이브리드 검색 (BM25 + 벡터, RRF 결합) -> (문서, 질의 임베딩, 모드)
         
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k
-        )
+        임베딩 서버가 느리거나 응답하지 않으면 키워드 검색 결과만 반환 (임베딩은 None).
+        """
+        top_k = clamp_top_k(top_k)
+        candidates = top_k * RETRIEVAL_CANDIDATES
+        started = time.perf_counter()
+        lexical = self.lexical_index.search(query, candidates)
+        search_seconds = time.perf_counter() - started
         
-        documents = []
-        if results['documents'] and len(results['documents']) > 0:
-            for doc, metadata in zip(results['documents'][0], results['metadatas'][0]):
-                documents.append({
-                    'content': doc,
-                    'metadata': metadata
-                })
+        if not self.embedder_ready:
+            RAG_STAGE_SECONDS.observe(search_seconds, stage='retrieve')
+            return [self.lexical_index.get(doc_id) for doc_id, _ in lexical[:top_k]], None, 'lexical'
         
-        return documents
+        try:
+            with RAG_STAGE_SECONDS.time(stage='embed'):
+                query_embedding = await asyncio.wait_for(self.get_query_embedding(query), QUERY_EMBED_TIMEOUT)
+        except (asyncio.TimeoutError, OllamaUnavailable, httpx.HTTPError, KeyError) as e:
+            self.lexical_fallbacks += 1
+            RAG_STAGE_SECONDS.observe(search_seconds, stage='retrieve')
+            print(f"⚠️  Query embedding failed ({type(e).__name__}), using keyword search only")
+            return [self.lexical_index.get(doc_id) for doc_id, _ in lexical[:top_k]], None, 'lexical'
+        
+        # retrieve 단계 = 키워드 + 벡터 검색 + 결합 (질의 임베딩 시간 제외)
+        started = time.perf_counter()
+        vector = await self.search_by_embedding(query_embedding, candidates)
+        by_id = {doc['id']: doc for doc in vector}
+        fused = reciprocal_rank_fusion([[doc['id'] for doc in vector], [doc_id for doc_id, _ in lexical]])
+        documents = []
+        for doc_id, _ in fused[:top_k]:
+            document = by_id.get(doc_id) or self.lexical_index.get(doc_id)
+            if document is not None:
+                documents.append(document)
+        RAG_STAGE_SECONDS.observe(search_seconds + time.perf_counter() - started, stage='retrieve')
+        return documents, query_embedding, 'hybrid'
+    
+    async def get_query_embedding(self, query: str) -> List[float]:
+        """질의 임베딩 (LRU+TTL 캐시)"""
+        embedding = self.query_cache.get(self.embedding_model, query)
+        if embedding is None:
+            embedding = await self.get_embedding(query, cache=False)
+            self.query_cache.put(self.embedding_model, query, embedding)
+        return embedding
+    
+    async def search_by_embedding(self, query_embedding: List[float], top_k: int = 3) -> List[dict]:
+        return await asyncio.to_thread(self.store.query, query_embedding, top_k)
     
     async def generate_answer(self, query: str, context: str) -> str:
         """LLM으로 답변 생성"""
         if not self.enabled:
             return "RAG 기능은 로컬 환경에서만 사용 가능합니다."
+        answer, _ = await self._generate(query, context)
+        return answer
+    
+    async def _generate(self, query: str, context: str):
+        """(답변, LLM 생성 여부) - Ollama 장애/과부하 시 검색 결과로 대체"""
+        if not self.llm_enabled:
+            return RETRIEVAL_ONLY_NOTICE + context, False
+        try:
+            with RAG_STAGE_SECONDS.time(stage='generate'):
+                response = await self.ollama.post('generate', '/generate', {
+                    "model": self.llm_model,
+                    "prompt": build_prompt(query, context),
+                    "stream": False,
+                    "keep_alive": LLM_KEEP_ALIVE
+                })
+            response.raise_for_status()
+        except (OllamaUnavailable, httpx.HTTPStatusError) as e:
+            # 4xx(모델 미설치, 잘못된 요청 등)도 검색 결과로 대체 - 클라이언트에 500으로 노출하지 않음
+            self.generation_fallbacks += 1
+            print(f"⚠️  Generation unavailable ({e}), returning retrieved sections")
+            return RETRIEVAL_ONLY_NOTICE + context, False
+        return response.json()["response"], True
+    
+    def _build_context(self, documents: List[dict]):
+        """토큰 예산/중복 제거를 적용한 (사용 문서, 컨텍스트)"""
+        documents, context, stats = build_context(documents)
+        self.context_stats.append(stats)
+        return documents, context
+    
+    async def stream_answer(self, query: str, context: str, status: dict = None):
+        """LLM 답변을 토큰 단위로 생성 (제너레이터를 닫으면 Ollama 연결도 끊겨 생성 중단)
         
-        prompt = f"""다음 매뉴얼 내용을 참고하여 질문에 답변하세요.
-
-매뉴얼 내용:
-{context}
-
-질문: {query}
-
-답변 (간결하고 명확하게):"""
-
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{self.ollama_url}/generate",
-                json={
+        생성을 시작할 수 없으면 검색 결과를 한 번에 반환하고 status['fallback']을 True로 설정.
+        """
+        status = status if status is not None else {}
+        status['fallback'] = False
+        if not self.llm_enabled:
+            yield RETRIEVAL_ONLY_NOTICE + context
+            return
+        try:
+            with RAG_STAGE_SECONDS.time(stage='generate'):
+                async with self.ollama.stream('/generate', {
                     "model": self.llm_model,
-                    "prompt": prompt,
-                    "stream": False
-                }
-            )
-            return response.json()["response"]
+                    "prompt": build_prompt(query, context),
+                    "stream": True,
+                    "keep_alive": LLM_KEEP_ALIVE
+                }) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        if chunk.get("response"):
+                            yield chunk["response"]
+                        if chunk.get("done"):
+                            break
+        except (OllamaUnavailable, httpx.HTTPStatusError) as e:
+            self.generation_fallbacks += 1
+            status['fallback'] = True
+            print(f"⚠️  Generation unavailable ({e}), returning retrieved sections")
+            yield RETRIEVAL_ONLY_NOTICE + context
+    
+    async def query_stream(self, query: str, top_k: int = 3):
+        """스트리밍 RAG 쿼리 - (이벤트, 데이터)를 sources -> token... -> done 순서로 생성"""
+        started = time.perf_counter()
+        if not self.enabled:
+            yield 'sources', {'sources': [], 'cached': False, 'retrieval_ms': 0.0}
+            yield 'token', {'text': 'RAG 기능은 로컬 환경에서만 사용 가능합니다.'}
+            yield 'done', {'retrieval_ms': 0.0, 'ttft_ms': None, 'total_ms': 0.0, 'tokens': 0}
+            return
+        
+        generation = self.answer_cache.generation
+        documents, query_embedding, mode = await self.retrieve(query, top_k)
+        documents, context = self._build_context(documents)
+        retrieval_ms = round((time.perf_counter() - started) * 1000, 1)
+        
+        sources = list({doc['metadata'].get('filename', 'Unknown'): None for doc in documents})
+        chunk_ids = [doc['id'] for doc in documents]
+        cached = self.answer_cache.get(query_embedding, chunk_ids, self.llm_model) if documents and query_embedding else None
+        yield 'sources', {'sources': sources, 'cached': cached is not None, 'retrieval': mode, 'retrieval_ms': retrieval_ms}
+        
+        if not documents:
+            yield 'token', {'text': '관련 매뉴얼을 찾을 수 없습니다. 문서를 먼저 업로드해주세요.'}
+            yield 'done', {'retrieval_ms': retrieval_ms, 'ttft_ms': None, 'total_ms': retrieval_ms, 'tokens': 0}
+            return
+        
+        status = {'fallback': False}
+        if cached is not None:
+            pieces = _replay(cached['answer'])
+        else:
+            pieces = self.stream_answer(query, context, status)
+        
+        tokens = []
+        ttft_ms = None
+        try:
+            async for piece in pieces:
+                if ttft_ms is None:
+                    ttft_ms = round((time.perf_counter() - started) * 1000, 1)
+                tokens.append(piece)
+                yield 'token', {'text': piece}
+        except (GeneratorExit, asyncio.CancelledError):
+            self.stream_cancelled += 1
+            raise
+        finally:
+            # 클라이언트 연결 종료 시 여기서 Ollama 스트림을 닫아 생성 중단
+            await pieces.aclose()
+        
+        total_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.stream_latencies.append((ttft_ms, total_ms))
+        if cached is None and query_embedding and not status['fallback']:
+            result = {'answer': ''.join(tokens), 'sources': sources}
+            self.answer_cache.put(query_embedding, chunk_ids, self.llm_model, result, generation)
+        yield 'done', {'retrieval_ms': retrieval_ms, 'ttft_ms': ttft_ms, 'total_ms': total_ms,
+                       'tokens': len(tokens), 'fallback': status['fallback']}
+    
+    def get_stream_stats(self) -> dict:
+        """스트리밍 응답 지연 (첫 토큰 / 전체)"""
+        stats = {'count': len(self.stream_latencies), 'cancelled': self.stream_cancelled}
+        for name, index in (('ttft_ms', 0), ('total_ms', 1)):
+            values = [latency[index] for latency in self.stream_latencies if latency[index] is not None]
+            stats[name] = {
+                'p50': round(float(np.percentile(values, 50)), 1),
+                'p95': round(float(np.percentile(values, 95)), 1)
+            } if values else None
+        return stats
     
     async def query(self, query: str, top_k: int = 3) -> dict:
         """RAG 쿼리"""
@@ -134,7 +448,11 @@ class RAGEngine:
             }
         
         # 관련 문서 검색
-        documents = await self.search(query, top_k)
+        generation = self.answer_cache.generation
+        documents, query_embedding, _ = await self.retrieve(query, top_k)
+        
+        # 컨텍스트 구성 (토큰 예산, 중복/겹치는 청크 제거, 관련도 순)
+        documents, context = self._build_context(documents)
         
         if not documents:
             return {
@@ -142,39 +460,77 @@ class RAGEngine:
                 'sources': []
             }
         
-        # 컨텍스트 구성
-        context = "\n\n".join([doc['content'] for doc in documents])
+        # 같은 청크로 답한 비슷한 질문이 있으면 재사용
+        chunk_ids = [doc['id'] for doc in documents]
+        cached = self.answer_cache.get(query_embedding, chunk_ids, self.llm_model) if query_embedding else None
+        if cached is not None:
+            return cached
         
-        # 답변 생성
-        answer = await self.generate_answer(query, context)
+        # 답변 생성 (Ollama 장애 시 검색 결과로 대체, 캐시하지 않음)
+        answer, generated = await self._generate(query, context)
         
         # 출처 정리
         sources = [doc['metadata'].get('filename', 'Unknown') for doc in documents]
         sources = list(set(sources))  # 중복 제거
         
-        return {
+        result = {
             'answer': answer,
             'sources': sources
         }
+        if query_embedding and (generated or not self.llm_enabled):
+            self.answer_cache.put(query_embedding, chunk_ids, self.llm_model, result, generation)
+        return result
     
     def get_document_count(self) -> int:
         """저장된 문서 수"""
-        if not self.enabled or not self.collection:
+        if not self.enabled or not self.store:
             return 0
         
         try:
-            return self.collection.count()
+            return self.store.count()
         except:
             return 0
     
+    def get_retrieval_stats(self) -> dict:
+        return {
+            'vector_store': self.store.name if self.store else None,
+            'embedder_ready': self.embedder_ready,
+            'embedder_error': self.embedder_error,
+            'lexical_documents': len(self.lexical_index) if self.lexical_index else 0,
+            'lexical_fallbacks': self.lexical_fallbacks,
+            'context': self.get_context_stats(),
+            'generation_fallbacks': self.generation_fallbacks,
+            'ollama': self.ollama.get_stats() if self.ollama else None
+        }
+    
+    def get_context_stats(self) -> dict:
+        """최근 질의의 컨텍스트 평균 (검색 대비 실제 사용 청크/토큰)"""
+        if not self.context_stats:
+            return None
+        count = len(self.context_stats)
+        return {
+            key: round(sum(stats[key] for stats in self.context_stats) / count, 1)
+            for key in ('retrieved', 'used', 'tokens', 'retrieved_tokens')
+        }
+    
+    def get_cache_stats(self) -> dict:
+        """캐시 적중률"""
+        return {
+            'query_embedding': self.query_cache.get_stats(),
+            'answer': self.answer_cache.get_stats(),
+            'chunk_embedding': self.embedding_cache.get_stats() if self.embedding_cache else None
+        }
+    
     def clear_documents(self):
         """모든 문서 삭제"""
-        if not self.enabled or not self.client:
+        if not self.enabled or not self.store:
             return {"success": False, "message": "RAG not available"}
         
         try:
-            self.client.delete_collection("smt_manuals")
-            self.collection = self.client.create_collection("smt_manuals")
+            self.store.clear()
+            self.lexical_index.clear()
+            self.lexical_index.save()
+            self.answer_cache.invalidate()
             return {"success": True, "message": "문서가 삭제되었습니다."}
         except Exception as e:
             return {"success": False, "message": f"삭제 실패: {str(e)}"}
@@ -0,0 +1,207 @@
+import math
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from sqlalchemy import select, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import SMTRollup
+from storage import reading_repository
+
+# 버킷 크기 (초)
+ROLLUP_RESOLUTIONS = {'1m': 60, '1h': 3600}
+CHART_METRICS = ['temperature', 'vibration', 'current', 'failure_probability']
+CHART_RESOLUTIONS = ('auto', 'raw') + tuple(ROLLUP_RESOLUTIONS)
+
+DEFAULT_MAX_POINTS = 2000
+UPSERT_BATCH_SIZE = 5000
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch_seconds(timestamps) -> np.ndarray:
+    """naive datetime -> epoch 초 (타임존 변환 없이 벽시계 기준)"""
+    index = pd.DatetimeIndex(timestamps)
+    return ((index - pd.Timestamp(EPOCH)) // pd.Timedelta(seconds=1)).to_numpy(dtype=np.int64)
+
+
+def aggregate_rollups(line_ids, timestamps, metrics: dict) -> list:
+    """입력 행을 (라인, 해상도, 버킷)별 count/sum/min/max로 집계"""
+    epoch = to_epoch_seconds(timestamps)
+    frame = pd.DataFrame({'line_id': np.asarray(line_ids, dtype=object)})
+    for metric in CHART_METRICS:
+        frame[metric] = np.asarray(metrics[metric], dtype=np.float64)
+
+    rows = []
+    for resolution in ROLLUP_RESOLUTIONS.values():
+        frame['bucket'] = epoch // resolution * resolution
+        grouped = frame.groupby(['line_id', 'bucket'])
+        agg = grouped[CHART_METRICS].agg(['sum', 'min', 'max'])
+        agg.columns = [f'{metric}_{stat}' for metric, stat in agg.columns]
+        agg['count'] = grouped.size()
+        for (line_id, bucket), values in zip(agg.index, agg.to_dict('records')):
+            values.update(line_id=line_id, resolution=resolution, bucket=int(bucket))
+            values['count'] = int(values['count'])
+            rows.append(values)
+    return rows
+
+
+def _upsert_statement(dialect_name: str):
+    """기존 버킷이 있으면 count/sum은 더하고 min/max는 비교해 갱신"""
+    if dialect_name == 'postgresql':
+        stmt = pg_insert(SMTRollup)
+        least, greatest = func.least, func.greatest
+    else:
+        stmt = sqlite_insert(SMTRollup)
+        least, greatest = func.min, func.max
+
+    table = SMTRollup.__table__
+    excluded = stmt.excluded
+    updates = {'count': table.c['count'] + excluded['count']}
+    for metric in CHART_METRICS:
+        updates[f'{metric}_sum'] = table.c[f'{metric}_sum'] + excluded[f'{metric}_sum']
+        updates[f'{metric}_min'] = least(table.c[f'{metric}_min'], excluded[f'{metric}_min'])
+        updates[f'{metric}_max'] = greatest(table.c[f'{metric}_max'], excluded[f'{metric}_max'])
+
+    return stmt.on_conflict_do_update(
+        index_elements=['line_id', 'resolution', 'bucket'],
+        set_=updates
+    )
+
+
+def update_rollups(db: Session, line_ids, timestamps, metrics: dict):
+    """insert된 행을 롤업 테이블에 증분 반영 (commit은 호출자가 수행)"""
+    if len(line_ids) == 0:
+        return
+    rows = aggregate_rollups(line_ids, timestamps, metrics)
+    stmt = _upsert_statement(db.get_bind().dialect.name)
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        db.execute(stmt, rows[start:start + UPSERT_BATCH_SIZE])
+
+
+def update_rollups_from_dataframe(db: Session, df: pd.DataFrame, timestamps):
+    metrics = {metric: df[metric].to_numpy() for metric in CHART_METRICS if metric in df.columns}
+    metrics.setdefault('failure_probability', np.zeros(len(df)))
+    update_rollups(db, df['line_id'].to_numpy(), timestamps, metrics)
+
+
+def rebuild_rollups(db: Session, chunk_size: int = 50000):
+    """롤업이 비어 있으면 원본 테이블에서 재구성 (기존 DB 최초 1회)"""
+    if db.query(SMTRollup).first() is not None or not reading_repository.has_rows(db):
+        return False
+
+    columns = ['line_id', 'timestamp'] + CHART_METRICS
+    for rows in reading_repository.iter_rows(db, columns, chunk_size=chunk_size):
+        frame = pd.DataFrame(rows, columns=columns)
+        frame = frame.dropna(subset=['line_id', 'timestamp'])
+        update_rollups_from_dataframe(db, frame.fillna(0.0), frame['timestamp'])
+    db.commit()
+    return True
+
+
+def _resolution_query(line_id: str, start_epoch: int):
+    """1분 롤업 기준 원본 행 수 / 버킷 수"""
+    minute = ROLLUP_RESOLUTIONS['1m']
+    return select(func.sum(SMTRollup.count), func.count())\
+        .where(SMTRollup.line_id == line_id)\
+        .where(SMTRollup.resolution == minute)\
+        .where(SMTRollup.bucket >= start_epoch // minute * minute)
+
+
+def _choose_resolution(raw_count: int, minute_buckets: int, max_points: int) -> str:
+    """max_points 이하인 가장 세밀한 해상도 선택"""
+    if (raw_count or 0) <= max_points:
+        return 'raw'
+    if minute_buckets <= max_points:
+        return '1m'
+    return '1h'
+
+
+def _bucket_query(line_id: str, resolution: str, start_epoch: int):
+    size = ROLLUP_RESOLUTIONS[resolution]
+    # ORM 객체 대신 컬럼 값만 조회 (버킷 수천 개 변환 비용 절감)
+    return select(*SMTRollup.__table__.columns)\
+        .where(SMTRollup.line_id == line_id)\
+        .where(SMTRollup.resolution == size)\
+        .where(SMTRollup.bucket >= start_epoch // size * size)\
+        .order_by(SMTRollup.bucket)
+
+
+def _merge_buckets(rows: list, max_points: int) -> list:
+    """버킷 수가 max_points를 넘으면 인접 버킷을 묶어 재집계"""
+    if len(rows) <= max_points:
+        return rows
+    group = math.ceil(len(rows) / max_points)
+    merged = []
+    for start in range(0, len(rows), group):
+        chunk = rows[start:start + group]
+        values = {'bucket': chunk[0]['bucket'], 'count': sum(r['count'] for r in chunk)}
+        for metric in CHART_METRICS:
+            values[f'{metric}_sum'] = sum(r[f'{metric}_sum'] for r in chunk)
+            values[f'{metric}_min'] = min(r[f'{metric}_min'] for r in chunk)
+            values[f'{metric}_max'] = max(r[f'{metric}_max'] for r in chunk)
+        merged.append(values)
+    return merged
+
+
+RAW_CHART_COLUMNS = ['timestamp'] + CHART_METRICS
+
+
+def _raw_chart(rows: list) -> dict:
+    """원본 행 - 값이 곧 min/max이므로 min/max는 생략 (응답 크기 1/3)"""
+    chart = {
+        'resolution': 'raw',
+        'timestamps': [row[0].isoformat() for row in rows],
+        'count': [1] * len(rows)
+    }
+    for i, metric in enumerate(CHART_METRICS, start=1):
+        chart[metric] = [row[i] for row in rows]
+    return chart
+
+
+def _bucket_chart(resolution: str, buckets: list, max_points: int) -> dict:
+    rows = _merge_buckets(buckets, max_points)
+
+    chart = {
+        'resolution': resolution,
+        'timestamps': [(EPOCH + timedelta(seconds=r['bucket'])).isoformat() for r in rows],
+        'count': [r['count'] for r in rows]
+    }
+    for metric in CHART_METRICS:
+        chart[metric] = [r[f'{metric}_sum'] / r['count'] if r['count'] else None for r in rows]
+    chart['min'] = {metric: [r[f'{metric}_min'] for r in rows] for metric in CHART_METRICS}
+    chart['max'] = {metric: [r[f'{metric}_max'] for r in rows] for metric in CHART_METRICS}
+    return chart
+
+
+def query_chart(db: Session, line_id: str, start_time: datetime,
+                resolution: str = 'auto', max_points: int = DEFAULT_MAX_POINTS) -> dict:
+    """차트용 시계열 - 원본 또는 롤업 버킷(min/max/mean)"""
+    start_epoch = int((start_time - EPOCH).total_seconds())
+    if resolution == 'auto':
+        raw_count, minute_buckets = db.execute(_resolution_query(line_id, start_epoch)).one()
+        resolution = _choose_resolution(raw_count, minute_buckets, max_points)
+
+    if resolution == 'raw':
+        return _raw_chart(reading_repository.range_rows(db, RAW_CHART_COLUMNS, line_id, start_time))
+
+    buckets = db.execute(_bucket_query(line_id, resolution, start_epoch)).mappings().all()
+    return _bucket_chart(resolution, buckets, max_points)
+
+
+async def query_chart_async(db: AsyncSession, line_id: str, start_time: datetime,
+                            resolution: str = 'auto', max_points: int = DEFAULT_MAX_POINTS) -> dict:
+    """query_chart의 AsyncSession 버전"""
+    start_epoch = int((start_time - EPOCH).total_seconds())
+    if resolution == 'auto':
+        raw_count, minute_buckets = (await db.execute(_resolution_query(line_id, start_epoch))).one()
+        resolution = _choose_resolution(raw_count, minute_buckets, max_points)
+
+    if resolution == 'raw':
+        rows = await reading_repository.range_rows_async(db, RAW_CHART_COLUMNS, line_id, start_time)
+        return _raw_chart(rows)
+
+    buckets = (await db.execute(_bucket_query(line_id, resolution, start_epoch))).mappings().all()
+    return _bucket_chart(resolution, buckets, max_points)
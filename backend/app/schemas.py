@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 
 class SMTDataCreate(BaseModel):
     line_id: str
@@ -49,8 +49,21 @@ class PredictionResponse(BaseModel):
     risk_level: str
     recommendations: List[str]
 
+class BatchPredictionRequest(BaseModel):
+    # 행 단위(readings) 또는 컬럼 단위(columns) 중 하나로 전달
+    readings: Optional[List[PredictionRequest]] = None
+    # 특성 컬럼만 숫자로 검증, 그 외 키(line_id, timestamp 등)는 무시
+    columns: Optional[Dict[str, List[Any]]] = None
+
+class BatchPredictionResponse(BaseModel):
+    count: int
+    predictions: List[PredictionResponse]
+
 class TrainingRequest(BaseModel):
     min_samples: int = 100
+    mode: str = 'all'                    # all / window / sample
+    days: Optional[int] = None           # window·sample: 최근 N일
+    sample_size: Optional[int] = None    # sample: 층화 저수지 샘플 크기
 
 class TrainingResponse(BaseModel):
     success: bool
@@ -60,6 +73,18 @@ class TrainingResponse(BaseModel):
     recall: float
     f1_score: float
 
+class TrainingJobResponse(BaseModel):
+    job_id: str
+    status: str                          # queued / running / completed / failed
+    stage: str
+    progress: float
+    params: dict
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result: Optional[TrainingResponse] = None
+    error: Optional[str] = None
+
 class RAGQueryRequest(BaseModel):
     query: str
     top_k: int = 3
@@ -0,0 +1,342 @@
+import asyncio
+import io
+import os
+import time
+import pandas as pd
+from datetime import datetime
+from sqlalchemy import select, insert, delete, func, case
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import SMTData, engine, run_after_commit
+from archive import ParquetArchive, ARCHIVE_COLUMNS
+
+# SQLAlchemy SQLite DateTime 저장 형식
+SQLITE_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+# PostgreSQL 월별 파티션당 라인 해시 하위 파티션 수
+PG_LINE_PARTITIONS = int(os.getenv("PG_LINE_PARTITIONS", "4"))
+
+
+class ReadingRepository:
+    """smt_data 저장소 - 원본 센서 데이터 읽기/쓰기는 모두 이 인터페이스를 통해 수행
+
+    기본 구현은 SQLAlchemy Core/ORM만 사용 (방언 무관).
+    방언별 구현은 대량 적재 등 성능이 중요한 부분만 재정의.
+    archive가 있으면 오래된 데이터(Parquet)도 조회 대상에 포함 (학습/차트/통계).
+    """
+    name = 'generic'
+
+    def __init__(self, archive: ParquetArchive = None):
+        self.archive = archive if archive is not None and archive.enabled else None
+
+    # ---------- 쓰기 ----------
+
+    def insert_rows(self, db: Session, columns: dict, timestamps: pd.DatetimeIndex):
+        """컬럼별 리스트를 일괄 insert (commit은 호출자가 수행)"""
+        columns = dict(columns, timestamp=timestamps.to_pydatetime().tolist())
+        keys = list(columns.keys())
+        records = [dict(zip(keys, row)) for row in zip(*(columns[k] for k in keys))]
+        db.connection().execute(insert(SMTData.__table__), records)
+
+    def add(self, db: Session, reading: SMTData):
+        """단건 저장 (flush 후 id/timestamp 확정)"""
+        db.add(reading)
+        db.flush()
+
+    # ---------- 읽기 ----------
+    # 엔드포인트 조회는 쿼리를 한 번만 정의하고 동기 Session / AsyncSession 양쪽에서 실행
+
+    def _latest_query(self, line_id: str):
+        return select(SMTData)\
+            .where(SMTData.line_id == line_id)\
+            .order_by(SMTData.timestamp.desc())\
+            .limit(1)
+
+    def _list_query(self, skip: int, limit: int, line_id: str = None):
+        query = select(SMTData)
+        if line_id:
+            query = query.where(SMTData.line_id == line_id)
+        return query.order_by(SMTData.timestamp.desc()).offset(skip).limit(limit)
+
+    def _range_query(self, columns: list, line_id: str, start_time: datetime):
+        return select(*[getattr(SMTData, col) for col in columns])\
+            .where(SMTData.line_id == line_id)\
+            .where(SMTData.timestamp >= start_time)\
+            .order_by(SMTData.timestamp)
+
+    def _count_since_query(self, since: datetime):
+        return select(func.count(SMTData.id)).where(SMTData.timestamp >= since)
+
+    def _merge_archived(self, rows: list, columns: list, line_id: str, start_time: datetime) -> list:
+        """smt_data 조회 결과에 같은 조건의 아카이브 데이터를 합쳐 시간순 정렬"""
+        archived = [row for chunk in self.archive.scan(columns, line_id=line_id, since=start_time)
+                    for row in chunk]
+        if not archived:
+            return rows
+        rows = archived + rows
+        if 'timestamp' in columns:
+            position = columns.index('timestamp')
+            rows.sort(key=lambda row: row[position])
+        return rows
+
+    def _archived_latest(self, line_id: str):
+        """smt_data에 없는 라인(전부 아카이브됨)의 최신 행 - 세션에 추가하지 않은 읽기 전용 객체"""
+        row = self.archive.latest(line_id)
+        return SMTData(**row) if row is not None else None
+
+    def latest(self, db: Session, line_id: str):
+        data = db.execute(self._latest_query(line_id)).scalars().first()
+        if data is None and self.archive is not None:
+            return self._archived_latest(line_id)
+        return data
+
+    async def latest_async(self, db: AsyncSession, line_id: str):
+        data = (await db.execute(self._latest_query(line_id))).scalars().first()
+        if data is None and self.archive is not None:
+            return await asyncio.to_thread(self._archived_latest, line_id)
+        return data
+
+    def list_readings(self, db: Session, skip: int = 0, limit: int = 100, line_id: str = None) -> list:
+        return db.execute(self._list_query(skip, limit, line_id)).scalars().all()
+
+    async def list_readings_async(self, db: AsyncSession, skip: int = 0, limit: int = 100,
+                                  line_id: str = None) -> list:
+        return (await db.execute(self._list_query(skip, limit, line_id))).scalars().all()
+
+    def range_rows(self, db: Session, columns: list, line_id: str, start_time: datetime) -> list:
+        """한 라인의 start_time 이후 데이터 (시간순, 지정 컬럼만)"""
+        rows = [tuple(row) for row in db.execute(self._range_query(columns, line_id, start_time))]
+        if self.archive is None:
+            return rows
+        return self._merge_archived(rows, columns, line_id, start_time)
+
+    async def range_rows_async(self, db: AsyncSession, columns: list, line_id: str, start_time: datetime) -> list:
+        result = await db.execute(self._range_query(columns, line_id, start_time))
+        rows = [tuple(row) for row in result]
+        if self.archive is None:
+            return rows
+        # Parquet 읽기는 동기 I/O - 이벤트 루프를 막지 않도록 스레드에서 실행
+        return await asyncio.to_thread(self._merge_archived, rows, columns, line_id, start_time)
+
+    def iter_rows(self, db: Session, columns: list, since: datetime = None, chunk_size: int = 50000):
+        """지정 컬럼만 청크 단위 스트리밍 (tuple 리스트) - 아카이브, smt_data 순"""
+        if self.archive is not None:
+            yield from self.archive.scan(columns, since=since, chunk_size=chunk_size)
+
+        query = select(*[getattr(SMTData, col) for col in columns])
+        if since is not None:
+            query = query.where(SMTData.timestamp >= since)
+        result = db.execute(query.execution_options(yield_per=chunk_size))
+        for rows in result.partitions(chunk_size):
+            # Row -> tuple 변환 (Row 객체를 직접 배열화하면 매우 느림)
+            yield [tuple(row) for row in rows]
+
+    def count_since(self, db: Session, since: datetime) -> int:
+        count = db.execute(self._count_since_query(since)).scalar() or 0
+        if self.archive is not None:
+            count += self.archive.count(since=since)
+        return count
+
+    async def count_since_async(self, db: AsyncSession, since: datetime) -> int:
+        count = (await db.execute(self._count_since_query(since))).scalar() or 0
+        if self.archive is not None:
+            count += await asyncio.to_thread(self.archive.count, since=since)
+        return count
+
+    def class_counts(self, db: Session, since: datetime = None) -> dict:
+        """failure_occurred별 건수"""
+        query = db.query(SMTData.failure_occurred, func.count(SMTData.id))
+        if since is not None:
+            query = query.filter(SMTData.timestamp >= since)
+        counts = {}
+        for label, count in query.group_by(SMTData.failure_occurred).all():
+            counts[bool(label)] = counts.get(bool(label), 0) + count
+        if self.archive is not None:
+            for label, count, _ in self.archive.group_counts(['failure_occurred'], since):
+                counts[bool(label)] = counts.get(bool(label), 0) + count
+        return counts
+
+    def line_counts(self, db: Session) -> list:
+        """라인별 (line_id, 전체, 고장) 집계"""
+        rows = db.query(
+            SMTData.line_id,
+            func.count(SMTData.id),
+            func.sum(case((SMTData.failure_occurred == True, 1), else_=0))
+        ).group_by(SMTData.line_id).all()
+        if self.archive is None:
+            return rows
+
+        totals = {line_id: [total, failures or 0] for line_id, total, failures in rows}
+        for line_id, total, failures in self.archive.group_counts(['line_id']):
+            current = totals.setdefault(line_id, [0, 0])
+            current[0] += total
+            current[1] += failures
+        return [(line_id, total, failures) for line_id, (total, failures) in totals.items()]
+
+    def has_rows(self, db: Session) -> bool:
+        if db.query(SMTData.id).first() is not None:
+            return True
+        return self.archive is not None and self.archive.count() > 0
+
+    # ---------- 티어링 ----------
+
+    def archive_before(self, db: Session, cutoff: datetime, chunk_size: int = 50000) -> dict:
+        """cutoff 이전 데이터를 Parquet으로 옮기고 smt_data에서 삭제
+
+        1) staging에 Parquet 기록  2) 원본 삭제 commit  3) staging -> 아카이브 이동
+        중간에 중단되면 다음 실행 시 recover_archive가 정리.
+        """
+        if self.archive is None:
+            raise RuntimeError("pyarrow가 설치되지 않아 아카이브를 사용할 수 없습니다.")
+        self.recover_archive(db)
+        start = time.perf_counter()
+
+        # 이후 insert되는 과거 시점 데이터는 다음 실행에서 처리 (id 상한 고정)
+        max_id = db.query(func.max(SMTData.id)).filter(SMTData.timestamp < cutoff).scalar()
+        if max_id is None:
+            return {'archived': 0, 'files': 0, 'cutoff': cutoff.isoformat(), 'elapsed_sec': 0.0}
+
+        staging = self.archive.stage(self.archive.new_run_id(), cutoff, max_id)
+        try:
+            query = select(*[getattr(SMTData, col) for col in ARCHIVE_COLUMNS])\
+                .where(SMTData.timestamp < cutoff)\
+                .where(SMTData.id <= max_id)
+            result = db.execute(query.execution_options(yield_per=chunk_size))
+            archived = 0
+            for index, rows in enumerate(result.partitions(chunk_size)):
+                archived += self.archive.write_chunk(staging, [tuple(row) for row in rows], index)
+
+            db.execute(
+                delete(SMTData)
+                .where(SMTData.timestamp < cutoff)
+                .where(SMTData.id <= max_id)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            self.archive.discard(staging)
+            raise
+
+        files = self.archive.publish(staging)
+        return {
+            'archived': archived,
+            'files': files,
+            'cutoff': cutoff.isoformat(),
+            'elapsed_sec': round(time.perf_counter() - start, 3)
+        }
+
+    def recover_archive(self, db: Session):
+        """중단된 아카이브 실행 정리 - 원본 삭제가 commit됐으면 이동, 아니면 폐기"""
+        if self.archive is None:
+            return
+        for staging, info in self.archive.pending_runs():
+            remaining = db.query(SMTData.id)\
+                .filter(SMTData.timestamp < info['cutoff'])\
+                .filter(SMTData.id <= info['max_id'])\
+                .first()
+            if remaining is None:
+                self.archive.publish(staging)
+            else:
+                self.archive.discard(staging)
+
+    def compact(self, db: Session):
+        """삭제 후 저장 공간 회수 (기본: 없음 - PostgreSQL은 autovacuum)"""
+        pass
+
+
+class SQLiteReadingRepository(ReadingRepository):
+    """SQLite - 타입 변환 계층을 건너뛴 DBAPI executemany로 대량 적재"""
+    name = 'sqlite'
+
+    def insert_rows(self, db: Session, columns: dict, timestamps: pd.DatetimeIndex):
+        # SQLAlchemy SQLite DateTime 저장 형식과 동일한 문자열로 일괄 변환
+        columns = dict(columns, timestamp=timestamps.strftime(SQLITE_DATETIME_FORMAT).tolist())
+        keys = list(columns.keys())
+        sql = f"INSERT INTO {SMTData.__tablename__} ({', '.join(keys)}) " \
+              f"VALUES ({', '.join('?' * len(keys))})"
+        db.connection().exec_driver_sql(sql, list(zip(*(columns[k] for k in keys))))
+
+    def compact(self, db: Session):
+        """VACUUM으로 파일 크기 축소 (트랜잭션 밖에서 실행, 실행 중 쓰기 대기)"""
+        db.commit()
+        with db.get_bind().connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT").exec_driver_sql("VACUUM")
+
+
+class PostgresReadingRepository(ReadingRepository):
+    """PostgreSQL - 월별 RANGE 파티션 x 라인 HASH 하위 파티션, COPY로 대량 적재
+
+    여러 API 워커가 동시에 적재 가능 (파티션 생성은 advisory lock으로 직렬화).
+    """
+    name = 'postgresql'
+
+    def __init__(self, archive: ParquetArchive = None, line_partitions: int = PG_LINE_PARTITIONS):
+        super().__init__(archive)
+        self.line_partitions = line_partitions
+        self._months = set()
+
+    def ensure_partitions(self, db: Session, timestamps):
+        """timestamps가 속한 월 파티션이 없으면 생성"""
+        months = pd.DatetimeIndex(timestamps).to_period('M').unique()
+        missing = [month for month in months if month not in self._months]
+        if not missing:
+            return
+
+        conn = db.connection()
+        parent = SMTData.__tablename__
+        conn.exec_driver_sql(f"SELECT pg_advisory_xact_lock(hashtext('{parent}_partitions'))")
+        for month in missing:
+            name = f"{parent}_p{month.year}{month.month:02d}"
+            start = month.start_time.strftime('%Y-%m-%d')
+            end = (month + 1).start_time.strftime('%Y-%m-%d')
+            conn.exec_driver_sql(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {parent} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}') PARTITION BY HASH (line_id)"
+            )
+            for remainder in range(self.line_partitions):
+                conn.exec_driver_sql(
+                    f"CREATE TABLE IF NOT EXISTS {name}_h{remainder} PARTITION OF {name} "
+                    f"FOR VALUES WITH (MODULUS {self.line_partitions}, REMAINDER {remainder})"
+                )
+        # rollback되면 다음 적재에서 다시 생성 시도 (IF NOT EXISTS)
+        run_after_commit(db, lambda: self._months.update(missing))
+
+    def insert_rows(self, db: Session, columns: dict, timestamps: pd.DatetimeIndex):
+        self.ensure_partitions(db, timestamps)
+
+        frame = pd.DataFrame(columns)
+        frame['timestamp'] = timestamps
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False, date_format='%Y-%m-%d %H:%M:%S.%f')
+        buffer.seek(0)
+
+        # 세션과 같은 트랜잭션의 DBAPI 커넥션으로 COPY
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {SMTData.__tablename__} ({', '.join(frame.columns)}) "
+                f"FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+    def add(self, db: Session, reading: SMTData):
+        if reading.timestamp is None:
+            reading.timestamp = datetime.now()
+        self.ensure_partitions(db, [reading.timestamp])
+        super().add(db, reading)
+
+
+def create_repository(bind=engine, archive: ParquetArchive = None) -> ReadingRepository:
+    """엔진 방언에 맞는 저장소 구현 선택"""
+    archive = archive if archive is not None else ParquetArchive()
+    dialect = bind.dialect.name
+    if dialect == 'sqlite':
+        return SQLiteReadingRepository(archive)
+    if dialect == 'postgresql':
+        return PostgresReadingRepository(archive)
+    return ReadingRepository(archive)
+
+
+reading_repository = create_repository()
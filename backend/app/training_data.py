@@ -0,0 +1,119 @@
+import numpy as np
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from storage import reading_repository
+
+FEATURE_COLUMNS = [
+    'temperature', 'vibration', 'current',
+    'production_count', 'defect_count', 'cycle_time',
+    'pressure', 'humidity'
+]
+
+DEFAULT_CHUNK_SIZE = 50000
+
+TRAINING_MODES = ('all', 'window', 'sample')
+
+
+def _since(days: int = None):
+    return datetime.now() - timedelta(days=days) if days is not None else None
+
+
+def iter_training_chunks(db: Session, days: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """필요한 9개 컬럼만 청크 단위로 읽어 (X, y) NumPy 배열로 반환 (ORM 객체 생성 없음)"""
+    columns = FEATURE_COLUMNS + ['failure_occurred']
+    for rows in reading_repository.iter_rows(db, columns, _since(days), chunk_size):
+        block = np.array(rows, dtype=np.float64)
+        yield block[:, :-1], block[:, -1].astype(bool)
+
+
+def load_all(db: Session, days: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """전체(또는 최근 N일) 학습 데이터 로드"""
+    X_parts, y_parts = [], []
+    for X, y in iter_training_chunks(db, days, chunk_size):
+        X_parts.append(X)
+        y_parts.append(y)
+    if not X_parts:
+        return np.empty((0, len(FEATURE_COLUMNS))), np.empty(0, dtype=bool)
+    return np.concatenate(X_parts), np.concatenate(y_parts)
+
+
+class _Reservoir:
+    """Algorithm R 저수지 샘플 (청크 단위 벡터화)"""
+
+    def __init__(self, capacity: int, rng: np.random.Generator):
+        self.capacity = capacity
+        self.rng = rng
+        self.X = np.empty((capacity, len(FEATURE_COLUMNS)))
+        self.size = 0
+        self.seen = 0
+
+    def add(self, X: np.ndarray):
+        if self.capacity == 0 or len(X) == 0:
+            self.seen += len(X)
+            return
+
+        # 저수지가 찰 때까지는 그대로 채움
+        fill = min(self.capacity - self.size, len(X))
+        if fill > 0:
+            self.X[self.size:self.size + fill] = X[:fill]
+            self.size += fill
+            self.seen += fill
+            X = X[fill:]
+        if len(X) == 0:
+            return
+
+        # i번째 항목은 k/(i+1) 확률로 임의 위치를 대체
+        positions = self.seen + np.arange(len(X))
+        slots = self.rng.integers(0, positions + 1)
+        keep = slots < self.capacity
+        self.X[slots[keep]] = X[keep]
+        self.seen += len(X)
+
+    def values(self) -> np.ndarray:
+        return self.X[:self.size]
+
+
+def load_stratified_sample(db: Session, sample_size: int, days: int = None,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE, seed: int = 42):
+    """클래스 비율을 유지하는 저수지 샘플 - 메모리는 sample_size에 비례"""
+    class_counts = reading_repository.class_counts(db, _since(days))
+    total = sum(class_counts.values())
+    if total == 0:
+        return np.empty((0, len(FEATURE_COLUMNS))), np.empty(0, dtype=bool)
+
+    rng = np.random.default_rng(seed)
+    sample_size = min(sample_size, total)
+    failure_capacity = int(round(sample_size * class_counts.get(True, 0) / total))
+    reservoirs = {
+        True: _Reservoir(failure_capacity, rng),
+        False: _Reservoir(sample_size - failure_capacity, rng)
+    }
+
+    for X, y in iter_training_chunks(db, days, chunk_size):
+        reservoirs[True].add(X[y])
+        reservoirs[False].add(X[~y])
+
+    X_failure = reservoirs[True].values()
+    X_normal = reservoirs[False].values()
+    X = np.concatenate([X_normal, X_failure])
+    y = np.concatenate([np.zeros(len(X_normal), dtype=bool), np.ones(len(X_failure), dtype=bool)])
+    return X, y
+
+
+def load_training_data(db: Session, mode: str = 'all', days: int = None,
+                       sample_size: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """학습 데이터 로드
+
+    - all: 전체 이력
+    - window: 최근 days일
+    - sample: (days 범위 내) 클래스 층화 저수지 샘플 sample_size개
+    """
+    if mode not in TRAINING_MODES:
+        raise ValueError(f"지원하지 않는 학습 모드: {mode}")
+    if mode == 'window' and days is None:
+        raise ValueError("window 모드에는 days가 필요합니다.")
+    if mode == 'sample':
+        if not sample_size:
+            raise ValueError("sample 모드에는 sample_size가 필요합니다.")
+        return load_stratified_sample(db, sample_size, days, chunk_size)
+    return load_all(db, days if mode == 'window' else None, chunk_size)
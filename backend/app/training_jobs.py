@@ -0,0 +1,215 @@
+import os
+import queue
+import threading
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from database import SessionLocal
+from ml_model import fit_model, record_training_history, training_result, insufficient_data_result
+from training_data import load_training_data
+
+# 워커(프로세스/스레드)에서 진행 상황을 부모로 전달하는 큐
+_progress_queue = None
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+# 끝난 작업 보관 기준 - 보관 시간(초)이 지났거나 개수를 넘으면 오래된 것부터 제거
+TRAINING_JOB_RETENTION = int(os.getenv("TRAINING_JOB_RETENTION", "3600"))
+TRAINING_JOB_HISTORY = int(os.getenv("TRAINING_JOB_HISTORY", "50"))
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _report(job_id: str, stage: str, progress: float):
+    if _progress_queue is not None:
+        _progress_queue.put((job_id, stage, progress))
+
+
+def _run_training_job(job_id: str, params: dict) -> dict:
+    """학습 작업 본체 - 데이터 로드 + 학습/평가 (별도 프로세스에서 실행)"""
+    _report(job_id, 'loading', 0.1)
+    db = SessionLocal()
+    try:
+        X, y = load_training_data(db, params['mode'], params['days'], params['sample_size'])
+    finally:
+        db.close()
+
+    if len(y) < params['min_samples']:
+        return {'success': False, 'samples': len(y)}
+
+    _report(job_id, 'fitting', 0.4)
+    model, scaler, metrics = fit_model(X, y)
+    _report(job_id, 'fitted', 0.8)
+    return {'success': True, 'samples': len(y), 'model': model, 'scaler': scaler, 'metrics': metrics}
+
+
+class TrainingJobManager:
+    """백그라운드 학습 작업 관리 - 완료 시 모델을 원자적으로 교체"""
+
+    def __init__(self, model, use_processes: bool = None):
+        self.model = model
+        self.use_processes = use_processes if use_processes is not None \
+            else os.getenv("TRAINING_EXECUTOR", "process") == "process"
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._progress_queue = None
+        self._drainer = None
+
+    def _ensure_executor(self):
+        if self._executor is not None:
+            return
+        if self.use_processes:
+            ctx = multiprocessing.get_context("spawn")
+            self._progress_queue = ctx.Queue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=1, mp_context=ctx,
+                initializer=_init_worker, initargs=(self._progress_queue,)
+            )
+        else:
+            self._progress_queue = queue.Queue()
+            _init_worker(self._progress_queue)
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="training")
+
+        self._drainer = threading.Thread(target=self._drain_progress, name="training-progress", daemon=True)
+        self._drainer.start()
+
+    def _reset_executor(self, executor):
+        """워커 프로세스가 죽어 깨진 풀 폐기 - 다음 submit에서 새로 생성 (self._lock 안에서 호출)"""
+        if executor is None or self._executor is not executor:
+            return
+        executor.shutdown(wait=False, cancel_futures=True)
+        self._progress_queue.put(None)
+        self._executor = None
+
+    def _evict_finished(self):
+        """보관 기간이 지났거나 개수를 넘는 끝난 작업 제거 (self._lock 안에서 호출)"""
+        finished = sorted(
+            (job['finished_at'], job_id) for job_id, job in self.jobs.items()
+            if job['status'] in TERMINAL_STATUSES and job['finished_at']
+        )
+        expired_before = (datetime.now() - timedelta(seconds=TRAINING_JOB_RETENTION)).isoformat()
+        excess = len(finished) - TRAINING_JOB_HISTORY
+        for index, (finished_at, job_id) in enumerate(finished):
+            if index < excess or finished_at < expired_before:
+                del self.jobs[job_id]
+
+    def _drain_progress(self):
+        while True:
+            item = self._progress_queue.get()
+            if item is None:
+                break
+            job_id, stage, progress = item
+            self._update(job_id, status='running', stage=stage, progress=progress)
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job['status'] in TERMINAL_STATUSES:
+                return
+            # 늦게 도착한 진행 메시지가 진행률을 되돌리지 않도록
+            if fields.get('progress', 1.0) < job['progress']:
+                return
+            if fields.get('status') == 'running' and job['started_at'] is None:
+                job['started_at'] = datetime.now().isoformat()
+            job.update(fields)
+
+    def submit(self, min_samples: int = 100, mode: str = 'all',
+               days: int = None, sample_size: int = None) -> dict:
+        """학습 작업 등록 - 작업 정보(job_id 포함) 즉시 반환"""
+        with self._lock:
+            self._evict_finished()
+            self._ensure_executor()
+            job_id = uuid.uuid4().hex[:12]
+            params = {'min_samples': min_samples, 'mode': mode, 'days': days, 'sample_size': sample_size}
+            self.jobs[job_id] = {
+                'job_id': job_id,
+                'status': 'queued',
+                'stage': 'queued',
+                'progress': 0.0,
+                'params': params,
+                'created_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None,
+                'done': threading.Event()
+            }
+            executor = self._executor
+            try:
+                future = executor.submit(_run_training_job, job_id, params)
+            except BrokenProcessPool as e:
+                self._reset_executor(executor)
+                job = self.jobs[job_id]
+                job.update(status='failed', stage='failed', error=f"학습 워커 비정상 종료: {e}",
+                           finished_at=datetime.now().isoformat())
+                job['done'].set()
+                return {k: v for k, v in job.items() if k != 'done'}
+
+        future.add_done_callback(lambda f: self._finish(job_id, f, executor))
+        return self.get(job_id)
+
+    def _finish(self, job_id: str, future, executor=None):
+        """작업 완료 처리 - 모델 교체/저장/이력 기록 (부모 프로세스)"""
+        job = self.jobs[job_id]
+        try:
+            outcome = future.result()
+            params = job['params']
+            if not outcome['success']:
+                result = insufficient_data_result(params['min_samples'], outcome['samples'])
+            else:
+                self._update(job_id, stage='swapping', progress=0.9)
+                state = self.model.swap(outcome['model'], outcome['scaler'])
+                self.model.save_model(state)
+
+                db = SessionLocal()
+                try:
+                    record_training_history(db, outcome['metrics'], outcome['samples'])
+                finally:
+                    db.close()
+                result = training_result(outcome['metrics'])
+            self._update(job_id, status='completed', stage='done', progress=1.0,
+                         result=result, finished_at=datetime.now().isoformat())
+        except BrokenProcessPool as e:
+            with self._lock:
+                self._reset_executor(executor)
+            self._update(job_id, status='failed', stage='failed',
+                         error=f"학습 워커 비정상 종료: {e}", finished_at=datetime.now().isoformat())
+        except Exception as e:
+            self._update(job_id, status='failed', stage='failed',
+                         error=str(e), finished_at=datetime.now().isoformat())
+        finally:
+            job['done'].set()
+
+    def get(self, job_id: str) -> dict:
+        """작업 상태 조회 (없으면 None)"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            return {k: v for k, v in job.items() if k != 'done'}
+
+    def list_jobs(self) -> list:
+        with self._lock:
+            job_ids = list(self.jobs.keys())
+        return [self.get(job_id) for job_id in reversed(job_ids)]
+
+    def wait(self, job_id: str, timeout: float = None) -> dict:
+        """작업 완료까지 대기"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        job['done'].wait(timeout)
+        return self.get(job_id)
+
+    def shutdown(self):
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._progress_queue.put(None)
+        self._executor = None
@@ -0,0 +1,133 @@
+"""벡터 저장소 벤치마크 - 로드 시간 / 메모리 / 질의 지연 비교
+
+임의의 정규화 벡터 N개를 백엔드별 임시 디렉터리에 기록한 뒤,
+백엔드마다 새 프로세스에서 로드/질의를 측정 (import·캐시 영향 분리):
+
+    python vector_benchmark.py --chunks 5000 --dim 768 --queries 200
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+BACKENDS = ['numpy', 'numpy+hnsw', 'chroma']
+
+
+def _rss_mb() -> float:
+    """현재 RSS (MB) - /proc 미지원 환경은 최대 RSS로 대체, Windows는 측정 불가(nan)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except OSError:
+        if sys.platform == 'win32':
+            return float('nan')
+        # resource는 Unix 전용 모듈 - 필요할 때만 import
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage / 1024 / 1024 if sys.platform == 'darwin' else usage / 1024
+
+
+def _vectors(count: int, dim: int, seed: int) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _configure(backend: str):
+    import vector_store
+    # numpy: 항상 정확 검색, numpy+hnsw: 항상 HNSW
+    vector_store.HNSW_THRESHOLD = 0 if backend == 'numpy+hnsw' else 10 ** 12
+    return vector_store
+
+
+def _open(vector_store, backend: str, path: str):
+    if backend == 'chroma':
+        return vector_store.ChromaVectorStore(path)
+    return vector_store.NumpyVectorStore(path)
+
+
+def build(backend: str, path: str, chunks: int, dim: int):
+    vector_store = _configure(backend)
+    store = _open(vector_store, backend, path)
+    ids = [f'chunk-{i}' for i in range(chunks)]
+    vectors = _vectors(chunks, dim, seed=0)
+    # Chroma는 배치 크기 제한이 있어 나눠서 기록
+    for start in range(0, chunks, 5000):
+        end = start + 5000
+        store.upsert(ids[start:end], vectors[start:end],
+                     [f'문서 {i}' for i in range(start, min(end, chunks))],
+                     [{'filename': 'bench.txt'} for _ in range(start, min(end, chunks))])
+    # HNSW는 로드 측정 전에 색인 파일까지 만들어 둠
+    _open(vector_store, backend, path)
+
+
+def measure(backend: str, path: str, queries: int, dim: int, top_k: int) -> dict:
+    """새 프로세스에서 실행: import 이후 로드 시간/메모리, 질의 지연"""
+    vector_store = _configure(backend)
+    if backend == 'chroma':
+        vector_store._import_chromadb()
+    baseline = _rss_mb()
+
+    started = time.perf_counter()
+    store = _open(vector_store, backend, path)
+    store.count()
+    load_ms = (time.perf_counter() - started) * 1000
+
+    latencies = []
+    for vector in _vectors(queries, dim, seed=1):
+        started = time.perf_counter()
+        store.query(vector.tolist(), top_k)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    return {
+        'backend': backend,
+        'load_ms': round(load_ms, 1),
+        'memory_mb': round(_rss_mb() - baseline, 1),
+        'query_p50_ms': round(float(np.percentile(latencies, 50)), 3),
+        'query_p95_ms': round(float(np.percentile(latencies, 95)), 3)
+    }
+
+
+def _available(backend: str) -> bool:
+    import vector_store
+    if backend == 'chroma':
+        return vector_store._import_chromadb() is not None
+    if backend == 'numpy+hnsw':
+        return vector_store.hnswlib is not None
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=12)
+    parser.add_argument("--backends", default=','.join(BACKENDS))
+    parser.add_argument("--measure", nargs=2, metavar=("BACKEND", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure[0], args.measure[1], args.queries, args.dim, args.top_k)))
+        return
+
+    with tempfile.TemporaryDirectory() as root:
+        for backend in args.backends.split(','):
+            if not _available(backend):
+                print(f"{backend}: 건너뜀 (패키지 미설치)")
+                continue
+            path = os.path.join(root, backend.replace('+', '_'))
+            build(backend, path, args.chunks, args.dim)
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--measure", backend, path,
+                 "--queries", str(args.queries), "--dim", str(args.dim), "--top-k", str(args.top_k)],
+                cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True
+            ).stdout
+            print(json.loads(output.strip().splitlines()[-1]))
+
+
+if __name__ == "__main__":
+    main()
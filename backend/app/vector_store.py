@@ -0,0 +1,500 @@
+import json
+import os
+import threading
+import uuid
+import numpy as np
+from typing import List
+
+try:
+    import hnswlib
+except ImportError:
+    # hnswlib 미설치 시 정확 검색(행렬-벡터 곱)만 사용
+    hnswlib = None
+
+# 청크 수가 이 값 이상이면 HNSW 근사 검색 사용 (hnswlib 설치 시)
+HNSW_THRESHOLD = int(os.getenv("RAG_HNSW_THRESHOLD", "20000"))
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+# numpy 저장소 압축 기준 - 삭제 표시된 행 또는 delta 행이 전체의 이 비율을 넘으면 새 버전으로 다시 씀
+COMPACT_RATIO = float(os.getenv("RAG_VECTOR_COMPACT_RATIO", "0.25"))
+# delta 행이 이 수 이하이면 비율과 관계없이 압축하지 않음 (작은 저장소에서 매 추가마다 압축 방지)
+COMPACT_MIN_DELTA_ROWS = int(os.getenv("RAG_VECTOR_COMPACT_MIN_ROWS", "1000"))
+
+
+class VectorStore:
+    """청크 임베딩 저장소 인터페이스 (RAGEngine이 사용하는 연산만)"""
+
+    name = 'base'
+
+    @property
+    def embedding_model(self) -> str:
+        """저장된 벡터를 만든 임베딩 모델 (기록 전 데이터는 None)"""
+        raise NotImplementedError
+
+    def replace_all(self, ids: list, embeddings: list, documents: list, metadatas: list, embedding_model: str):
+        """전체 교체 - 임베딩 모델 변경 시 재색인용"""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def get_ids(self, filename: str = None) -> List[str]:
+        """저장된 청크 id (filename 지정 시 해당 파일만)"""
+        raise NotImplementedError
+
+    def get_all(self):
+        """(ids, documents, metadatas) - 키워드 색인 재구성용"""
+        raise NotImplementedError
+
+    def upsert(self, ids: list, embeddings: list, documents: list, metadatas: list):
+        raise NotImplementedError
+
+    def delete(self, ids: list):
+        raise NotImplementedError
+
+    def query(self, embedding: list, top_k: int) -> List[dict]:
+        """유사도 내림차순 [{'id', 'content', 'metadata'}]"""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+def _import_chromadb():
+    """chromadb는 무거우므로 chroma 백엔드/이전 시에만 import"""
+    try:
+        import chromadb
+    except ImportError:
+        return None
+    return chromadb
+
+
+class ChromaVectorStore(VectorStore):
+    """ChromaDB PersistentClient 백엔드"""
+
+    name = 'chroma'
+
+    def __init__(self, path: str, collection_name: str = "smt_manuals"):
+        chromadb = _import_chromadb()
+        if chromadb is None:
+            raise RuntimeError("chromadb가 설치되어 있지 않습니다.")
+        os.makedirs(path, exist_ok=True)
+        self.collection_name = collection_name
+        self.client = chromadb.PersistentClient(path=path)
+        self.collection = self.client.get_or_create_collection(collection_name)
+
+    @property
+    def embedding_model(self) -> str:
+        return (self.collection.metadata or {}).get('embedding_model')
+
+    def replace_all(self, ids: list, embeddings: list, documents: list, metadatas: list, embedding_model: str):
+        # 차원이 바뀔 수 있으므로 컬렉션을 새로 만듦
+        self.client.delete_collection(self.collection_name)
+        self.collection = self.client.create_collection(
+            self.collection_name, metadata={'embedding_model': embedding_model}
+        )
+        if ids:
+            self.upsert(ids, embeddings, documents, metadatas)
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def get_ids(self, filename: str = None) -> List[str]:
+        where = {'filename': filename} if filename is not None else None
+        return self.collection.get(where=where, include=[])['ids']
+
+    def get_all(self):
+        stored = self.collection.get(include=['documents', 'metadatas'])
+        return stored['ids'], stored['documents'], stored['metadatas']
+
+    def get_embeddings(self):
+        """(ids, embeddings, documents, metadatas) - 다른 백엔드로 이전용"""
+        stored = self.collection.get(include=['embeddings', 'documents', 'metadatas'])
+        return stored['ids'], stored['embeddings'], stored['documents'], stored['metadatas']
+
+    def upsert(self, ids: list, embeddings: list, documents: list, metadatas: list):
+        self.collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def delete(self, ids: list):
+        self.collection.delete(ids=ids)
+
+    def query(self, embedding: list, top_k: int) -> List[dict]:
+        count = self.collection.count()
+        if count == 0:
+            return []
+        results = self.collection.query(query_embeddings=[embedding], n_results=min(top_k, count))
+        return [
+            {'id': doc_id, 'content': doc, 'metadata': metadata}
+            for doc_id, doc, metadata in zip(results['ids'][0], results['documents'][0], results['metadatas'][0])
+        ]
+
+    def clear(self):
+        metadata = self.collection.metadata
+        self.client.delete_collection(self.collection_name)
+        self.collection = self.client.create_collection(self.collection_name, metadata=metadata)
+
+
+class NumpyVectorStore(VectorStore):
+    """메모리 매핑 float32 행렬 + id/메타데이터 사이드카(JSON) + 추가분(delta) 로그
+
+    - vectors-<버전>.f32: 압축 시점의 정규화된 임베딩 (N x dim), np.memmap으로 열어 복사 없이 조회
+    - store.json: 현재 버전, dim, 행 순서대로 id/문서/메타데이터
+    - delta-<버전>.f32 / log-<버전>.jsonl: 이후 upsert/delete - 벡터는 파일 끝에 추가하고
+      id/문서/메타데이터는 로그 한 줄로 추가 (기존 파일은 다시 쓰지 않음)
+    교체/삭제된 행은 삭제 표시만 하고, 삭제 표시나 delta가 일정 비율을 넘으면 새 버전으로 압축.
+    압축은 새 버전 파일을 만든 뒤 store.json을 교체(os.replace)하므로 중간에 중단돼도 이전 버전이 그대로 남음.
+    로그 마지막 줄이 기록 도중 끊겼으면 로드 시 잘라냄. 조회는 정확 top-k (행렬-벡터 곱), 청크가 많으면 HNSW.
+    """
+
+    name = 'numpy'
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._state = self._load()
+
+    @property
+    def exists(self) -> bool:
+        """한 번이라도 기록된 저장소인지 (비웠어도 True)"""
+        return os.path.exists(self._sidecar_path())
+
+    # ---------- 파일 ----------
+
+    def _sidecar_path(self) -> str:
+        return os.path.join(self.path, 'store.json')
+
+    def _delta_path(self, version: str) -> str:
+        return os.path.join(self.path, f'delta-{version}.f32')
+
+    def _log_path(self, version: str) -> str:
+        return os.path.join(self.path, f'log-{version}.jsonl')
+
+    def _load(self) -> dict:
+        try:
+            with open(self._sidecar_path(), encoding='utf-8') as f:
+                sidecar = json.load(f)
+        except (OSError, ValueError):
+            return self._empty_state()
+
+        count = len(sidecar['ids'])
+        matrix = None
+        if count:
+            matrix = np.memmap(os.path.join(self.path, sidecar['vectors']), dtype=np.float32,
+                               mode='r', shape=(count, sidecar['dim']))
+        state = self._make_state(sidecar, matrix)
+        self._replay(state)
+        state['hnsw'] = self._load_hnsw(state)
+        return state
+
+    def _replay(self, state: dict):
+        """마지막 압축 이후 로그를 순서대로 반영 (끊긴 마지막 줄은 잘라냄)"""
+        path = self._log_path(state['version'])
+        if not os.path.exists(path):
+            return
+        entries = []
+        valid = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+                valid += len(line)
+        if os.path.getsize(path) > valid:
+            print(f"⚠️  Vector store log truncated at byte {valid}")
+            with open(path, 'r+b') as f:
+                f.truncate(valid)
+
+        rows = sum(len(entry['ids']) for entry in entries if entry['op'] == 'upsert')
+        if rows:
+            delta = np.fromfile(self._delta_path(state['version']), dtype=np.float32, count=rows * state['dim'])
+            state['delta'] = delta.reshape(rows, state['dim'])
+        for entry in entries:
+            self._apply(state, entry)
+
+    @staticmethod
+    def _empty_state() -> dict:
+        return {'version': None, 'vectors': None, 'dim': 0, 'ids': [], 'documents': [],
+                'metadatas': [], 'embedding_model': None, 'matrix': None, 'delta': None,
+                'positions': {}, 'deleted': set(), 'hnsw': None}
+
+    def _make_state(self, sidecar: dict, matrix) -> dict:
+        state = self._empty_state()
+        state.update({key: sidecar[key] for key in ('version', 'vectors', 'dim', 'ids', 'documents', 'metadatas')})
+        state['embedding_model'] = sidecar.get('embedding_model')
+        state['matrix'] = matrix
+        state['delta'] = np.zeros((0, state['dim']), dtype=np.float32)
+        state['positions'] = {doc_id: i for i, doc_id in enumerate(sidecar['ids'])}
+        return state
+
+    @staticmethod
+    def _copy(state: dict) -> dict:
+        """쓰기용 사본 - 조회는 교체 전 상태를 그대로 사용 (lock 없이 일관된 스냅샷)"""
+        return dict(state, ids=list(state['ids']), documents=list(state['documents']),
+                    metadatas=list(state['metadatas']), positions=dict(state['positions']),
+                    deleted=set(state['deleted']))
+
+    @staticmethod
+    def _apply(state: dict, entry: dict) -> list:
+        """로그 항목 반영 - 삭제 표시된 행 번호 반환 (upsert 행은 상태 끝에 추가)"""
+        removed = []
+
+        def remove(doc_id):
+            row = state['positions'].pop(doc_id, None)
+            if row is not None:
+                state['deleted'].add(row)
+                state['ids'][row] = state['documents'][row] = state['metadatas'][row] = None
+                removed.append(row)
+
+        if entry['op'] == 'delete':
+            for doc_id in entry['ids']:
+                remove(doc_id)
+            return removed
+
+        for doc_id, document, metadata in zip(entry['ids'], entry['documents'], entry['metadatas']):
+            remove(doc_id)
+            state['positions'][doc_id] = len(state['ids'])
+            state['ids'].append(doc_id)
+            state['documents'].append(document)
+            state['metadatas'].append(metadata)
+        return removed
+
+    def _hnsw_path(self, version: str) -> str:
+        return os.path.join(self.path, f'hnsw-{version}.bin')
+
+    def _load_hnsw(self, state: dict):
+        """HNSW 색인 (청크 수가 임계값 이상이고 hnswlib 설치 시) - 버전별로 저장해 재시작 시 재사용
+
+        저장 이후 추가/삭제된 행은 로드 후 add_items/mark_deleted로 따라잡고 다시 저장.
+        """
+        count = len(state['positions'])
+        if hnswlib is None or count == 0 or count < HNSW_THRESHOLD:
+            return None
+        rows = len(state['ids'])
+        index = hnswlib.Index(space='ip', dim=state['dim'])
+        path = self._hnsw_path(state['version'])
+        saved = os.path.exists(path)
+        if saved:
+            index.load_index(path, max_elements=rows)
+        else:
+            index.init_index(max_elements=rows, ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+        indexed = index.get_current_count()
+        if indexed < rows:
+            index.add_items(self._matrix(state)[indexed:], np.arange(indexed, rows))
+        for row in state['deleted']:
+            try:
+                index.mark_deleted(row)
+            except RuntimeError:
+                # 저장 전에 이미 삭제 표시된 행
+                pass
+        if not saved or indexed < rows:
+            index.save_index(path)
+        index.set_ef(HNSW_EF_SEARCH)
+        return index
+
+    def _write(self, ids: list, matrix: np.ndarray, documents: list, metadatas: list, embedding_model: str = None):
+        """새 버전 기록(압축) 후 store.json 교체, 이전 버전 파일 삭제 (호출자가 lock 보유)"""
+        previous = self._state
+        embedding_model = embedding_model or previous['embedding_model']
+        version = uuid.uuid4().hex[:12]
+        vectors = f'vectors-{version}.f32'
+        dim = int(matrix.shape[1]) if len(ids) else (previous['dim'] if embedding_model == previous['embedding_model'] else 0)
+
+        mapped = None
+        if len(ids):
+            mapped = np.memmap(os.path.join(self.path, vectors), dtype=np.float32, mode='w+', shape=matrix.shape)
+            mapped[:] = matrix
+            mapped.flush()
+            del mapped
+            mapped = np.memmap(os.path.join(self.path, vectors), dtype=np.float32, mode='r', shape=matrix.shape)
+
+        sidecar = {'version': version, 'vectors': vectors, 'dim': dim, 'embedding_model': embedding_model,
+                   'ids': ids, 'documents': documents, 'metadatas': metadatas}
+        temp_path = self._sidecar_path() + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(sidecar, f, ensure_ascii=False)
+        os.replace(temp_path, self._sidecar_path())
+
+        state = self._make_state(sidecar, mapped)
+        state['hnsw'] = self._load_hnsw(state)
+        self._state = state
+        for filename in os.listdir(self.path):
+            if filename.startswith(('vectors-', 'hnsw-', 'delta-', 'log-')) and version not in filename:
+                try:
+                    os.remove(os.path.join(self.path, filename))
+                except OSError:
+                    # Windows에서 아직 매핑 중인 파일 - 다음 쓰기 때 삭제
+                    pass
+
+    def _append(self, state: dict, entry: dict, vectors: np.ndarray = None):
+        """delta 벡터(upsert) 추가 후 로그 한 줄 기록 - 로그에 없는 벡터는 다음 추가 때 덮어씀"""
+        if vectors is not None:
+            with open(self._delta_path(state['version']), 'ab') as f:
+                f.truncate(len(state['delta']) * state['dim'] * 4)
+                f.write(vectors.tobytes())
+            state['delta'] = np.vstack([state['delta'], vectors])
+        with open(self._log_path(state['version']), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def _commit(self, state: dict):
+        """쓰기 결과 반영 - 삭제 표시/delta가 많아졌으면 alive 행만으로 새 버전 압축 (호출자가 lock 보유)"""
+        rows = len(state['ids'])
+        if len(state['deleted']) > rows * COMPACT_RATIO or \
+                len(state['delta']) > max(COMPACT_MIN_DELTA_ROWS, rows * COMPACT_RATIO):
+            self._state = state
+            keep = sorted(state['positions'].values())
+            self._write(
+                [state['ids'][i] for i in keep],
+                self._matrix(state)[keep] if keep else np.zeros((0, state['dim']), dtype=np.float32),
+                [state['documents'][i] for i in keep],
+                [state['metadatas'][i] for i in keep]
+            )
+            return
+        self._state = state
+
+    def _matrix(self, state: dict = None) -> np.ndarray:
+        state = state or self._state
+        parts = [np.asarray(part) for part in (state['matrix'], state['delta']) if part is not None and len(part)]
+        if not parts:
+            return np.zeros((0, state['dim']), dtype=np.float32)
+        return parts[0] if len(parts) == 1 else np.vstack(parts)
+
+    # ---------- 인터페이스 ----------
+
+    @property
+    def embedding_model(self) -> str:
+        return self._state['embedding_model']
+
+    def replace_all(self, ids: list, embeddings: list, documents: list, metadatas: list, embedding_model: str):
+        vectors = self._normalize(embeddings) if len(ids) else np.zeros((0, 0), dtype=np.float32)
+        with self._lock:
+            self._write(list(ids), vectors, list(documents), list(metadatas), embedding_model)
+
+    @staticmethod
+    def _normalize(embeddings) -> np.ndarray:
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def count(self) -> int:
+        return len(self._state['positions'])
+
+    def get_ids(self, filename: str = None) -> List[str]:
+        state = self._state
+        if filename is None:
+            return list(state['positions'])
+        return [doc_id for doc_id, metadata in zip(state['ids'], state['metadatas'])
+                if doc_id is not None and metadata.get('filename') == filename]
+
+    def get_all(self):
+        state = self._state
+        rows = sorted(state['positions'].values())
+        return [state['ids'][i] for i in rows], [state['documents'][i] for i in rows], \
+            [state['metadatas'][i] for i in rows]
+
+    def upsert(self, ids: list, embeddings: list, documents: list, metadatas: list):
+        vectors = self._normalize(embeddings)
+        with self._lock:
+            state = self._state
+            if not state['positions'] and (state['version'] is None or vectors.shape[1] != state['dim']):
+                # 비어 있는 저장소 - 새 버전으로 기록 (차원 변경 허용)
+                self._write(list(ids), vectors, list(documents), list(metadatas))
+                return
+            if vectors.shape[1] != state['dim']:
+                raise ValueError(f"임베딩 차원이 다릅니다: {vectors.shape[1]} != {state['dim']}")
+
+            state = self._copy(state)
+            start = len(state['ids'])
+            entry = {'op': 'upsert', 'ids': list(ids), 'documents': list(documents), 'metadatas': list(metadatas)}
+            self._append(state, entry, vectors)
+            removed = self._apply(state, entry)
+            index = state['hnsw']
+            if index is not None:
+                if len(state['ids']) > index.get_max_elements():
+                    index.resize_index(max(len(state['ids']), index.get_max_elements() * 2))
+                index.add_items(vectors, np.arange(start, len(state['ids'])))
+                for row in removed:
+                    index.mark_deleted(row)
+            else:
+                state['hnsw'] = self._load_hnsw(state)
+            self._commit(state)
+
+    def delete(self, ids: list):
+        with self._lock:
+            state = self._state
+            ids = [doc_id for doc_id in ids if doc_id in state['positions']]
+            if not ids:
+                return
+            state = self._copy(state)
+            entry = {'op': 'delete', 'ids': ids}
+            self._append(state, entry)
+            removed = self._apply(state, entry)
+            if state['hnsw'] is not None:
+                for row in removed:
+                    state['hnsw'].mark_deleted(row)
+            self._commit(state)
+
+    def query(self, embedding: list, top_k: int) -> List[dict]:
+        state = self._state
+        count = len(state['positions'])
+        if count == 0:
+            return []
+        top_k = min(top_k, count)
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+
+        if state['hnsw'] is not None:
+            # 색인은 쓰기 중 제자리 갱신(resize/add_items)되므로 쓰기와 겹치지 않게
+            with self._lock:
+                state = self._state
+                top_k = min(top_k, len(state['positions']))
+                if top_k == 0:
+                    return []
+                labels, _ = state['hnsw'].knn_query(vector, k=top_k)
+            order = labels[0]
+        else:
+            scores = state['matrix'] @ vector if state['matrix'] is not None else np.zeros(0, dtype=np.float32)
+            if len(state['delta']):
+                scores = np.concatenate([scores, state['delta'] @ vector])
+            if state['deleted']:
+                scores[list(state['deleted'])] = -np.inf
+            order = np.argpartition(-scores, top_k - 1)[:top_k]
+            order = order[np.argsort(-scores[order])]
+        return [
+            {'id': state['ids'][i], 'content': state['documents'][i], 'metadata': state['metadatas'][i]}
+            for i in order
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._write([], np.zeros((0, self._state['dim']), dtype=np.float32), [], [])
+
+
+def create_vector_store(backend: str, data_dir: str) -> VectorStore:
+    """RAG_VECTOR_STORE 설정에 맞는 백엔드 (numpy: data/vectors, chroma: data/chromadb)"""
+    chroma_path = os.path.join(data_dir, 'chromadb')
+    if backend == 'chroma':
+        return ChromaVectorStore(chroma_path)
+    if backend != 'numpy':
+        raise ValueError(f"지원하지 않는 벡터 저장소: {backend}")
+
+    store = NumpyVectorStore(os.path.join(data_dir, 'vectors'))
+    # 기존 Chroma 데이터가 있으면 최초 1회 이전 (업로드 문서 유지)
+    if not store.exists and os.path.isdir(chroma_path) and _import_chromadb() is not None:
+        try:
+            ids, embeddings, documents, metadatas = ChromaVectorStore(chroma_path).get_embeddings()
+        except Exception as e:
+            print(f"⚠️  Chroma migration skipped: {e}")
+        else:
+            if len(ids):
+                store.upsert(list(ids), embeddings, list(documents), list(metadatas))
+    if not store.exists:
+        # 빈 저장소도 기록해 두어 이후 재시작 시 이전을 다시 시도하지 않음
+        store.clear()
+    return store
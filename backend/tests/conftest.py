@@ -0,0 +1,21 @@
+"""테스트 공통 설정 - app 모듈 import 전에 임시 데이터 디렉터리/DB 지정
+
+    cd backend && python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app')
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+_data_dir = tempfile.mkdtemp(prefix='smt-test-')
+os.environ.pop("RENDER", None)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_data_dir, 'test.db')}")
+os.environ.setdefault("RAG_DATA_DIR", os.path.join(_data_dir, 'rag'))
+os.environ.setdefault("ARCHIVE_DIR", os.path.join(_data_dir, 'archive'))
+os.environ.setdefault("RAG_EMBEDDING_PROVIDER", "ollama")
+os.environ.setdefault("RAG_VECTOR_STORE", "numpy")
+# 테스트 서버가 없는 포트 (실수로 로컬 Ollama를 호출하지 않도록)
+os.environ.setdefault("OLLAMA_URL", "http://127.0.0.1:9/api")
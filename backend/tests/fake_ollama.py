@@ -0,0 +1,81 @@
+"""가짜 Ollama 서버 - /api/embed, /api/embeddings, /api/generate (별도 스레드의 uvicorn)"""
+import asyncio
+import hashlib
+import socket
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def _vector(text: str) -> list:
+    digest = hashlib.sha256(text.encode()).digest()
+    return [byte / 255 - 0.5 for byte in digest] * 8
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class FakeOllama:
+    """fail=True면 503, generate_status로 생성 응답 코드 지정 (4xx), generate_delay로 생성 지연 (과부하),
+    stop() 후 start()로 같은 포트 재시작 (중단/복구)"""
+
+    def __init__(self, port: int = None):
+        self.port = port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}/api"
+        self.fail = False
+        self.generate_status = None
+        self.generate_delay = 0.0
+        self.calls = 0
+        self.server = None
+        self.thread = None
+
+    def _app(self) -> FastAPI:
+        app = FastAPI()
+
+        def guard():
+            self.calls += 1
+            if self.fail:
+                return JSONResponse({"error": "model unavailable"}, status_code=503)
+            return None
+
+        @app.post("/api/embed")
+        async def embed(request: Request):
+            body = await request.json()
+            return guard() or {"embeddings": [_vector(text) for text in body['input']]}
+
+        @app.post("/api/embeddings")
+        async def embeddings(request: Request):
+            body = await request.json()
+            return guard() or {"embedding": _vector(body['prompt'])}
+
+        @app.post("/api/generate")
+        async def generate(request: Request):
+            await request.json()
+            failed = guard()
+            if failed:
+                return failed
+            if self.generate_status:
+                return JSONResponse({"error": "model not found"}, status_code=self.generate_status)
+            await asyncio.sleep(self.generate_delay)
+            return {"response": "정상 생성 답변", "done": True}
+
+        return app
+
+    def start(self):
+        config = uvicorn.Config(self._app(), host="127.0.0.1", port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.02)
+
+    def stop(self):
+        if self.server is not None and not self.server.should_exit:
+            self.server.should_exit = True
+            self.thread.join()
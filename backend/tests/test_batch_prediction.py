@@ -0,0 +1,26 @@
+"""일괄 예측 - 컬럼 형식 입력 검증"""
+import pytest
+from fastapi import HTTPException
+
+import main
+from schemas import BatchPredictionRequest
+
+
+def _columns(n: int = 3) -> dict:
+    return {col: [1.0] * n for col in main.ml_model.feature_columns}
+
+
+def test_extra_non_numeric_columns_are_ignored():
+    request = BatchPredictionRequest(columns=dict(
+        _columns(), line_id=['LINE_01', 'LINE_02', 'LINE_03'], timestamp=['2026-01-01T00:00:00'] * 3))
+    result = main.predict_failure_batch(request)
+    assert result['count'] == 3
+
+
+def test_non_numeric_feature_column_is_rejected():
+    columns = _columns()
+    columns['temperature'] = [245.0, 'hot', 250.0]
+    with pytest.raises(HTTPException) as exc:
+        main.predict_failure_batch(BatchPredictionRequest(columns=columns))
+    assert exc.value.status_code == 400
+    assert 'temperature' in exc.value.detail
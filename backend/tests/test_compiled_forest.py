@@ -0,0 +1,64 @@
+"""컴파일 포레스트 - sklearn predict_proba와 비트 단위 일치 / 저장본 로드"""
+import numpy as np
+import pytest
+
+import fast_forest
+from data_generator import SMTDataGenerator, FEATURE_COLUMNS
+from fast_forest import CompiledForest
+from ml_model import FailurePredictionModel, fit_model
+
+
+@pytest.fixture(scope='module')
+def trained():
+    df = SMTDataGenerator().generate_dataset(3000, seed=7)
+    X = df[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    model, scaler, _ = fit_model(X, df['failure_occurred'].to_numpy())
+    # 학습 데이터와 다른 행 + 분기 임계값 근처 값으로 검증
+    X_eval = SMTDataGenerator().generate_dataset(2000, seed=8)[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    return model, scaler, X_eval
+
+
+def _expected(model, scaler, X):
+    return model.predict_proba(scaler.transform(X))
+
+
+def test_compiled_proba_is_bit_identical(trained):
+    model, scaler, X = trained
+    compiled = CompiledForest.from_sklearn(model, scaler)
+
+    assert np.array_equal(compiled.predict_proba(X), _expected(model, scaler, X))
+    # 단일 행 경로(파이썬 순회)도 동일
+    for row in X[:200]:
+        assert np.array_equal(compiled.predict_proba(row[np.newaxis]), _expected(model, scaler, row[np.newaxis]))
+
+
+def test_compiled_proba_matches_at_split_thresholds(trained):
+    model, scaler, X = trained
+    compiled = CompiledForest.from_sklearn(model, scaler)
+    # 각 분기 임계값(원본 공간)과 그 양옆 값을 넣어 경계 처리 비교
+    internal = compiled.left != np.arange(len(compiled.left))
+    rows = []
+    for feature, threshold in zip(compiled.feature[internal], compiled.threshold[internal]):
+        for value in (np.nextafter(threshold, -np.inf), threshold, np.nextafter(threshold, np.inf)):
+            row = X[0].copy()
+            row[feature] = value
+            rows.append(row)
+    X_edge = np.array(rows)
+
+    assert np.array_equal(compiled.predict_proba(X_edge), _expected(model, scaler, X_edge))
+
+
+def test_saved_compiled_forest_is_loaded(trained, tmp_path, monkeypatch):
+    model, scaler, X = trained
+    model_path = str(tmp_path / 'model.pkl')
+    trainer = FailurePredictionModel(model_path=model_path, use_compiled=True)
+    trainer.save_model(trainer.swap(model, scaler))
+
+    # 재시작 시 저장된 .npz를 그대로 사용 (sklearn 변환을 다시 하지 않음)
+    def _no_compile(*args, **kwargs):
+        raise AssertionError("compiled forest should be loaded from disk")
+    monkeypatch.setattr(fast_forest.CompiledForest, 'from_sklearn', classmethod(_no_compile))
+    restarted = FailurePredictionModel(model_path=model_path, use_compiled=True)
+
+    assert restarted.compiled is not None
+    assert np.array_equal(restarted.compiled.predict_proba(X), _expected(model, scaler, X))
@@ -0,0 +1,40 @@
+"""RAG 컨텍스트 구성 - 청크 겹침 제거 범위"""
+from chunker import chunk_text
+from context_builder import build_context
+
+STEPS = ['노즐 흡착 상태 확인', '피더 테이프 장력 조정', '컨베이어 폭 측정', '히터 존 온도 기록',
+         '플럭스 잔량 점검', '냉각 팬 회전 확인', '솔더 페이스트 교체', '비전 카메라 보정']
+
+
+def _documents(text: str, filename: str = 'manual.txt') -> list:
+    return [{'content': chunk['text'], 'metadata': {'filename': filename, 'section': chunk['section'] or ''}}
+            for chunk in chunk_text(text, max_tokens=40, overlap=12)]
+
+
+def _manual() -> str:
+    return "# 리플로우 점검\n\n" + "\n\n".join(f"- {step}" for step in STEPS)
+
+
+def test_chunk_overlap_appears_once_in_any_order():
+    documents = _documents(_manual())
+    assert len(documents) > 2
+    # 겹침이 실제로 있는 청크 구성인지 확인
+    assert documents[0]['content'].split('\n')[-1] == documents[1]['content'].split('\n')[1]
+
+    for ordered in (documents, documents[::-1]):
+        _, context, _ = build_context(ordered, budget=10_000, mmr_lambda=1.0)
+        for step in STEPS:
+            assert context.count(f"- {step}") == 1
+        assert context.count('리플로우 점검') == 1
+
+
+def test_same_line_in_other_section_is_kept():
+    shared = '1. 전원 차단 후 작업'
+    documents = [
+        {'content': f"마운터 정지\n{shared}\n2. 헤드 원점 복귀 확인", 'metadata': {'filename': 'a.txt', 'section': '마운터 정지'}},
+        {'content': f"리플로우 정지\n{shared}\n2. 컨베이어 잔류 기판 배출", 'metadata': {'filename': 'b.txt', 'section': '리플로우 정지'}},
+    ]
+    used, context, _ = build_context(documents, budget=10_000, mmr_lambda=1.0)
+
+    assert len(used) == 2
+    assert context.count(shared) == 2
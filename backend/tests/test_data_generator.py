@@ -0,0 +1,57 @@
+"""학습용 데이터셋 생성 - 고정 seed로 형태/타입/비율 확인"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_generator import SMTDataGenerator, FEATURE_COLUMNS, INT_FEATURES
+
+LINES = ["LINE_01", "LINE_02", "LINE_03"]
+
+
+@pytest.fixture(scope='module')
+def dataset() -> pd.DataFrame:
+    return SMTDataGenerator().generate_dataset(5000, failure_ratio=0.15, lines=LINES, seed=42)
+
+
+def test_shape_and_columns(dataset):
+    assert dataset.shape == (5000, len(FEATURE_COLUMNS) + 2)
+    assert list(dataset.columns) == ['line_id'] + FEATURE_COLUMNS + ['failure_occurred']
+    assert set(dataset['line_id']) == set(LINES)
+    assert not dataset.isna().any().any()
+
+
+def test_dtypes(dataset):
+    for col in FEATURE_COLUMNS:
+        expected = np.int64 if col in INT_FEATURES else np.float64
+        assert dataset[col].dtype == expected, col
+    assert dataset['failure_occurred'].dtype == bool
+
+
+def test_failure_rate_and_value_ranges(dataset):
+    # 고장 건수는 int(total * ratio)로 정확히 고정
+    assert dataset['failure_occurred'].sum() == 750
+    assert dataset['failure_occurred'].mean() == pytest.approx(0.15, abs=0.001)
+
+    # 셔플 후에도 고장 행이 한쪽에 몰리지 않음
+    assert dataset['failure_occurred'].iloc[:2500].mean() == pytest.approx(0.15, abs=0.03)
+
+    generator = SMTDataGenerator()
+    regimes = [ranges for _, ranges in generator.normal_regimes + generator.failure_regimes]
+    for col in FEATURE_COLUMNS:
+        # 패턴 범위 x 노이즈 계수(0.90~1.10)
+        low = min(ranges[col][0] for ranges in regimes) * 0.90
+        high = max(ranges[col][1] for ranges in regimes) * 1.10
+        assert dataset[col].between(np.floor(low), high).all(), col
+
+    failure = dataset[dataset['failure_occurred']]
+    normal = dataset[~dataset['failure_occurred']]
+    assert failure['temperature'].mean() > normal['temperature'].mean()
+    assert failure['defect_count'].mean() > normal['defect_count'].mean()
+
+
+def test_seed_is_reproducible(dataset):
+    again = SMTDataGenerator().generate_dataset(5000, failure_ratio=0.15, lines=LINES, seed=42)
+    pd.testing.assert_frame_equal(dataset, again)
+
+    other = SMTDataGenerator().generate_dataset(5000, failure_ratio=0.15, lines=LINES, seed=43)
+    assert not dataset[FEATURE_COLUMNS].equals(other[FEATURE_COLUMNS])
@@ -0,0 +1,96 @@
+"""CSV 대량 적재 - 청크 스트리밍 + 전체 단위 commit/rollback"""
+import io
+
+import pytest
+
+import event_bus
+from database import SessionLocal, SMTData
+from data_ingest import ingest_csv, REQUIRED_COLUMNS
+from line_stats import get_stats_summary
+
+HEADER = ','.join(REQUIRED_COLUMNS)
+
+
+def _row(line_id: str, temperature: float = 245.0) -> str:
+    return f"{line_id},{temperature},0.5,10.2,100,1,30.5,0.7,45.0,false"
+
+
+def _csv(rows: list) -> io.BytesIO:
+    return io.BytesIO(('\n'.join([HEADER] + rows) + '\n').encode('utf-8'))
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def _count(db, line_id: str) -> int:
+    return db.query(SMTData).filter(SMTData.line_id == line_id).count()
+
+
+def test_ingest_reports_chunks_and_rejected_rows(db):
+    rows = [_row('INGEST-OK')] * 4 + ["INGEST-OK,not-a-number,0.5,10.2,100,1,30.5,0.7,45.0,false"]
+    result = ingest_csv(db, _csv(rows), chunk_size=2)
+
+    assert result['count'] == 4
+    assert result['rejected'] == 1
+    assert [chunk['inserted'] for chunk in result['chunks']] == [2, 2, 0]
+    assert _count(db, 'INGEST-OK') == 4
+
+
+def test_parse_error_in_later_chunk_commits_nothing(db):
+    # 세 번째 청크에 닫히지 않은 따옴표 - 앞 두 청크도 남지 않아야 재업로드 시 중복이 없음
+    rows = [_row('INGEST-BAD')] * 4 + ['"INGEST-BAD,245.0']
+    lines_before = get_stats_summary(db)['lines']
+
+    with pytest.raises(ValueError):
+        ingest_csv(db, _csv(rows), chunk_size=2)
+
+    assert _count(db, 'INGEST-BAD') == 0
+    assert get_stats_summary(db)['lines'] == lines_before
+
+    # 수정한 파일로 재업로드하면 정확히 한 번만 적재
+    result = ingest_csv(db, _csv([_row('INGEST-BAD')] * 5), chunk_size=2)
+    assert result['count'] == 5
+    assert _count(db, 'INGEST-BAD') == 5
+
+
+@pytest.fixture
+def published(monkeypatch):
+    events = []
+    monkeypatch.setattr(event_bus.event_bus, 'publish',
+                        lambda event_type, data, line_id=None: events.append((event_type, data, line_id)))
+    return events
+
+
+def test_ingest_publishes_last_reading_per_line_after_commit(db, published):
+    rows = [_row('INGEST-EVT-A', 200.0 + i) for i in range(5)] + [_row('INGEST-EVT-B', 210.0)]
+    ingest_csv(db, _csv(rows), chunk_size=4)
+
+    readings = {}
+    for event_type, data, line_id in published:
+        if event_type == 'reading':
+            assert data['line_id'] == line_id
+            readings[line_id] = data['temperature']
+    assert readings == {'INGEST-EVT-A': 204.0, 'INGEST-EVT-B': 210.0}
+
+
+def test_failed_ingest_publishes_nothing(db, published):
+    with pytest.raises(ValueError):
+        ingest_csv(db, _csv([_row('INGEST-EVT-BAD')] * 4 + ['"INGEST-EVT-BAD,245.0']), chunk_size=2)
+    assert published == []
+
+
+def test_stale_id_index_is_dropped(db):
+    from sqlalchemy import inspect
+    from database import engine, ensure_indexes
+
+    db.connection().exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_smt_data_id ON smt_data (id)")
+    db.commit()
+    ensure_indexes()
+
+    indexes = {index['name'] for index in inspect(engine).get_indexes(SMTData.__tablename__)}
+    assert 'ix_smt_data_id' not in indexes
+    assert 'ix_smt_data_line_timestamp' in indexes
@@ -0,0 +1,30 @@
+"""임베딩 캐시 - 일괄 insert, 중복 키 무시"""
+from sqlalchemy import event
+
+from database import engine
+from embedding_cache import EmbeddingCache
+
+
+def test_put_many_is_one_insert_and_ignores_existing_keys():
+    cache = EmbeddingCache()
+    texts = [f"캐시 테스트 청크 {i}" for i in range(50)]
+    cache.put_many('test-model', texts[:10], [[float(i), 1.0] for i in range(10)])
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split(None, 1)[0].upper())
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        # 앞 10개는 이미 저장됨 (동시 업로드) - 오류 없이 건너뜀
+        cache.put_many('test-model', texts, [[float(i), 2.0] for i in range(50)])
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    assert statements.count('INSERT') == 1
+    assert 'SELECT' not in statements
+    found = cache.get_many('test-model', texts)
+    assert len(found) == 50
+    assert found[0] == [0.0, 1.0]
+    assert found[49] == [49.0, 2.0]
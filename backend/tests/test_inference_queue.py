@@ -0,0 +1,63 @@
+"""추론 마이크로 배치 큐 - 배치 실패 격리, 대기 한도"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from inference_queue import InferenceBatcher, InferenceTimeout
+
+
+class FakeModel:
+    """temperature가 None인 행이 섞이면 배치 전체가 실패하는 모델"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batch_sizes = []
+
+    def predict_batch(self, data: list) -> list:
+        time.sleep(self.delay)
+        self.batch_sizes.append(len(data))
+        if any(row['temperature'] is None for row in data):
+            raise ValueError("temperature 값이 없습니다.")
+        return [{'failure_probability': row['temperature'] / 1000} for row in data]
+
+
+def test_batch_failure_only_fails_offending_request():
+    model = FakeModel()
+    batcher = InferenceBatcher(model, max_batch_size=8, max_wait_ms=200)
+    rows = [{'temperature': 240.0 + i} for i in range(5)] + [{'temperature': None}]
+
+    def predict(row):
+        try:
+            return batcher.predict(row)
+        except ValueError as e:
+            return e
+
+    with ThreadPoolExecutor(len(rows)) as pool:
+        results = list(pool.map(predict, rows))
+    batcher.stop()
+
+    assert model.batch_sizes[0] > 1
+    assert [result['failure_probability'] for result in results[:-1]] == [row['temperature'] / 1000 for row in rows[:-1]]
+    assert isinstance(results[-1], ValueError)
+    assert batcher.get_stats()['isolated_failures'] == 1
+
+
+def test_predict_times_out_and_skips_cancelled_request():
+    model = FakeModel(delay=0.5)
+    batcher = InferenceBatcher(model, max_batch_size=1, max_wait_ms=0, timeout=0.2)
+    # 워커가 첫 요청을 처리하는 동안 두 번째 요청은 큐에서 대기
+    first = batcher.submit({'temperature': 240.0})
+    time.sleep(0.05)
+
+    started = time.perf_counter()
+    with pytest.raises(InferenceTimeout):
+        batcher.predict({'temperature': 250.0})
+    assert time.perf_counter() - started < 0.4
+
+    assert first.result(timeout=1)['failure_probability'] == 0.24
+    time.sleep(0.2)
+    batcher.stop()
+    # 취소된 두 번째 요청은 모델에 전달되지 않음
+    assert model.batch_sizes == [1]
+    assert batcher.get_stats()['timeouts'] == 1
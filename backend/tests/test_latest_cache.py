@@ -0,0 +1,104 @@
+"""라인별 최신 데이터 캐시 / 실시간 조회"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import main
+from database import SessionLocal
+from data_generator import SMTDataGenerator
+from data_ingest import bulk_insert_readings
+from latest_cache import LatestReading, LatestReadingCache
+from storage import reading_repository
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def _insert(db, line_id: str, timestamps) -> pd.DataFrame:
+    df = SMTDataGenerator().generate_dataset(len(timestamps))
+    df['line_id'] = line_id
+    df['timestamp'] = timestamps
+    bulk_insert_readings(db, df)
+    db.commit()
+    return df
+
+
+def _realtime(monkeypatch, cache: LatestReadingCache, line_id: str) -> dict:
+    monkeypatch.setattr(main, 'latest_readings', cache)
+    return asyncio.run(main.get_realtime_data(line_id))
+
+
+@pytest.mark.skipif(reading_repository.archive is None, reason="pyarrow 미설치")
+def test_realtime_after_whole_line_is_archived(db, monkeypatch):
+    old = pd.date_range(end=datetime.now() - timedelta(days=60), periods=5, freq='h')
+    df = _insert(db, 'ARCHIVED-LINE', old)
+    reading_repository.archive_before(db, datetime.now() - timedelta(days=30))
+    assert reading_repository.latest(db, 'ARCHIVED-LINE') is not None
+
+    # 재시작 - 아카이브에만 있는 라인도 캐시에 적재
+    cache = LatestReadingCache()
+    cache.warm(db)
+    result = _realtime(monkeypatch, cache, 'ARCHIVED-LINE')
+
+    assert result['timestamp'] == old[-1].to_pydatetime()
+    assert result['temperature'] == pytest.approx(df['temperature'].iloc[-1])
+    assert 'no_data' not in result
+
+
+def test_realtime_without_data_is_explicit(db, monkeypatch):
+    cache = LatestReadingCache()
+    cache.warm(db)
+    result = _realtime(monkeypatch, cache, 'NO-SUCH-LINE')
+
+    assert result['no_data'] is True
+    assert result['line_id'] == 'NO-SUCH-LINE'
+    assert result['temperature'] is None and result['timestamp'] is None
+
+
+def test_warm_update_and_read(db):
+    now = datetime.now().replace(microsecond=0)
+    _insert(db, 'CACHE-LINE', pd.date_range(end=now - timedelta(minutes=1), periods=3, freq='s'))
+    cache = LatestReadingCache()
+    cache.warm(db)
+    warmed = cache.get('CACHE-LINE')
+    assert warmed.timestamp == now - timedelta(minutes=1)
+
+    newer = LatestReading(line_id='CACHE-LINE', timestamp=now, temperature=250.0)
+    cache.update(newer)
+    # 더 오래된 데이터로는 교체하지 않음
+    cache.update(LatestReading(line_id='CACHE-LINE', timestamp=now - timedelta(hours=1), temperature=1.0))
+    assert cache.get('CACHE-LINE') is newer
+    assert cache.get_stats()['hits'] == 2
+
+
+def test_miss_reads_through_to_db(db, monkeypatch):
+    cache = LatestReadingCache()
+    cache.warm(db)
+    # 다른 워커가 저장한 라인 - 이 프로세스의 캐시는 갱신되지 않음
+    now = datetime.now().replace(microsecond=0)
+    df = _insert(db, 'OTHER-WORKER-LINE', [now])
+    assert cache.get('OTHER-WORKER-LINE') is None
+
+    result = _realtime(monkeypatch, cache, 'OTHER-WORKER-LINE')
+    assert result['timestamp'] == now
+    assert result['temperature'] == pytest.approx(df['temperature'].iloc[0])
+    assert cache.get('OTHER-WORKER-LINE').timestamp == now
+
+
+def test_expired_entry_is_reloaded(db, monkeypatch):
+    now = datetime.now().replace(microsecond=0)
+    _insert(db, 'TTL-LINE', [now - timedelta(seconds=10)])
+    cache = LatestReadingCache(ttl=0.05)
+    cache.warm(db)
+    _insert(db, 'TTL-LINE', [now])
+
+    assert _realtime(monkeypatch, cache, 'TTL-LINE')['timestamp'] == now - timedelta(seconds=10)
+    time.sleep(0.1)
+    assert _realtime(monkeypatch, cache, 'TTL-LINE')['timestamp'] == now
@@ -0,0 +1,49 @@
+"""라인별 통계 카운터 - 동시 증분 upsert, 시작 시 재계산 조건"""
+from concurrent.futures import ThreadPoolExecutor
+
+from database import SessionLocal, LineStats
+from line_stats import increment_line_stats, rebuild_line_stats
+from storage import reading_repository
+
+
+def _counter(line_id: str):
+    db = SessionLocal()
+    try:
+        row = db.get(LineStats, line_id)
+        return (row.total, row.failures) if row is not None else None
+    finally:
+        db.close()
+
+
+def _increment(line_id: str, failures: int):
+    db = SessionLocal()
+    try:
+        increment_line_stats(db, {line_id: (1, failures)})
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_concurrent_first_inserts_for_new_line():
+    # 새 라인의 첫 insert가 동시에 와도 IntegrityError 없이 모두 반영
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: _increment('NEW-STATS-LINE', i % 2), range(40)))
+    assert _counter('NEW-STATS-LINE') == (40, 20)
+
+
+def test_rebuild_only_when_empty_or_forced(monkeypatch):
+    db = SessionLocal()
+    try:
+        increment_line_stats(db, {'DRIFT-LINE': (5, 1)})
+        db.commit()
+        assert not rebuild_line_stats(db)
+        assert _counter('DRIFT-LINE') == (5, 1)
+
+        # force: smt_data(+아카이브) 기준으로 다시 계산 - 행이 없는 라인의 카운터는 사라짐
+        assert rebuild_line_stats(db, force=True)
+        assert _counter('DRIFT-LINE') is None
+        expected = {line_id: (total, failures or 0)
+                    for line_id, total, failures in reading_repository.line_counts(db) if line_id}
+        assert {row.line_id: (row.total, row.failures) for row in db.query(LineStats)} == expected
+    finally:
+        db.close()
@@ -0,0 +1,214 @@
+"""Ollama 과부하/장애/복구 시 RAG 동작 - 가짜 Ollama 서버 사용"""
+import asyncio
+import time
+
+import pytest
+
+import ollama_client
+from fake_ollama import FakeOllama
+from rag_engine import RAGEngine, RETRIEVAL_ONLY_NOTICE
+
+MANUAL = (
+    "# 리플로우 오븐\n리플로우 피크 온도는 245°C를 유지한다.\n\n"
+    "# 마운터 노즐\n노즐 막힘 시 진공압을 확인하고 노즐을 교체한다.\n\n"
+    "# 스크린 프린터\n스퀴지 압력은 0.7MPa, 속도는 30mm/s로 설정한다."
+)
+
+
+@pytest.fixture
+def fake():
+    server = FakeOllama()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def create_engine(fake, tmp_path, monkeypatch):
+    """동시 생성 1건, 대기 한도 0.3초, 서킷 reset 0.5초인 RAGEngine"""
+    monkeypatch.setenv("OLLAMA_URL", fake.url)
+    monkeypatch.setenv("RAG_DATA_DIR", str(tmp_path / 'rag'))
+    monkeypatch.setattr(ollama_client, "OLLAMA_GENERATE_CONCURRENCY", 1)
+    monkeypatch.setattr(ollama_client, "OLLAMA_QUEUE_TIMEOUT", 0.3)
+
+    def create():
+        rag = RAGEngine()
+        rag.ollama.breaker.reset_timeout = 0.5
+        return rag
+    return create
+
+
+async def _ready(rag: RAGEngine) -> RAGEngine:
+    await rag.start()
+    assert await rag.prepare()
+    result = await rag.add_document(MANUAL, {'filename': 'manual.txt'})
+    assert result['success']
+    return rag
+
+
+def _generated(result: dict) -> bool:
+    return not result['answer'].startswith(RETRIEVAL_ONLY_NOTICE)
+
+
+def test_normal_query_is_generated(create_engine):
+    async def scenario():
+        rag = await _ready(create_engine())
+        result = await rag.query("리플로우 피크 온도는?")
+        await rag.close()
+        return rag, result
+
+    rag, result = asyncio.run(scenario())
+    assert _generated(result)
+    assert result['sources'] == ['manual.txt']
+    assert rag.ollama.breaker.state == 'closed'
+
+
+def test_overload_rejects_queued_requests_without_opening_circuit(fake, create_engine):
+    questions = ["노즐 막힘 조치", "스퀴지 압력 설정", "프린터 속도", "진공압 확인 방법"]
+
+    async def scenario():
+        rag = await _ready(create_engine())
+        fake.generate_delay = 1.5
+        started = time.perf_counter()
+        elapsed = []
+
+        async def timed(question):
+            result = await rag.query(question)
+            elapsed.append(time.perf_counter() - started)
+            return result
+
+        results = await asyncio.gather(*[timed(question) for question in questions])
+        await rag.close()
+        return rag, results, sorted(elapsed)
+
+    rag, results, elapsed = asyncio.run(scenario())
+    assert sum(_generated(result) for result in results) == 1
+    # 대기열을 넘긴 요청은 생성 완료를 기다리지 않고 대기 한도 직후 검색 결과로 응답
+    assert elapsed[-2] < 1.0
+    assert all(result['sources'] for result in results)
+    assert rag.ollama.queue_rejected == len(questions) - 1
+    assert rag.ollama.breaker.state == 'closed'
+
+
+def test_outage_opens_circuit_and_fails_fast(fake, create_engine):
+    async def scenario():
+        rag = await _ready(create_engine())
+        fake.fail = True
+        failed = [await rag.query(question) for question in ["리플로우 온도 유지", "노즐 교체 시점"]]
+        state = rag.ollama.breaker.state
+
+        calls = fake.calls
+        started = time.perf_counter()
+        fast = await rag.query("스퀴지 속도")
+        elapsed = time.perf_counter() - started
+        await rag.close()
+        return failed, state, fast, elapsed, fake.calls - calls
+
+    failed, state, fast, elapsed, calls = asyncio.run(scenario())
+    assert all(not _generated(result) and result['sources'] for result in failed)
+    assert state == 'open'
+    # 열린 서킷 - 서버 호출 없이 키워드 검색 + 검색 결과 응답
+    assert calls == 0
+    assert elapsed < 0.5
+    assert not _generated(fast) and fast['sources']
+
+
+def test_connection_refused_then_recovery_closes_circuit(fake, create_engine):
+    async def scenario():
+        rag = await _ready(create_engine())
+        circuit = rag.ollama.breaker
+        fake.stop()
+        for question in ["리플로우 온도 유지", "노즐 교체 시점"]:
+            assert not _generated(await rag.query(question))
+        assert circuit.state == 'open'
+
+        # reset 후 시험 호출도 연결 거부 -> 다시 열림
+        await asyncio.sleep(circuit.reset_timeout)
+        assert not _generated(await rag.query("마운터 진공압"))
+        assert circuit.state == 'open'
+
+        fake.start()
+        await asyncio.sleep(circuit.reset_timeout)
+        await rag.query("리플로우 오븐 온도 설정")
+        recovered_state = circuit.state
+        result = await rag.query("노즐 막힘 해결")
+        await rag.close()
+        return recovered_state, result
+
+    state, result = asyncio.run(scenario())
+    assert state == 'closed'
+    assert _generated(result)
+
+
+def test_startup_sync_retries_while_ollama_is_down(fake, create_engine, monkeypatch, tmp_path):
+    """서버 시작 시 Ollama가 없어도 시작은 계속되고, 매뉴얼은 키워드 검색으로 먼저 제공 후 복구되면 동기화"""
+    import main
+
+    # 앞선 테스트가 임베딩 캐시에 넣지 않은 청크가 있어야 동기화에 Ollama가 필요
+    manual_path = tmp_path / 'manual.txt'
+    manual_path.write_text(MANUAL + "\n\n# 솔더 페이스트\n개봉 후 24시간 이내 사용한다.", encoding='utf-8')
+    fake.fail = True
+    rag = create_engine()
+    monkeypatch.setattr(main, 'rag_engine', rag)
+    monkeypatch.setattr(main, 'RAG_PREPARE_RETRY', 0.2)
+
+    async def scenario():
+        await rag.start()
+        task = asyncio.create_task(main._prepare_rag(str(manual_path)))
+        await asyncio.sleep(0.5)
+        retrying = not task.done()
+        documents, _, mode = await rag.retrieve("리플로우 피크 온도", 1)
+
+        fake.fail = False
+        await asyncio.wait_for(task, 10)
+        count = rag.store.count()
+        await rag.close()
+        return retrying, documents, mode, count
+
+    retrying, documents, mode, count = asyncio.run(scenario())
+    assert retrying
+    assert mode == 'lexical'
+    assert '245°C' in documents[0]['content']
+    assert count == 4
+
+
+def test_client_error_falls_back_to_retrieved_sections(fake, create_engine):
+    async def scenario():
+        rag = await _ready(create_engine())
+        fake.generate_status = 404
+        result = await rag.query("리플로우 피크 온도는?")
+        streamed = [token async for token in rag.stream_answer("리플로우 피크 온도는?", "매뉴얼 내용")]
+        await rag.close()
+        return rag, result, streamed
+
+    rag, result, streamed = asyncio.run(scenario())
+    assert not _generated(result) and result['sources']
+    assert streamed == [RETRIEVAL_ONLY_NOTICE + "매뉴얼 내용"]
+    # 4xx는 서버 장애가 아니므로 서킷은 닫힌 상태 유지
+    assert rag.ollama.breaker.state == 'closed'
+
+
+def test_cancelled_half_open_trial_releases_slot(fake, create_engine):
+    async def scenario():
+        rag = create_engine()
+        client = rag.ollama
+        await client.start()
+        breaker = client.breaker
+        breaker.state, breaker.opened_at = 'open', 0.0
+
+        # 생성 슬롯을 모두 점유 - half-open 시험 호출이 슬롯 대기 중 취소됨
+        await client._limits['generate'].acquire()
+        trial = asyncio.create_task(client.post('generate', '/generate', {"model": "m", "prompt": "p"}))
+        await asyncio.sleep(0.05)
+        assert breaker.state == 'half_open'
+        trial.cancel()
+        await asyncio.gather(trial, return_exceptions=True)
+        client._limits['generate'].release()
+
+        response = await client.post('generate', '/generate', {"model": "m", "prompt": "p"})
+        await client.close()
+        return response.status_code, breaker.state
+
+    status, state = asyncio.run(scenario())
+    assert status == 200
+    assert state == 'closed'
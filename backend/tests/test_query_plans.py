@@ -0,0 +1,38 @@
+"""조회 경로별 실행 계획 점검 - 실제 storage/rollup/학습 로더가 실행하는 SELECT 기준"""
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from database import SessionLocal
+from data_generator import SMTDataGenerator
+from data_ingest import bulk_insert_readings
+from query_plans import check_query_plans, endpoint_calls
+
+
+@pytest.fixture(scope='module')
+def results():
+    db = SessionLocal()
+    try:
+        # 최근 24시간 안의 데이터 - 차트/통계 조회가 실제로 행을 읽도록
+        df = SMTDataGenerator().generate_dataset(300)
+        df['line_id'] = 'LINE_01'
+        df['timestamp'] = pd.date_range(end=datetime.now() - timedelta(minutes=1), periods=len(df), freq='min')
+        bulk_insert_readings(db, df)
+        db.commit()
+        yield {result['query']: result for result in check_query_plans(db)}
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize('name', list(endpoint_calls()))
+def test_query_uses_index(results, name):
+    result = results[name]
+    assert result['statements'] > 0
+    assert result['ok'], ' / '.join(result['plan'])
+
+
+def test_chart_auto_checks_both_rollup_and_raw_paths(results):
+    assert results['monitor_chart_auto']['statements'] == 2
+    assert any('smt_data' in detail for detail in results['monitor_chart_auto']['plan'])
+    assert all('smt_rollup' in detail for detail in results['monitor_chart_auto_rollup']['plan'])
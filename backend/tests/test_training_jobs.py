@@ -0,0 +1,78 @@
+"""학습 작업 요청 검증 / 끝난 작업 정리 / 워커 풀 장애"""
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+import main
+import training_jobs
+from schemas import TrainingRequest
+from training_jobs import TrainingJobManager
+
+# 데이터 부족으로 바로 끝나는 작업 (모델 교체 없음)
+UNTRAINABLE = 10 ** 9
+
+
+class _BrokenExecutor:
+    """워커 프로세스가 죽은 ProcessPoolExecutor 흉내"""
+
+    def __init__(self):
+        self.closed = False
+
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("worker died")
+
+    def shutdown(self, **kwargs):
+        self.closed = True
+
+
+@pytest.fixture
+def manager():
+    jobs = TrainingJobManager(model=None, use_processes=False)
+    yield jobs
+    jobs.shutdown()
+
+
+@pytest.mark.parametrize("fields", [
+    {'mode': 'window', 'days': 0},
+    {'mode': 'window', 'days': -3},
+    {'mode': 'sample', 'sample_size': 0},
+    {'mode': 'sample', 'days': -1, 'sample_size': 100},
+])
+def test_non_positive_days_or_sample_size_rejected(fields):
+    with pytest.raises(HTTPException) as exc:
+        main._validate_training_request(TrainingRequest(**fields))
+    assert exc.value.status_code == 400
+
+
+def test_finished_jobs_evicted_by_count_and_age(manager, monkeypatch):
+    monkeypatch.setattr(training_jobs, 'TRAINING_JOB_HISTORY', 2)
+    job_ids = []
+    for _ in range(4):
+        job = manager.submit(min_samples=UNTRAINABLE)
+        assert manager.wait(job['job_id'], timeout=30)['status'] == 'completed'
+        job_ids.append(job['job_id'])
+
+    latest = manager.submit(min_samples=UNTRAINABLE)
+    manager.wait(latest['job_id'], timeout=30)
+    assert set(manager.jobs) == {*job_ids[-2:], latest['job_id']}
+
+    manager.jobs[job_ids[-1]]['finished_at'] = (datetime.now() - timedelta(days=1)).isoformat()
+    manager.submit(min_samples=UNTRAINABLE)
+    assert job_ids[-1] not in manager.jobs
+
+
+def test_broken_pool_fails_job_and_recreates_executor(manager):
+    manager._ensure_executor()
+    broken = _BrokenExecutor()
+    manager._executor = broken
+
+    job = manager.submit(min_samples=UNTRAINABLE)
+    assert job['status'] == 'failed' and 'worker died' in job['error']
+    assert manager.wait(job['job_id'], timeout=1)['status'] == 'failed'
+    assert broken.closed and manager._executor is None
+
+    # 다음 작업은 새 풀에서 정상 실행
+    job = manager.submit(min_samples=UNTRAINABLE)
+    assert manager.wait(job['job_id'], timeout=30)['status'] == 'completed'
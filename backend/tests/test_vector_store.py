@@ -0,0 +1,114 @@
+"""numpy 벡터 저장소 - delta 추가 기록, 로그 재생, 압축, HNSW 증분 갱신"""
+import os
+
+import numpy as np
+import pytest
+
+import vector_store
+from vector_store import NumpyVectorStore
+
+DIM = 8
+
+
+def _vectors(count: int, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((count, DIM)).astype(np.float32)
+
+
+def _upsert(store, ids: list, vectors: np.ndarray):
+    store.upsert(ids, vectors, [f'문서 {doc_id}' for doc_id in ids], [{'filename': 'a.txt'} for _ in ids])
+
+
+def _files(path, prefix: str) -> list:
+    return sorted(name for name in os.listdir(path) if name.startswith(prefix))
+
+
+def _top(store, vector) -> str:
+    return store.query(vector.tolist(), 1)[0]['id']
+
+
+def test_upsert_appends_delta_without_rewriting_base(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    base = _vectors(10, seed=0)
+    _upsert(store, [f'c{i}' for i in range(10)], base)
+    vectors_file = _files(tmp_path, 'vectors-')
+    sidecar_mtime = os.stat(tmp_path / 'store.json').st_mtime_ns
+
+    added = _vectors(3, seed=1)
+    # c0 교체 + 새 청크 2개
+    _upsert(store, ['c0', 'c10', 'c11'], added)
+
+    assert _files(tmp_path, 'vectors-') == vectors_file
+    assert os.stat(tmp_path / 'store.json').st_mtime_ns == sidecar_mtime
+    assert len(_files(tmp_path, 'delta-')) == 1
+    assert store.count() == 12
+    assert _top(store, added[0]) == 'c0'
+    assert _top(store, added[2]) == 'c11'
+
+    store.delete(['c5'])
+    assert 'c5' not in store.get_ids('a.txt')
+
+    reopened = NumpyVectorStore(str(tmp_path))
+    assert reopened.count() == 11
+    assert sorted(reopened.get_ids()) == sorted(store.get_ids())
+    assert _top(reopened, added[1]) == 'c10'
+    assert all(result['id'] != 'c5' for result in reopened.query(base[5].tolist(), 11))
+
+
+def test_compaction_rewrites_alive_rows_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, 'COMPACT_RATIO', 0.25)
+    store = NumpyVectorStore(str(tmp_path))
+    vectors = _vectors(8, seed=2)
+    _upsert(store, [f'c{i}' for i in range(8)], vectors)
+    version = store._state['version']
+
+    store.delete(['c0'])
+    assert store._state['version'] == version
+    store.delete(['c1', 'c2'])
+
+    # 삭제 표시 3/8 > 0.25 -> 새 버전, 이전 delta/로그 정리
+    assert store._state['version'] != version
+    assert _files(tmp_path, 'log-') == []
+    assert len(_files(tmp_path, 'vectors-')) == 1
+    assert store.get_all()[0] == [f'c{i}' for i in range(3, 8)]
+    assert _top(NumpyVectorStore(str(tmp_path)), vectors[4]) == 'c4'
+
+
+def test_torn_log_line_is_discarded(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    _upsert(store, ['c0', 'c1'], _vectors(2, seed=3))
+    added = _vectors(1, seed=4)
+    _upsert(store, ['c2'], added)
+
+    log_path = tmp_path / _files(tmp_path, 'log-')[0]
+    with open(log_path, 'ab') as f:
+        f.write(b'{"op": "upsert", "ids": ["c3"')
+
+    reopened = NumpyVectorStore(str(tmp_path))
+    assert sorted(reopened.get_ids()) == ['c0', 'c1', 'c2']
+    latest = _vectors(1, seed=5)
+    _upsert(reopened, ['c3'], latest)
+    assert _top(NumpyVectorStore(str(tmp_path)), latest[0]) == 'c3'
+    assert _top(NumpyVectorStore(str(tmp_path)), added[0]) == 'c2'
+
+
+@pytest.mark.skipif(vector_store.hnswlib is None, reason="hnswlib 미설치")
+def test_hnsw_index_is_updated_in_place(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, 'HNSW_THRESHOLD', 0)
+    store = NumpyVectorStore(str(tmp_path))
+    _upsert(store, [f'c{i}' for i in range(20)], _vectors(20, seed=6))
+    index = store._state['hnsw']
+
+    added = _vectors(2, seed=7)
+    _upsert(store, ['c3', 'c20'], added)
+    store.delete(['c4'])
+
+    assert store._state['hnsw'] is index
+    assert _top(store, added[0]) == 'c3'
+    assert _top(store, added[1]) == 'c20'
+    assert len(store.query(added[0].tolist(), 50)) == 20
+
+    # 저장된 색인(압축 시점) 로드 후 delta/삭제를 따라잡음
+    reopened = NumpyVectorStore(str(tmp_path))
+    assert reopened._state['hnsw'] is not None
+    assert _top(reopened, added[1]) == 'c20'
+    assert all(result['id'] != 'c4' for result in reopened.query(added[0].tolist(), 20))